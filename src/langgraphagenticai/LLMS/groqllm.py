@@ -3,16 +3,22 @@ from typing import Optional
 from langchain_groq import ChatGroq
 import streamlit as st
 
+from src.langgraphagenticai.LLMS.scheduler import LLMScheduler, ScheduledLLM, get_llm_scheduler
+
 class GroqLLM:
-    def __init__(self, model: str = "openai/gpt-oss-20b", api_key: Optional[str] = None):
+    def __init__(self, model: str = "openai/gpt-oss-20b", api_key: Optional[str] = None,
+                 scheduler: Optional[LLMScheduler] = None):
         self.api_key = api_key or st.secrets["GROQ_API_KEY"]
         if not self.api_key:
             raise ValueError("GROQ_API_KEY is not set in environment.")
         self.model = model
+        # Rate limits, deadlines and retries live in the scheduler, shared by every model
+        self.scheduler = scheduler or get_llm_scheduler()
         try:
-            self._llm = ChatGroq(api_key=self.api_key, model=self.model)
+            self._llm = ChatGroq(api_key=self.api_key, model=self.model,
+                                 timeout=self.scheduler.timeout, max_retries=0)
         except Exception as e:
             raise ValueError(f"Failed to initialize ChatGroq: {e}")
 
     def get_llm_model(self):
-        return self._llm
\ No newline at end of file
+        return ScheduledLLM(self._llm, self.scheduler)
@@ -0,0 +1,455 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from src.langgraphagenticai.prompts.registry import count_tokens
+
+# Structured-output schemas whose calls are hedged: NLU sits on every turn's critical path
+DEFAULT_HEDGE_LABELS = frozenset({"NLUOutput"})
+# Hedge delay until a label has enough latency samples for its own p95
+MIN_HEDGE_SAMPLES = 20
+
+
+# Called (no arguments) when a call made in this context is admitted and its request
+# goes out; lets callers that cancel queued work tell unsent calls from sent ones
+on_request_sent: contextvars.ContextVar = contextvars.ContextVar("on_request_sent", default=None)
+
+
+def _request_sent() -> None:
+    hook = on_request_sent.get()
+    if hook is not None:
+        hook()
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call could not be admitted or answered before its deadline."""
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to `per_minute`; take() blocks until the
+    amount is available or the deadline would be missed."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, amount: float) -> bool:
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return True
+            return False
+
+    def take(self, amount: float, deadline: float) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_s = (amount - self.tokens) / self.rate
+            if now + wait_s > deadline:
+                raise LLMDeadlineExceeded("rate limit wait exceeds the call deadline")
+            time.sleep(wait_s)
+
+    def adjust(self, delta: float) -> None:
+        """Settles an estimate: positive delta refunds units, negative debits (may go below zero)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx, timeouts and connection errors; anything else (bad request, auth,
+    output parsing) fails the same way on retry."""
+    if isinstance(error, LLMDeadlineExceeded):
+        return False
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or any(
+        s in name for s in ("RateLimit", "Timeout", "Connection", "InternalServer", "ServiceUnavailable"))
+
+
+def _estimate_tokens(prompt, max_output_tokens: int) -> int:
+    if isinstance(prompt, str):
+        text = prompt
+    else:
+        text = " ".join(str(getattr(m, "content", m)) for m in prompt)
+    return count_tokens(text) + max_output_tokens
+
+
+def _used_tokens(result) -> Optional[int]:
+    usage = getattr(result, "usage_metadata", None) or {}
+    total = usage.get("total_tokens") if isinstance(usage, dict) else None
+    return int(total) if total else None
+
+
+class LLMScheduler:
+    """Admission control for one provider account, shared by every graph in the process.
+
+    A call first takes one request from the requests/min bucket and its estimated
+    tokens from the tokens/min bucket, then a concurrency slot; the estimate is
+    settled against usage_metadata afterwards. Every call has a deadline: waiting
+    for admission, the request itself and jittered retries of 429/5xx/timeouts all
+    count against it. Hedged calls launch one duplicate when the first has not
+    answered after the label's observed p95 latency, and take whichever answers first.
+    Hedges run in a small separate slot pool (max_hedges), so they still fire when
+    every regular slot is busy but can never crowd out first attempts.
+    """
+
+    def __init__(self, rpm: float = 30, tpm: float = 8000, max_concurrency: int = 8, timeout: float = 20.0,
+                 max_retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0, hedge_after: float = 1.0,
+                 hedge_labels: Set[str] = DEFAULT_HEDGE_LABELS, max_hedges: Optional[int] = None,
+                 max_output_tokens: int = 256):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.hedge_labels = set(hedge_labels)
+        self.max_output_tokens = max_output_tokens
+        self.max_hedges = max_hedges if max_hedges is not None else max(1, max_concurrency // 4)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._hedge_slots = threading.BoundedSemaphore(self.max_hedges)
+        # Workers for sync calls; requests that missed their deadline keep a worker until they return
+        self._pool = ThreadPoolExecutor(max_workers=(max_concurrency + self.max_hedges) * 2, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Deque[float]] = {}
+        self._stats = {"calls": 0, "failures": 0, "timeouts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                       "queued_s": 0.0, "max_queued_s": 0.0, "in_flight": 0}
+
+    # -- admission -------------------------------------------------------------------
+
+    def _admit(self, estimate: int, deadline: float) -> float:
+        """Blocks for rate-limit tokens and a concurrency slot; returns the time spent queued."""
+        t0 = time.monotonic()
+        self.requests.take(1, deadline)
+        self.tokens.take(estimate, deadline)
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self.requests.adjust(1)
+            self.tokens.adjust(estimate)
+            raise LLMDeadlineExceeded("no concurrency slot before the call deadline")
+        queued = time.monotonic() - t0
+        with self._lock:
+            self._stats["queued_s"] += queued
+            self._stats["max_queued_s"] = max(self._stats["max_queued_s"], queued)
+            self._stats["in_flight"] += 1
+        return queued
+
+    def _unadmit(self, estimate: int) -> None:
+        """Returns an admission whose request was never sent."""
+        self._slots.release()
+        self.requests.adjust(1)
+        self.tokens.adjust(estimate)
+        with self._lock:
+            self._stats["in_flight"] -= 1
+
+    async def _aadmit(self, estimate: int, deadline: float) -> float:
+        """_admit in a worker thread. Cancelling the caller cannot stop that thread, so
+        the wait is shielded and an admission that completes after the cancel is
+        handed straight back instead of holding its slot forever."""
+        admission = asyncio.ensure_future(asyncio.to_thread(self._admit, estimate, deadline))
+        try:
+            return await asyncio.shield(admission)
+        except asyncio.CancelledError:
+            def give_back(f):
+                if not f.cancelled() and f.exception() is None:
+                    self._unadmit(estimate)
+            admission.add_done_callback(give_back)
+            raise
+
+    def _try_admit_hedge(self, estimate: int) -> bool:
+        """Non-blocking admission for a hedge: a duplicate never waits for rate-limit tokens."""
+        if not self._hedge_slots.acquire(blocking=False):
+            return False
+        if not self.requests.try_take(1):
+            self._hedge_slots.release()
+            return False
+        if not self.tokens.try_take(estimate):
+            self.requests.adjust(1)
+            self._hedge_slots.release()
+            return False
+        with self._lock:
+            self._stats["in_flight"] += 1
+        return True
+
+    def _release(self, label: str, estimate: int, started: float, result=None, hedge: bool = False) -> None:
+        (self._hedge_slots if hedge else self._slots).release()
+        used = _used_tokens(result)
+        if used is not None:
+            self.tokens.adjust(estimate - used)
+        with self._lock:
+            self._stats["in_flight"] -= 1
+            if result is not None:
+                self._latency.setdefault(label, deque(maxlen=200)).append(time.monotonic() - started)
+
+    def hedge_delay(self, label: str) -> Optional[float]:
+        """Seconds to wait before hedging a call of this label, or None if it is not hedged."""
+        if label not in self.hedge_labels or self.hedge_after <= 0:
+            return None
+        with self._lock:
+            samples = sorted(self._latency.get(label, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return self.hedge_after
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        hinted = _retry_after(error)
+        if hinted is not None:
+            return hinted
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))  # full jitter
+
+    def _count(self, key: str, n=1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # -- sync path -------------------------------------------------------------------
+
+    def _run(self, label: str, estimate: int, fn: Callable[[], Any], hedge: bool = False):
+        started = time.monotonic()
+        result = None
+        try:
+            _request_sent()
+            result = fn()
+            return result
+        finally:
+            self._release(label, estimate, started, result, hedge)
+
+    def _submit(self, label: str, estimate: int, fn: Callable[[], Any], hedge: bool = False):
+        # Each attempt runs in a copy of the caller's context so LangGraph's runnable config
+        # (stream writer, callbacks, tracing spans) is visible inside the worker thread
+        ctx = contextvars.copy_context()
+        return self._pool.submit(ctx.run, self._run, label, estimate, fn, hedge)
+
+    def call(self, label: str, fn: Callable[[], Any], prompt=None, timeout: Optional[float] = None):
+        """Runs fn() under the rate limits with retries (and hedging for hedged labels)."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimate = _estimate_tokens(prompt or "", self.max_output_tokens)
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(label, estimate, fn, deadline)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if not is_retryable(e) or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self._count("timeouts" if isinstance(e, (LLMDeadlineExceeded, TimeoutError)) else "failures")
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+
+    def _attempt(self, label: str, estimate: int, fn: Callable[[], Any], deadline: float):
+        self._admit(estimate, deadline)
+        primary = self._submit(label, estimate, fn)
+        pending = {primary}
+        delay = self.hedge_delay(label)
+        if delay is not None:
+            done, _ = wait(pending, timeout=max(0.0, min(delay, deadline - time.monotonic())))
+            if not done and time.monotonic() < deadline and self._try_admit_hedge(estimate):
+                pending.add(self._submit(label, estimate, fn, True))
+                self._count("hedges")
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise LLMDeadlineExceeded(f"{label} call exceeded its deadline")
+            for f in done:
+                if f.exception() is None:
+                    if f is not primary:
+                        self._count("hedge_wins")
+                    return f.result()
+                last_error = f.exception()
+        raise last_error
+
+    # -- async path ------------------------------------------------------------------
+
+    def _spawn(self, label: str, estimate: int, coro_fn: Callable[[], Any], hedge: bool = False) -> asyncio.Future:
+        """Runs an admitted request as a task. The slot is released from a done callback,
+        which also fires for a task cancelled before it ever started."""
+        started = time.monotonic()
+
+        def release(task: asyncio.Future) -> None:
+            ok = not task.cancelled() and task.exception() is None
+            self._release(label, estimate, started, task.result() if ok else None, hedge)
+
+        try:
+            _request_sent()
+            task = asyncio.ensure_future(coro_fn())
+        except BaseException:
+            self._release(label, estimate, started, None, hedge)
+            raise
+        task.add_done_callback(release)
+        return task
+
+    async def acall(self, label: str, coro_fn: Callable[[], Any], prompt=None, timeout: Optional[float] = None):
+        """Async call(): admission waits run in a worker thread, the request on the event loop."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimate = _estimate_tokens(prompt or "", self.max_output_tokens)
+        self._count("calls")
+        attempt = 0
+        while True:
+            try:
+                return await self._aattempt(label, estimate, coro_fn, deadline)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if not is_retryable(e) or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self._count("timeouts" if isinstance(e, (LLMDeadlineExceeded, TimeoutError)) else "failures")
+                    raise
+                self._count("retries")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _aattempt(self, label: str, estimate: int, coro_fn: Callable[[], Any], deadline: float):
+        await self._aadmit(estimate, deadline)
+        primary = self._spawn(label, estimate, coro_fn)
+        pending = {primary}
+        try:
+            delay = self.hedge_delay(label)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, min(delay, deadline - time.monotonic())))
+                if not done and time.monotonic() < deadline and self._try_admit_hedge(estimate):
+                    pending.add(self._spawn(label, estimate, coro_fn, True))
+                    self._count("hedges")
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise LLMDeadlineExceeded(f"{label} call exceeded its deadline")
+                for f in done:
+                    if f.exception() is None:
+                        if f is not primary:
+                            self._count("hedge_wins")
+                        return f.result()
+                    last_error = f.exception()
+            raise last_error
+        finally:
+            for f in pending:  # losers and timed-out requests release their slot on cancel
+                f.cancel()
+
+    # -- streaming -------------------------------------------------------------------
+
+    def stream(self, label: str, iterator_fn: Callable[[], Any], prompt=None, timeout: Optional[float] = None):
+        """Admits a streamed call and holds its slot until the stream is exhausted;
+        streams are neither retried nor hedged once chunks may have been emitted."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimate = _estimate_tokens(prompt or "", self.max_output_tokens)
+        self._count("calls")
+        self._admit(estimate, deadline)
+        started = time.monotonic()
+        try:
+            _request_sent()
+            yield from iterator_fn()
+        finally:
+            self._release(label, estimate, started, result=True)
+
+    async def astream(self, label: str, iterator_fn: Callable[[], Any], prompt=None, timeout: Optional[float] = None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimate = _estimate_tokens(prompt or "", self.max_output_tokens)
+        self._count("calls")
+        await self._aadmit(estimate, deadline)
+        started = time.monotonic()
+        try:
+            _request_sent()
+            async for chunk in iterator_fn():
+                yield chunk
+        finally:
+            self._release(label, estimate, started, result=True)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            s = dict(self._stats)
+            latency = {label: sorted(v) for label, v in self._latency.items()}
+        s["avg_queued_ms"] = round(1000 * s["queued_s"] / s["calls"], 1) if s["calls"] else 0.0
+        s["max_queued_ms"] = round(1000 * s.pop("max_queued_s"), 1)
+        s.pop("queued_s")
+        s["hedge_win_rate"] = round(s["hedge_wins"] / s["hedges"], 3) if s["hedges"] else 0.0
+        s["p95_ms"] = {label: round(1000 * v[min(len(v) - 1, int(0.95 * len(v)))], 1) for label, v in latency.items() if v}
+        return s
+
+
+class ScheduledLLM:
+    """Chat model wrapper that sends invoke/ainvoke/stream/astream through an LLMScheduler.
+
+    with_structured_output() returns a wrapper labelled with the schema name, so
+    calls with schemas in scheduler.hedge_labels are hedged. Other attributes
+    (model_name, ...) pass through to the wrapped model.
+    """
+
+    def __init__(self, llm, scheduler: LLMScheduler, label: str = "text"):
+        self._llm = llm
+        self.scheduler = scheduler
+        self.label = label
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+    def with_structured_output(self, schema, **kwargs) -> "ScheduledLLM":
+        return ScheduledLLM(self._llm.with_structured_output(schema, **kwargs), self.scheduler,
+                            getattr(schema, "__name__", "structured"))
+
+    def invoke(self, prompt, config=None, **kwargs):
+        return self.scheduler.call(self.label, lambda: self._llm.invoke(prompt, config, **kwargs), prompt)
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        return await self.scheduler.acall(self.label, lambda: self._llm.ainvoke(prompt, config, **kwargs), prompt)
+
+    def stream(self, prompt, config=None, **kwargs):
+        return self.scheduler.stream(self.label, lambda: self._llm.stream(prompt, config, **kwargs), prompt)
+
+    def astream(self, prompt, config=None, **kwargs):
+        return self.scheduler.astream(self.label, lambda: self._llm.astream(prompt, config, **kwargs), prompt)
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler: every Groq model in the process shares one account's limits.
+    LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_TIMEOUT, LLM_MAX_RETRIES and
+    LLM_HEDGE_AFTER (seconds, 0 disables hedging) override the defaults."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                rpm=float(os.getenv("LLM_RPM") or 30),
+                tpm=float(os.getenv("LLM_TPM") or 8000),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY") or 8),
+                timeout=float(os.getenv("LLM_TIMEOUT") or 20.0),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES") or 2),
+                hedge_after=float(os.getenv("LLM_HEDGE_AFTER") or 1.0),
+            )
+        return _scheduler
@@ -0,0 +1,138 @@
+import io
+import time
+import wave
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+TARGET_RATE = 16000
+FRAME_MS = 20
+
+
+@dataclass
+class PreprocessResult:
+    audio: bytes
+    filename: str
+    bytes_in: int
+    bytes_out: int
+    duration_in: float
+    duration_out: float
+    elapsed_ms: float
+    changed: bool = True
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """PCM WAV bytes -> (float32 array shaped [frames, channels] in -1..1, sample rate)."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        pcm = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        pcm = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        pcm = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        pcm = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+    return pcm.reshape(-1, channels), rate
+
+
+def encode_wav(pcm: np.ndarray, rate: int) -> bytes:
+    ints = (np.clip(pcm, -1.0, 1.0) * 32767.0).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(ints.tobytes())
+    return buf.getvalue()
+
+
+def frame_rms_db(mono: np.ndarray, rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """Per-frame RMS level in dBFS (vectorized over non-overlapping frames)."""
+    n = max(1, int(rate * frame_ms / 1000))
+    frames = len(mono) // n
+    if frames == 0:
+        return np.array([20 * np.log10(np.sqrt(np.mean(mono ** 2)) + 1e-10)])
+    blocks = mono[: frames * n].reshape(frames, n)
+    return 20 * np.log10(np.sqrt(np.mean(blocks ** 2, axis=1)) + 1e-10)
+
+
+def voiced_bounds(mono: np.ndarray, rate: int, floor_db: float = -50.0, range_db: float = 35.0,
+                  pad_ms: int = 150, frame_ms: int = FRAME_MS) -> Tuple[int, int]:
+    """Sample range [start, end) spanning the first to last voiced frame, padded.
+
+    A frame is voiced when it is above floor_db and within range_db of the loudest
+    frame. Returns the full range when nothing qualifies, so quiet input is never dropped.
+    """
+    levels = frame_rms_db(mono, rate, frame_ms)
+    threshold = max(floor_db, float(levels.max()) - range_db)
+    voiced = np.flatnonzero(levels > threshold)
+    if voiced.size == 0:
+        return 0, len(mono)
+    n = max(1, int(rate * frame_ms / 1000))
+    pad = int(rate * pad_ms / 1000)
+    start = max(0, int(voiced[0]) * n - pad)
+    end = min(len(mono), (int(voiced[-1]) + 1) * n + pad)
+    return start, end
+
+
+def resample(mono: np.ndarray, rate: int, target: int = TARGET_RATE) -> np.ndarray:
+    if rate == target or len(mono) == 0:
+        return mono
+    if rate > target:
+        # Windowed-sinc low-pass at the new Nyquist before decimating
+        cutoff = target / rate / 2.0
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        mono = np.convolve(mono, kernel / kernel.sum(), mode="same")
+    out_len = int(round(len(mono) * target / rate))
+    src_t = np.arange(len(mono)) / rate
+    dst_t = np.arange(out_len) / target
+    return np.interp(dst_t, src_t, mono).astype(np.float32)
+
+
+class AudioPreprocessor:
+    """Pre-STT stage: VAD silence trim, downmix, resample to 16 kHz mono WAV.
+
+    Input that cannot be decoded as PCM WAV is passed through unchanged.
+    """
+
+    def __init__(self, target_rate: int = TARGET_RATE, trim_silence: bool = True):
+        self.target_rate = target_rate
+        self.trim_silence = trim_silence
+
+    def process(self, wav_bytes: bytes) -> PreprocessResult:
+        t0 = time.perf_counter()
+        try:
+            pcm, rate = decode_wav(wav_bytes)
+        except Exception:
+            return PreprocessResult(wav_bytes, "audio.wav", len(wav_bytes), len(wav_bytes), 0.0, 0.0,
+                                    (time.perf_counter() - t0) * 1000, changed=False)
+        duration_in = len(pcm) / rate if rate else 0.0
+        mono = pcm.mean(axis=1) if pcm.shape[1] > 1 else pcm[:, 0]
+        if self.trim_silence and len(mono):
+            start, end = voiced_bounds(mono, rate)
+            mono = mono[start:end]
+        mono = resample(mono, rate, self.target_rate)
+
+        audio = encode_wav(mono, self.target_rate)
+        return PreprocessResult(
+            audio=audio,
+            filename="audio.wav",
+            bytes_in=len(wav_bytes),
+            bytes_out=len(audio),
+            duration_in=duration_in,
+            duration_out=len(mono) / self.target_rate,
+            elapsed_ms=(time.perf_counter() - t0) * 1000,
+        )
@@ -0,0 +1,132 @@
+"""Precision/recall and speed of the rule-based entity extractor on labelled utterances.
+
+    python -m src.langgraphagenticai.bench.entities --repeat 2000 --out entity_results.json
+
+A prediction counts as correct only when both key and normalized value match the
+label. Relative dates are resolved against a fixed reference day so the labels stay
+valid. The speed figure is the mean extraction time per utterance over all samples.
+"""
+import argparse
+import json
+import time
+from datetime import date
+from typing import Dict, List, Tuple
+
+from src.langgraphagenticai.bench.replay import git_revision
+from src.langgraphagenticai.nodes.entity_extractor import EntityExtractor
+
+REFERENCE_DAY = date(2025, 11, 16)
+
+# (utterance as it reaches nlu_node, i.e. lower-cased STT text; expected entities)
+LABELLED_SAMPLES: List[Tuple[str, Dict[str, str]]] = [
+    ("hi, my last bill is unusually high. can you check charges for account 9988776655?",
+     {"account_number": "9988776655"}),
+    ("i did a 299 recharge yesterday but data is not working.", {"recharge_amount": "299", "date": "2025-11-15"}),
+    ("the 100 rupees top up is still not activated.", {"recharge_amount": "100"}),
+    ("i did a ₹399 recharge on 12/11/2025 and still no data", {"recharge_amount": "399", "date": "2025-11-12"}),
+    ("recharge of rs. 1,499.00 done two days ago, data pack not active",
+     {"recharge_amount": "1499", "date": "2025-11-14"}),
+    ("my account number is 98765 43210 and i was charged 500 rupees extra",
+     {"account_number": "9876543210", "amount": "500"}),
+    ("a/c no: 1234-5678-90 shows double payment on 3rd november", {"account_number": "1234567890", "date": "2025-11-03"}),
+    ("i get no signal at home in indiranagar.", {"location": "Indiranagar"}),
+    ("there is no network coverage in whitefield near the tower.", {"location": "Whitefield"}),
+    ("no bars at all in my office in navi mumbai since last monday", {"location": "Navi Mumbai", "date": "2025-11-10"}),
+    ("network is gone in bangalore since yesterday", {"location": "Bengaluru", "date": "2025-11-15"}),
+    ("my iphone 13 pro max shows invalid sim", {"device_model": "iPhone 13 Pro Max"}),
+    ("sim not working on samsung galaxy s23 ultra, error code e-102",
+     {"device_model": "Samsung Galaxy S23 Ultra", "error_code": "E-102"}),
+    ("redmi note 12 pro says sim not registered", {"device_model": "Redmi Note 12 Pro"}),
+    ("calls keep dropping on my oneplus 11 in pune", {"device_model": "OnePlus 11", "location": "Pune"}),
+    ("videos keep buffering and speed is below 1 mbps.", {}),
+    ("my internet is very slow today.", {"date": "2025-11-16"}),
+    ("browsing shows error 503 every evening", {"error_code": "503"}),
+    ("getting err_connection_reset on chrome", {}),
+    ("calls disconnect after a few seconds every time.", {}),
+    ("frequent call drops at home in koramangala on my pixel 7", {"location": "Koramangala", "device_model": "Pixel 7"}),
+    ("the phone says invalid sim card after i inserted it.", {}),
+    ("i paid the bill on nov 10 but it still shows due", {"date": "2025-11-10"}),
+    ("data not working after the 239 plan recharge on 2025-11-01",
+     {"recharge_amount": "239", "date": "2025-11-01"}),
+    ("mobile number 9123456780 has no service in hyderabad", {"account_number": "9123456780", "location": "Hyderabad"}),
+    ("i was charged twice for the same payment this month.", {}),
+    ("speed dropped to 2 mbps in gurgaon 3 days ago", {"location": "Gurugram", "date": "2025-11-13"}),
+    ("top up of rs 199 on my vivo y20 not reflecting", {"recharge_amount": "199", "device_model": "Vivo Y20"}),
+    ("please wait 5 hours they said, still nothing", {}),
+    ("call drops in chennai, error code 0x1f on my nokia", {"location": "Chennai", "error_code": "0X1F",
+                                                          "device_model": "Nokia"}),
+    # "may" / "mar" as ordinary words are not dates
+    ("i may 2 times restart the phone, still no signal", {}),
+    ("recharge of 299 on the 3rd of may, data still off", {"recharge_amount": "299", "date": "2025-05-03"}),
+    # Known gaps, kept so the report shows them: number words, bare ordinals, promo codes
+    ("i recharged two hundred rupees but data is off", {"recharge_amount": "200"}),
+    ("it has been broken since the 5th", {"date": "2025-11-05"}),
+    ("paid 249 for the monthly plan, nothing works", {"recharge_amount": "249"}),
+    ("promo code 4455 did not apply on my bill", {}),
+]
+
+
+def evaluate(extractor: EntityExtractor, samples=LABELLED_SAMPLES, today: date = REFERENCE_DAY) -> dict:
+    per_field: Dict[str, Dict[str, int]] = {}
+    errors = []
+    for text, expected in samples:
+        predicted = extractor.extract(text, today)
+        for key in set(expected) | set(predicted):
+            f = per_field.setdefault(key, {"tp": 0, "fp": 0, "fn": 0})
+            if key in expected and predicted.get(key) == expected[key]:
+                f["tp"] += 1
+                continue
+            if key in predicted:
+                f["fp"] += 1
+            if key in expected:
+                f["fn"] += 1
+            errors.append({"text": text, "field": key, "expected": expected.get(key), "predicted": predicted.get(key)})
+
+    def prf(c: Dict[str, int]) -> Dict[str, float]:
+        p = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 1.0
+        r = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 1.0
+        return {**c, "precision": round(p, 4), "recall": round(r, 4),
+                "f1": round(2 * p * r / (p + r), 4) if p + r else 0.0}
+
+    total = {k: sum(c[k] for c in per_field.values()) for k in ("tp", "fp", "fn")}
+    return {"fields": {k: prf(c) for k, c in sorted(per_field.items())}, "overall": prf(total), "errors": errors}
+
+
+def time_extraction(extractor: EntityExtractor, samples=LABELLED_SAMPLES, repeat: int = 1000,
+                    today: date = REFERENCE_DAY) -> float:
+    """Mean microseconds per extract() call."""
+    texts = [t for t, _ in samples]
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            extractor.extract(text, today)
+    return (time.perf_counter() - t0) / (repeat * len(texts)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rule-based entity extractor: precision/recall and speed")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    extractor = EntityExtractor()
+    report = evaluate(extractor)
+    report["samples"] = len(LABELLED_SAMPLES)
+    report["us_per_utterance"] = round(time_extraction(extractor, repeat=args.repeat), 2)
+    report["revision"] = git_revision()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    for field, s in report["fields"].items():
+        print(f"  {field:16s} P={s['precision']:.2f} R={s['recall']:.2f} F1={s['f1']:.2f} "
+              f"(tp={s['tp']} fp={s['fp']} fn={s['fn']})")
+    o = report["overall"]
+    print(f"overall P={o['precision']:.2f} R={o['recall']:.2f} F1={o['f1']:.2f} on {report['samples']} utterances")
+    print(f"{report['us_per_utterance']} µs per utterance")
+    for e in report["errors"]:
+        print(f"  miss {e['field']}: expected {e['expected']!r} got {e['predicted']!r} <- {e['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.langgraphagenticai.nodes.intent_classifier import KeywordIntentClassifier
+from src.langgraphagenticai.nodes.nodes import (
+    DEFAULT_EVIDENCE_SCALE, DEFAULT_INTENT, INTENT_ACTION_LABELS, INTENT_KEYWORDS,
+)
+from src.langgraphagenticai.state.state import FusedTurnOutput, NLUOutput
+
+
+class LatencyModel:
+    """Log-normal latency: median seconds and sigma (spread); sigma=0 gives a fixed delay."""
+
+    def __init__(self, median: float = 0.0, sigma: float = 0.0, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            return self.median * math.exp(self.sigma * self._rng.gauss(0.0, 1.0))
+
+
+_USER_INPUT = re.compile(r'User Input: "(.*?)"', re.S)
+
+
+def user_input(prompt) -> str:
+    """Pulls the quoted User Input line back out of a node prompt (str or message list)."""
+    text = prompt if isinstance(prompt, str) else " ".join(str(getattr(m, "content", m)) for m in prompt)
+    m = _USER_INPUT.search(text)
+    return m.group(1) if m else text
+
+
+class FakeStructuredLLM:
+    def __init__(self, parent: "FakeChatGroq", schema):
+        self.parent = parent
+        self.schema = schema
+
+    def _build(self, prompt):
+        text = user_input(prompt)
+        intent = self.parent.intent_fn(text)
+        if self.schema is FusedTurnOutput:
+            return FusedTurnOutput(
+                intent=intent, confidence=0.9, entities={},
+                customer_message=self.parent.customer_message(intent),
+                action_label=INTENT_ACTION_LABELS[intent][0], internal_note="replay: canned fused output",
+            )
+        return NLUOutput(intent=intent, confidence=0.9, entities={}, notes="replay: canned")
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.parent._calls("structured")
+        time.sleep(self.parent.structured_latency.sample())
+        return self._build(prompt)
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        self.parent._calls("structured")
+        await asyncio.sleep(self.parent.structured_latency.sample())
+        return self._build(prompt)
+
+
+class FakeChatGroq:
+    """Deterministic stand-in for ChatGroq: invoke/stream/ainvoke/astream and
+    with_structured_output(NLUOutput | FusedTurnOutput), with sampled latency.
+
+    Intents come from intent_fn (the local keyword classifier by default), scripts
+    are canned three-line responses per intent.
+    """
+
+    def __init__(self, text_latency: Optional[LatencyModel] = None, structured_latency: Optional[LatencyModel] = None,
+                 intent_fn: Optional[Callable[[str], str]] = None, model_name: str = "fake/replay",
+                 stream_chunk_words: int = 3):
+        self.text_latency = text_latency or LatencyModel()
+        self.structured_latency = structured_latency or LatencyModel()
+        classifier = KeywordIntentClassifier(INTENT_KEYWORDS, default_intent=DEFAULT_INTENT,
+                                             evidence_scale=DEFAULT_EVIDENCE_SCALE)
+        self.intent_fn = intent_fn or (lambda text: str(classifier.predict(text).intent))
+        self.model_name = model_name
+        self.stream_chunk_words = stream_chunk_words
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {"text": 0, "structured": 0}
+
+    def _calls(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+
+    @staticmethod
+    def customer_message(intent: str) -> str:
+        return f"We have logged your {intent.lower()} complaint. Ticket created — resolution within 48 hours."
+
+    def _script(self, prompt) -> str:
+        intent = self.intent_fn(user_input(prompt))
+        return "\n".join([self.customer_message(intent), INTENT_ACTION_LABELS[intent][0], "replay: canned script"])
+
+    def with_structured_output(self, schema, **kwargs):
+        return FakeStructuredLLM(self, schema)
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self._calls("text")
+        time.sleep(self.text_latency.sample())
+        return AIMessage(content=self._script(prompt))
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        self._calls("text")
+        await asyncio.sleep(self.text_latency.sample())
+        return AIMessage(content=self._script(prompt))
+
+    def _chunks(self, prompt):
+        words = re.split(r"(\s+)", self._script(prompt))
+        step = self.stream_chunk_words * 2
+        return ["".join(words[i:i + step]) for i in range(0, len(words), step)]
+
+    def stream(self, prompt, config=None, **kwargs):
+        self._calls("text")
+        chunks = self._chunks(prompt)
+        delay = self.text_latency.sample() / max(1, len(chunks))
+        for c in chunks:
+            time.sleep(delay)
+            yield AIMessageChunk(content=c)
+
+    async def astream(self, prompt, config=None, **kwargs):
+        self._calls("text")
+        chunks = self._chunks(prompt)
+        delay = self.text_latency.sample() / max(1, len(chunks))
+        for c in chunks:
+            await asyncio.sleep(delay)
+            yield AIMessageChunk(content=c)
@@ -0,0 +1,297 @@
+"""Concurrent synthetic load generator for the STT -> graph -> log pipeline.
+
+    python -m src.langgraphagenticai.bench.loadgen --levels 1,4,16,64 --workers 8 --pool thread \
+        --stt-median 0.3 --llm-median 0.4 --nlu-median 0.3 --out load_results.json --csv load_results.csv
+
+Each simulated caller starts a call (generate_call_id) and sends synthetic utterances
+for the six intents. Every turn is queued on a shared thread or process pool of
+--workers. There it goes through STT (a local StubSTTBackend over synthetic WAV),
+preprocess_node -> nlu_node -> domain node (FakeChatGroq), and is logged to disk;
+callers end (journal end + compact) their call after the last turn.
+Concurrency is ramped over --levels, and each level reports throughput, queueing
+delay and per-stage tail latency.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import wave
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.langgraphagenticai.bench.fake_llm import FakeChatGroq, LatencyModel
+from src.langgraphagenticai.bench.replay import TimedGraph, git_revision, summarize
+from src.langgraphagenticai.graph.graph_builder import DOMAIN_NODES, GraphBuilder
+from src.langgraphagenticai.LLMS.scheduler import LLMScheduler, ScheduledLLM
+from src.langgraphagenticai.nodes.nodes import DEFAULT_NLU_THRESHOLD
+from src.langgraphagenticai.storage.journal import CallJournal
+from src.langgraphagenticai.stt.engine import STTEngine, StubSTTBackend
+from src.langgraphagenticai.utils.call_utils import extract_script_text, generate_call_id
+
+SYNTHETIC_UTTERANCES: Dict[str, List[str]] = {
+    "Billing Issue": [
+        "Hi, my last bill is unusually high. Can you check charges for account 9988776655?",
+        "I was charged twice for the same payment this month.",
+        "Why is there an extra amount on my invoice?",
+    ],
+    "SIM Not Working": [
+        "My SIM is not working since morning, it shows no service.",
+        "The phone says invalid SIM card after I inserted it.",
+        "SIM not registered on network, what should I do?",
+    ],
+    "No Network Coverage": [
+        "There is no network coverage in my area near the tower.",
+        "I get no signal at home in Indiranagar.",
+        "No bars at all in my office building.",
+    ],
+    "Internet Speed Slow": [
+        "My internet is very slow today.",
+        "Videos keep buffering and speed is below 1 mbps.",
+        "Browsing is lagging badly in the evening.",
+    ],
+    "Data Not Working After Recharge": [
+        "I did a 299 recharge yesterday but data is not working.",
+        "The 100 rupees top up is still not activated.",
+        "Data pack not active after recharge.",
+    ],
+    "Call Drops Frequently": [
+        "My calls keep dropping mid call.",
+        "Calls disconnect after a few seconds every time.",
+        "Frequent call drops at home.",
+    ],
+}
+
+STAGES = ["queue", "stt", "preprocess_node", "nlu_node", "domain", "log", "service", "end_to_end"]
+
+
+def synth_wav(text: str, rate: int = 16000) -> bytes:
+    """Deterministic speech-like WAV for an utterance (~0.3 s per word, with silence
+    padding). The tone depends on the text, so every utterance has distinct bytes."""
+    seconds = 0.3 * max(1, len(text.split()))
+    t = np.arange(int(rate * seconds)) / rate
+    freq = 180.0 + (zlib.crc32(text.encode("utf-8")) % 200)
+    voice = 0.3 * np.sin(2 * np.pi * freq * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3.0 * t))
+    pad = np.zeros(int(rate * 0.4))
+    pcm = (np.concatenate((pad, voice, pad)) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+# Per-worker pipeline (module globals so process-pool workers can build their own)
+_pipeline: Optional[dict] = None
+_pipeline_lock = threading.Lock()
+
+
+def _init_pipeline(config: dict) -> None:
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            return
+        seed = config["seed"] + os.getpid()
+        utterances = [u for us in SYNTHETIC_UTTERANCES.values() for u in us]
+        backend = StubSTTBackend(responses={synth_wav(u): u for u in utterances})
+        stt_latency = LatencyModel(config["stt_median"], config["stt_sigma"], seed=seed)
+        llm = FakeChatGroq(
+            text_latency=LatencyModel(config["llm_median"], config["llm_sigma"], seed=seed + 1),
+            structured_latency=LatencyModel(config["nlu_median"], config["nlu_sigma"], seed=seed + 2),
+        )
+        if config.get("schedule"):
+            # One scheduler per worker process; with --pool thread all callers share it
+            llm = ScheduledLLM(llm, LLMScheduler(rpm=config["llm_rpm"], tpm=config["llm_tpm"],
+                                                 max_concurrency=config["llm_concurrency"],
+                                                 hedge_after=config["hedge_after"]))
+        gb = GraphBuilder(llm, nlu_threshold=config["nlu_threshold"], mode=config["mode"],
+                          cache_scripts=config["cache_scripts"])
+        gb.call_center_build_graph()
+        _pipeline = {
+            "engine": STTEngine(backend),
+            "stt_latency": stt_latency,
+            "graph": TimedGraph(gb.setup_graph()),
+            "journal": CallJournal(config["log_dir"]),
+            "scheduler": getattr(llm, "scheduler", None),
+        }
+
+
+def process_turn(call_id: str, transcript: List[dict], wav_bytes: bytes, enqueued_at: float, config: dict) -> dict:
+    """One caller turn on a pool worker; returns per-stage timings in seconds."""
+    started = time.time()
+    _init_pipeline(config)
+    p = _pipeline
+    timings = {"queue": started - enqueued_at}
+
+    t0 = time.perf_counter()
+    time.sleep(p["stt_latency"].sample())  # simulated network/model time of the STT backend
+    text = p["engine"].transcribe(wav_bytes)
+    timings["stt"] = time.perf_counter() - t0
+
+    transcript = transcript + [{"speaker": "user", "text": text, "ts": time.time()}]
+    final, samples = p["graph"].run_timed(call_id, transcript)
+    for node, dt in samples:
+        stage = "domain" if node in DOMAIN_NODES else node
+        timings[stage] = timings.get(stage, 0.0) + dt
+
+    t0 = time.perf_counter()
+    final["script"] = extract_script_text(final.get("script", ""))
+    new_entries = [transcript[-1], {"speaker": "agent", "text": final["script"], "ts": time.time()}]
+    final["transcript"] = transcript + new_entries[1:]
+    p["journal"].append_turn(call_id, final, new_entries=new_entries)
+    timings["log"] = time.perf_counter() - t0
+
+    finished = time.time()
+    timings["service"] = finished - started
+    timings["end_to_end"] = finished - enqueued_at
+    return {"timings": timings, "intent": final.get("intent"), "text": text, "script": final["script"]}
+
+
+def end_call(call_id: str, config: dict) -> None:
+    """Hangs up: journals the end event and compacts the call, as End Call does in the app."""
+    _init_pipeline(config)
+    _pipeline["journal"].end(call_id, [{"speaker": "system", "text": "Call ended by user.", "ts": time.time()}])
+
+
+def _caller(idx: int, pool: Executor, turns: int, think_time: float, config: dict, results: list,
+            lock: threading.Lock) -> None:
+    rng = random.Random(config["seed"] * 1000 + idx)
+    call_id = generate_call_id()
+    transcript: List[dict] = []
+    for _ in range(turns):
+        intent = rng.choice(list(SYNTHETIC_UTTERANCES))
+        utterance = rng.choice(SYNTHETIC_UTTERANCES[intent])
+        fut = pool.submit(process_turn, call_id, transcript, synth_wav(utterance), time.time(), config)
+        out = fut.result()
+        out["expected_intent"] = intent
+        transcript = transcript + [
+            {"speaker": "user", "text": out["text"], "ts": time.time()},
+            {"speaker": "agent", "text": out["script"], "ts": time.time()},
+        ]
+        with lock:
+            results.append(out)
+        if think_time:
+            time.sleep(rng.uniform(0.5, 1.5) * think_time)
+    pool.submit(end_call, call_id, config).result()
+
+
+def run_level(callers: int, workers: int, pool_kind: str, turns: int, think_time: float, config: dict) -> dict:
+    pool_cls = ProcessPoolExecutor if pool_kind == "process" else ThreadPoolExecutor
+    results: list = []
+    lock = threading.Lock()
+    with pool_cls(max_workers=workers) as pool:
+        # Warm every worker so pipeline construction is not measured as latency
+        list(pool.map(_init_pipeline, [config] * workers))
+        threads = [threading.Thread(target=_caller, args=(i, pool, turns, think_time, config, results, lock))
+                   for i in range(callers)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+
+    stages = {s: summarize([r["timings"][s] for r in results if s in r["timings"]]) for s in STAGES}
+    agree = sum(1 for r in results if r["intent"] == r["expected_intent"])
+    return {
+        "callers": callers,
+        "workers": workers,
+        "pool": pool_kind,
+        "turns": len(results),
+        "wall_s": round(wall, 4),
+        "throughput_tps": round(len(results) / wall, 3) if wall else 0.0,
+        "intent_accuracy": round(agree / len(results), 4) if results else 0.0,
+        "stages": stages,
+    }
+
+
+def run_load(levels: List[int], workers: int, pool_kind: str, turns: int, think_time: float, config: dict) -> dict:
+    report = {"revision": git_revision(), "timestamp": time.time(), "config": dict(config), "levels": []}
+    for callers in levels:
+        report["levels"].append(run_level(callers, workers, pool_kind, turns, think_time, config))
+    best = max(report["levels"], key=lambda l: l["throughput_tps"]) if report["levels"] else None
+    if pool_kind == "thread" and _pipeline is not None and _pipeline["scheduler"] is not None:
+        report["llm_scheduler"] = _pipeline["scheduler"].stats()
+    report["saturation"] = {
+        "throughput_tps": best["throughput_tps"] if best else 0.0,
+        "at_callers": best["callers"] if best else 0,
+    }
+    return report
+
+
+def write_csv(report: dict, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["pool", "workers", "callers", "turns", "throughput_tps", "stage",
+                    "mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+        for level in report["levels"]:
+            for stage, s in level["stages"].items():
+                w.writerow([level["pool"], level["workers"], level["callers"], level["turns"],
+                            level["throughput_tps"], stage, s["mean_ms"], s["p50_ms"], s["p95_ms"], s["p99_ms"]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic concurrent load test for STT -> graph -> log")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrent caller counts")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--turns", type=int, default=5, help="turns per caller")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a caller's turns (s)")
+    parser.add_argument("--mode", default="standard")
+    parser.add_argument("--nlu-threshold", type=float, default=DEFAULT_NLU_THRESHOLD)
+    parser.add_argument("--stt-median", type=float, default=0.0)
+    parser.add_argument("--stt-sigma", type=float, default=0.0)
+    parser.add_argument("--llm-median", type=float, default=0.0)
+    parser.add_argument("--llm-sigma", type=float, default=0.0)
+    parser.add_argument("--nlu-median", type=float, default=0.0)
+    parser.add_argument("--nlu-sigma", type=float, default=0.0)
+    parser.add_argument("--cache-scripts", action="store_true")
+    parser.add_argument("--schedule", action="store_true", help="route LLM calls through an LLMScheduler")
+    parser.add_argument("--llm-rpm", type=float, default=6000)
+    parser.add_argument("--llm-tpm", type=float, default=10_000_000)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--hedge-after", type=float, default=1.0, help="NLU hedge delay until p95 is known (0 = off)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-dir", default=None, help="where turn logs go (default: a temp dir)")
+    parser.add_argument("--out", default="load_results.json")
+    parser.add_argument("--csv", default=None)
+    args = parser.parse_args()
+
+    config = {
+        "mode": args.mode, "nlu_threshold": args.nlu_threshold, "cache_scripts": args.cache_scripts,
+        "stt_median": args.stt_median, "stt_sigma": args.stt_sigma,
+        "llm_median": args.llm_median, "llm_sigma": args.llm_sigma,
+        "nlu_median": args.nlu_median, "nlu_sigma": args.nlu_sigma,
+        "schedule": args.schedule, "llm_rpm": args.llm_rpm, "llm_tpm": args.llm_tpm,
+        "llm_concurrency": args.llm_concurrency, "hedge_after": args.hedge_after,
+        "seed": args.seed, "log_dir": args.log_dir or tempfile.mkdtemp(prefix="loadgen-"),
+    }
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    report = run_load(levels, args.workers, args.pool, args.turns, args.think_time, config)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(report, args.csv)
+
+    for level in report["levels"]:
+        q, e = level["stages"]["queue"], level["stages"]["end_to_end"]
+        print(f"callers={level['callers']:4d} tps={level['throughput_tps']:8.2f} "
+              f"queue p95={q['p95_ms']:.1f}ms e2e p50={e['p50_ms']:.1f}ms p99={e['p99_ms']:.1f}ms")
+    if "llm_scheduler" in report:
+        ls = report["llm_scheduler"]
+        print(f"llm: avg queue {ls['avg_queued_ms']}ms max {ls['max_queued_ms']}ms, "
+              f"{ls['retries']} retries, {ls['hedge_wins']}/{ls['hedges']} hedge wins")
+    print(f"saturation: {report['saturation']['throughput_tps']} turns/s at {report['saturation']['at_callers']} callers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Fits the local intent classifier's evidence_scale and the LLM threshold.
+
+    python -m src.langgraphagenticai.bench.nlu_calibration --log-dir call_logs --out nlu_calibration.json
+
+Labelled utterances are LABELLED_UTTERANCES below plus the last caller turn of each
+logged call (labelled with the call's logged intent). evidence_scale is chosen by
+Brier score of confidence against "local intent is correct". The threshold is the
+lowest one at which local answers reach --precision on the labelled set, raised if
+needed so that no single keyword on its own clears it. Copy the printed values into
+DEFAULT_EVIDENCE_SCALE and DEFAULT_NLU_THRESHOLD (nodes/nodes.py).
+"""
+import argparse
+import json
+from typing import Dict, List, Optional, Tuple
+
+from src.langgraphagenticai.bench.replay import git_revision, load_turns
+from src.langgraphagenticai.nodes.intent_classifier import KeywordIntentClassifier
+from src.langgraphagenticai.nodes.nodes import DEFAULT_INTENT, INTENT_KEYWORDS
+
+# (utterance, intent); None marks text no local answer should claim
+LABELLED_UTTERANCES: List[Tuple[str, Optional[str]]] = [
+    ("my last bill is unusually high, please check the charges", "Billing Issue"),
+    ("i was charged twice for the same payment this month", "Billing Issue"),
+    ("there is a wrong amount on my invoice", "Billing Issue"),
+    ("you overcharged me on my postpaid bill", "Billing Issue"),
+    ("i paid the bill but it still shows due", "Billing Issue"),
+    ("please refund the extra deduction from my account", "Billing Issue"),
+    ("why is my bill so high", "Billing Issue"),
+    ("my phone shows invalid sim", "SIM Not Working"),
+    ("sim not registered on network after i inserted it", "SIM Not Working"),
+    ("the sim card is not working, only emergency calls only", "SIM Not Working"),
+    ("new sim shows no service", "SIM Not Working"),
+    ("my sim stopped working", "SIM Not Working"),
+    ("there is no network coverage at my home", "No Network Coverage"),
+    ("no signal at all in my office, zero bars", "No Network Coverage"),
+    ("i am always out of range near the tower", "No Network Coverage"),
+    ("no network since morning", "No Network Coverage"),
+    ("signal is very weak in my area", "No Network Coverage"),
+    ("internet is very slow today", "Internet Speed Slow"),
+    ("videos keep buffering and speed is below 1 mbps", "Internet Speed Slow"),
+    ("browsing is laggy and pages keep loading", "Internet Speed Slow"),
+    ("my internet speed dropped badly", "Internet Speed Slow"),
+    ("download speeds are really slow", "Internet Speed Slow"),
+    ("i did a recharge yesterday but data is not working", "Data Not Working After Recharge"),
+    ("the 100 rupees top up is still not activated", "Data Not Working After Recharge"),
+    ("data pack not active after recharging", "Data Not Working After Recharge"),
+    ("recharged my plan but no data", "Data Not Working After Recharge"),
+    ("calls keep dropping every few minutes", "Call Drops Frequently"),
+    ("frequent call drops at home", "Call Drops Frequently"),
+    ("my calls disconnect mid-call", "Call Drops Frequently"),
+    ("the call keeps cutting and gets cut off", "Call Drops Frequently"),
+    ("calls disconnect after a few seconds every time", "Call Drops Frequently"),
+    # One keyword, no corroboration: the LLM should decide
+    ("similar problem as yesterday", None),
+    ("i simply need help with my account", None),
+    ("the company made a billion in profit and i have a problem", None),
+    ("can you help me with something", None),
+    ("i want to talk about my plan", None),
+    ("the signal thing again", None),
+    ("i called earlier about the same thing", None),
+    ("please check my data", None),
+    ("i need a payment receipt", None),
+    ("i dropped my phone and now it is weird", None),
+]
+
+
+def labelled_samples(log_dir: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    samples = list(LABELLED_UTTERANCES)
+    if log_dir:
+        for turn in load_turns(log_dir):
+            if turn["expected_intent"]:
+                samples.append((turn["transcript"][-1]["text"].lower(), turn["expected_intent"]))
+    return samples
+
+
+def _outcomes(classifier: KeywordIntentClassifier, samples) -> List[Tuple[float, bool]]:
+    out = []
+    for text, label in samples:
+        pred = classifier.predict(text)
+        out.append((pred.confidence, label is not None and pred.intent == label))
+    return out
+
+
+def single_keyword_ceiling(classifier: KeywordIntentClassifier) -> float:
+    """Highest confidence any one keyword reaches on its own."""
+    top = max(w for kws in INTENT_KEYWORDS.values() for _, w in kws)
+    return classifier.confidence(top, 0.0)
+
+
+def fit(samples, scales=None, thresholds=None, precision: float = 0.95) -> Dict:
+    scales = scales or [round(1.0 + 0.25 * i, 2) for i in range(29)]
+    thresholds = thresholds or [round(0.5 + 0.01 * i, 2) for i in range(50)]
+    fits = []
+    for scale in scales:
+        outcomes = _outcomes(KeywordIntentClassifier(INTENT_KEYWORDS, DEFAULT_INTENT, evidence_scale=scale), samples)
+        brier = sum((conf - float(ok)) ** 2 for conf, ok in outcomes) / len(outcomes)
+        fits.append((brier, scale))
+    brier, scale = min(fits)
+    classifier = KeywordIntentClassifier(INTENT_KEYWORDS, DEFAULT_INTENT, evidence_scale=scale)
+    outcomes = _outcomes(classifier, samples)
+    ceiling = single_keyword_ceiling(classifier)
+
+    chosen = None
+    for t in thresholds:
+        local = [ok for conf, ok in outcomes if conf >= t]
+        if local and sum(local) / len(local) >= precision and t > ceiling:
+            chosen = t
+            break
+    chosen = chosen if chosen is not None else thresholds[-1]
+    local = [ok for conf, ok in outcomes if conf >= chosen]
+    return {
+        "evidence_scale": scale,
+        "brier": round(brier, 4),
+        "threshold": chosen,
+        "single_keyword_ceiling": round(ceiling, 4),
+        "local_coverage": round(len(local) / len(outcomes), 4),
+        "local_precision": round(sum(local) / len(local), 4) if local else 1.0,
+        "samples": len(outcomes),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit local NLU confidence and threshold on labelled utterances")
+    parser.add_argument("--log-dir", default="call_logs")
+    parser.add_argument("--precision", type=float, default=0.95)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    report = fit(labelled_samples(args.log_dir), precision=args.precision)
+    report["revision"] = git_revision()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"evidence_scale={report['evidence_scale']} (Brier {report['brier']}) threshold={report['threshold']} "
+          f"single-keyword ceiling={report['single_keyword_ceiling']}")
+    print(f"local answers: {report['local_coverage']:.0%} of {report['samples']} utterances at "
+          f"{report['local_precision']:.0%} precision")
+
+
+if __name__ == "__main__":
+    main()
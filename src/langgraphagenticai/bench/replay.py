@@ -0,0 +1,210 @@
+"""Offline replay benchmark over call_logs/ with a deterministic fake LLM.
+
+    python -m src.langgraphagenticai.bench.replay --llm-median 0.4 --nlu-median 0.3 --out replay_results.json
+
+Every user transcript entry is replayed through the compiled graph (with the
+conversation up to that point). Reports per-node latency percentiles, throughput
+and intent agreement of each call's last turn against the logged intent.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.langgraphagenticai.bench.fake_llm import FakeChatGroq, LatencyModel
+from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.nodes.nodes import DEFAULT_NLU_THRESHOLD
+from src.langgraphagenticai.prompts.registry import get_prompt_registry
+from src.langgraphagenticai.state.state import CallState
+from src.langgraphagenticai.storage.journal import read_events, rebuild_state
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(round(q / 100.0 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 3),
+        "p95_ms": round(1000 * percentile(values, 95), 3),
+        "p99_ms": round(1000 * percentile(values, 99), 3),
+    }
+
+
+def load_turns(log_dir: str) -> List[dict]:
+    """One replay item per user utterance: call_id, transcript prefix, and the
+    call's logged intent on the call's last user turn. Open call journals (.jsonl)
+    are rebuilt and replayed too."""
+    turns = []
+    paths = glob.glob(os.path.join(log_dir, "*.json")) + glob.glob(os.path.join(log_dir, "*.jsonl"))
+    for path in sorted(paths):
+        if path.endswith(".jsonl"):
+            log = rebuild_state(read_events(path))
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    log = json.load(f)
+            except (OSError, ValueError):
+                continue
+        transcript = [t for t in log.get("transcript", []) if isinstance(t, dict) and t.get("text")]
+        user_idx = [i for i, t in enumerate(transcript) if t.get("speaker") == "user"]
+        for n, i in enumerate(user_idx):
+            turns.append({
+                "call_id": log.get("call_id") or os.path.basename(path).rsplit(".", 1)[0],
+                "transcript": transcript[: i + 1],
+                "expected_intent": log.get("intent") if n == len(user_idx) - 1 else None,
+            })
+    return turns
+
+
+class TimedGraph:
+    """Runs the compiled graph with stream_mode="updates" and times every node."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self.node_latency: Dict[str, List[float]] = {}
+        self.turn_latency: List[float] = []
+
+    def run(self, call_id: str, transcript: List[dict]) -> dict:
+        return self.run_timed(call_id, transcript)[0]
+
+    def run_timed(self, call_id: str, transcript: List[dict]):
+        """Returns (final state, [(node, seconds), ...]) and records the samples."""
+        state: CallState = {
+            "call_id": call_id,
+            "transcript": [dict(t) for t in transcript],
+            "clean_text": "",
+            "intent": "",
+            "confidence": 0.0,
+            "entities": {},
+            "script": "",
+            "next_action": "end_call",
+            "nlu_source": "",
+            "spans": [],
+            "test_input": None,
+        }
+        final = dict(state)
+        samples = []
+        t0 = last = time.perf_counter()
+        for update in self.app.stream(state, stream_mode="updates"):
+            now = time.perf_counter()
+            for node, values in update.items():
+                samples.append((node, now - last))
+                if isinstance(values, dict):
+                    final.update(values)
+            last = now
+        with self._lock:
+            for node, dt in samples:
+                self.node_latency.setdefault(node, []).append(dt)
+            self.turn_latency.append(time.perf_counter() - t0)
+        return final, samples
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def run_replay(log_dir: str = "call_logs", mode: str = "standard", nlu_threshold: float = DEFAULT_NLU_THRESHOLD,
+               llm_median: float = 0.0, llm_sigma: float = 0.0, nlu_median: float = 0.0, nlu_sigma: float = 0.0,
+               concurrency: int = 1, repeat: int = 1, cache_scripts: bool = False, seed: int = 0) -> dict:
+    llm = FakeChatGroq(
+        text_latency=LatencyModel(llm_median, llm_sigma, seed=seed),
+        structured_latency=LatencyModel(nlu_median, nlu_sigma, seed=seed + 1),
+    )
+    gb = GraphBuilder(llm, nlu_threshold=nlu_threshold, mode=mode, cache_scripts=cache_scripts)
+    gb.call_center_build_graph()
+    timed = TimedGraph(gb.setup_graph())
+
+    turns = load_turns(log_dir) * max(1, repeat)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        finals = list(pool.map(lambda t: timed.run(t["call_id"], t["transcript"]), turns))
+    wall = time.perf_counter() - t0
+
+    labelled = [(t, f) for t, f in zip(turns, finals) if t["expected_intent"]]
+    agree = sum(1 for t, f in labelled if f.get("intent") == t["expected_intent"])
+    sources: Dict[str, int] = {}
+    for f in finals:
+        sources[f.get("nlu_source") or "unknown"] = sources.get(f.get("nlu_source") or "unknown", 0) + 1
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        # Template keys: results are only comparable when these match
+        "prompt_versions": get_prompt_registry().versions(),
+        "config": {
+            "mode": mode, "nlu_threshold": nlu_threshold, "llm_median": llm_median, "llm_sigma": llm_sigma,
+            "nlu_median": nlu_median, "nlu_sigma": nlu_sigma, "concurrency": concurrency, "repeat": repeat,
+            "cache_scripts": cache_scripts, "seed": seed,
+        },
+        "turns": len(turns),
+        "wall_s": round(wall, 4),
+        "throughput_tps": round(len(turns) / wall, 3) if wall else 0.0,
+        "turn_latency": summarize(timed.turn_latency),
+        "node_latency": {node: summarize(v) for node, v in sorted(timed.node_latency.items())},
+        "intent_agreement": {
+            "labelled": len(labelled),
+            "agree": agree,
+            "rate": round(agree / len(labelled), 4) if labelled else 0.0,
+        },
+        "nlu_sources": sources,
+        "llm_calls": dict(llm.calls),
+        "speculation": gb.nodes.speculation_stats() if mode == "speculative" else None,
+        "prompt_tokens": {name: s["avg_tokens"] for name, s in get_prompt_registry().stats().items() if s["renders"]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay call_logs through the graph with a fake LLM")
+    parser.add_argument("--log-dir", default="call_logs")
+    parser.add_argument("--mode", default="standard")
+    parser.add_argument("--nlu-threshold", type=float, default=DEFAULT_NLU_THRESHOLD)
+    parser.add_argument("--llm-median", type=float, default=0.0, help="domain-node LLM median latency (s)")
+    parser.add_argument("--llm-sigma", type=float, default=0.0)
+    parser.add_argument("--nlu-median", type=float, default=0.0, help="structured NLU LLM median latency (s)")
+    parser.add_argument("--nlu-sigma", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--cache-scripts", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="replay_results.json")
+    args = parser.parse_args()
+
+    results = run_replay(
+        args.log_dir, args.mode, args.nlu_threshold, args.llm_median, args.llm_sigma,
+        args.nlu_median, args.nlu_sigma, args.concurrency, args.repeat, args.cache_scripts, args.seed,
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"{results['turns']} turns in {results['wall_s']}s ({results['throughput_tps']} turns/s)")
+    for node, s in results["node_latency"].items():
+        print(f"  {node:40s} p50={s['p50_ms']:.1f}ms p95={s['p95_ms']:.1f}ms p99={s['p99_ms']:.1f}ms")
+    ia = results["intent_agreement"]
+    print(f"intent agreement: {ia['agree']}/{ia['labelled']} ({ia['rate']:.0%})")
+    if results["speculation"]:
+        sp = results["speculation"]
+        print(f"speculation: {sp['hits']}/{sp['turns']} hits ({sp['hit_rate']:.0%}), {sp['wasted_tokens']} wasted tokens")
+    print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class SQLiteStore:
+    """Optional on-disk backing store for LRUTTLCache (key -> pickled value, written_at)."""
+
+    def __init__(self, path: str, table: str = "cache"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB, written_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, written_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, written_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, written_at) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), written_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache with per-entry TTL, hit/miss stats and an optional SQLiteStore.
+
+    Memory holds at most maxsize entries; the store (if any) keeps everything written
+    and is consulted on a memory miss. ttl=None disables expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, store: Optional[SQLiteStore] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, written_at: float, now: float) -> bool:
+        return self.ttl is not None and now - written_at > self.ttl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, written_at = item
+                if not self._expired(written_at, now):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+        if self.store is not None:
+            item = self.store.get(key)
+            if item is not None:
+                value, written_at = item
+                if not self._expired(written_at, now):
+                    with self._lock:
+                        self._put(key, value, written_at)
+                        self.hits += 1
+                    return value
+                self.store.delete(key)
+                with self._lock:
+                    self.expirations += 1
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def _put(self, key: str, value: Any, written_at: float) -> None:
+        self._data[key] = (value, written_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._put(key, value, now)
+        if self.store is not None:
+            self.store.set(key, value, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._data),
+            }
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.langgraphagenticai.cache.lru import LRUTTLCache, SQLiteStore
+
+# Entity values that identify a customer (or vary per call) are templated out of both
+# the cache key and the cached script, then filled back in on a hit.
+SLOT_KEYS = ("account_number", "phone_number", "recharge_amount", "date", "error_code")
+# Shorter slot values ("24", "99") collide with ordinary numbers in a script, so they
+# stay literal in both the key and the cached script instead of being templated
+MIN_SLOT_CHARS = 4
+
+_PUNCT = re.compile(r"[^\w\s<>]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    txt = _PUNCT.sub(" ", (text or "").lower())
+    return _SPACES.sub(" ", txt).strip()
+
+
+class ScriptCache:
+    """Response cache in front of the domain nodes.
+
+    Key = model + intent + canonical non-slot entities + normalized clean_text with
+    slot values replaced by <slot> placeholders + the conversation context the prompt
+    was rendered with, hashed so PII never sits in a key. A script is therefore only
+    reused under the same history (first messages all share the empty-history block),
+    never replayed to a caller whose earlier turns differ.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 24 * 3600, db_path: Optional[str] = None):
+        store = SQLiteStore(db_path, table="script_cache") if db_path else None
+        self.cache = LRUTTLCache(maxsize=maxsize, ttl=ttl, store=store)
+
+    @staticmethod
+    def slots(entities: Dict) -> Dict[str, str]:
+        return {k: str(v).strip() for k, v in (entities or {}).items()
+                if k in SLOT_KEYS and len(str(v).strip()) >= MIN_SLOT_CHARS}
+
+    @staticmethod
+    def _templatize(text: str, slots: Dict[str, str]) -> str:
+        # Whole tokens only ("24" must not match inside "240" or "1.24"); longest values
+        # first so "9988776655" is not half-replaced by a shorter slot
+        for name, value in sorted(slots.items(), key=lambda kv: len(kv[1]), reverse=True):
+            pattern = rf"(?<!\w)(?<!\d\.){re.escape(value)}(?!\w)(?!\.\d)"
+            text = re.sub(pattern, lambda _m, name=name: f"<{name}>", text)
+        return text
+
+    def make_key(self, namespace: str, intent: str, clean_text: str, entities: Dict,
+                 context: str = "") -> Tuple[str, Dict[str, str]]:
+        slots = self.slots(entities)
+        others = sorted(
+            (str(k).lower(), normalize_text(str(v))) for k, v in (entities or {}).items() if k not in slots
+        )
+        text = normalize_text(self._templatize(clean_text or "", slots))
+        raw = "|".join([namespace, intent, ",".join(sorted(slots)), repr(others), text, normalize_text(context)])
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest(), slots
+
+    def get(self, key: str, slots: Dict[str, str]) -> Optional[str]:
+        template = self.cache.get(key)
+        if template is None:
+            return None
+        for name, value in slots.items():
+            template = template.replace(f"<{name}>", value)
+        return template
+
+    def set(self, key: str, slots: Dict[str, str], script: str) -> None:
+        self.cache.set(key, self._templatize(script, slots))
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+
+_script_cache: Optional[ScriptCache] = None
+_script_cache_lock = threading.Lock()
+
+
+def get_script_cache() -> ScriptCache:
+    """Process-wide script cache; set SCRIPT_CACHE_DB to back it with a SQLite file."""
+    global _script_cache
+    with _script_cache_lock:
+        if _script_cache is None:
+            _script_cache = ScriptCache(db_path=os.getenv("SCRIPT_CACHE_DB") or None)
+        return _script_cache
@@ -0,0 +1,56 @@
+import hashlib
+import io
+import os
+import threading
+import wave
+from typing import Dict, Optional
+
+from src.langgraphagenticai.cache.lru import LRUTTLCache, SQLiteStore
+
+
+def audio_fingerprint(wav_bytes: bytes) -> str:
+    """Stable content hash of the PCM payload (format + frames, header padding ignored).
+
+    Unlike hash(), this is identical across processes and restarts. Non-WAV input
+    is hashed whole.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as w:
+            h.update(f"{w.getnchannels()}:{w.getsampwidth()}:{w.getframerate()}|".encode("ascii"))
+            h.update(w.readframes(w.getnframes()))
+    except Exception:
+        h = hashlib.blake2b(wav_bytes, digest_size=16)
+    return h.hexdigest()
+
+
+class STTCache:
+    """Content-addressed transcript cache: audio fingerprint -> transcription text."""
+
+    def __init__(self, maxsize: int = 2048, ttl: Optional[float] = 7 * 24 * 3600, db_path: Optional[str] = None):
+        store = SQLiteStore(db_path, table="stt_cache") if db_path else None
+        self.cache = LRUTTLCache(maxsize=maxsize, ttl=ttl, store=store)
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        return self.cache.get(fingerprint)
+
+    def set(self, fingerprint: str, text: str) -> None:
+        # Error strings and empty results are never cached
+        if text and not text.startswith("("):
+            self.cache.set(fingerprint, text)
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+
+_stt_cache: Optional[STTCache] = None
+_stt_cache_lock = threading.Lock()
+
+
+def get_stt_cache() -> STTCache:
+    """Process-wide STT cache; set STT_CACHE_DB to back it with a SQLite file."""
+    global _stt_cache
+    with _stt_cache_lock:
+        if _stt_cache is None:
+            _stt_cache = STTCache(db_path=os.getenv("STT_CACHE_DB") or None)
+        return _stt_cache
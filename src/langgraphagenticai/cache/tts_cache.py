@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def tts_key(text: str, voice: str, rate: int, backend: str) -> str:
+    """Content address of a rendering: normalized text + voice + rate + backend."""
+    raw = "|".join([backend, voice or "", str(rate), " ".join((text or "").split())])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TTSCache:
+    """Rendered audio by content key, bounded by total bytes rather than entry count.
+
+    Memory is an LRU of at most max_bytes; with a directory, every rendering is
+    also written there as <key>.wav (bounded by max_disk_bytes, oldest files
+    removed first) and read back on a memory miss, so restarts start warm.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def contains(self, key: str) -> bool:
+        """Presence check that leaves hit/miss stats alone (used by pre-warming)."""
+        with self._lock:
+            if key in self._data:
+                return True
+        return bool(self.directory) and os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._data.get(key)
+            if audio is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return audio
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+            except OSError:
+                audio = None
+            if audio:
+                with self._lock:
+                    self._put(key, audio)
+                    self.hits += 1
+                return audio
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _put(self, key: str, audio: bytes) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._data[key] = audio
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes and len(self._data) > 1:
+            _, evicted = self._data.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def set(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        with self._lock:
+            self._put(key, audio)
+        if self.directory:
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, self._path(key))
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".wav"):
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue  # removed by another process since listdir
+                files.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+            }
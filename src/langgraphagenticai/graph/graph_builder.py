@@ -1,40 +1,112 @@
 from langgraph.graph import StateGraph
 from src.langgraphagenticai.state.state import CallState
-from src.langgraphagenticai.nodes.nodes import CallCenterNode
+from src.langgraphagenticai.nodes.nodes import CallCenterNode, DEFAULT_NLU_THRESHOLD
+from src.langgraphagenticai.cache.script_cache import get_script_cache
+from src.langgraphagenticai.storage.checkpoints import get_checkpointer
+from src.langgraphagenticai.telemetry.tracing import traced_node
 from langgraph.graph import START, END
 
 
+DOMAIN_NODES = [
+    "billing_issue_node",
+    "sim_not_working_node",
+    "no_network_coverage_node",
+    "internet_speed_slow_node",
+    "data_not_working_after_recharge_node",
+    "call_drops_frequently_node",
+]
+
+# "standard": nlu_node then a domain node (two LLM calls)
+# "fused": one structured call returns intent + script; domain names only post-process
+# "speculative": likely domain scripts are generated while the LLM NLU call runs
+GRAPH_MODES = ["standard", "fused", "speculative"]
+
+
 class GraphBuilder:
-    def __init__(self, model):
+    def __init__(self, model, nlu_threshold: float = DEFAULT_NLU_THRESHOLD, mode: str = "standard",
+                 stream_tts: bool = False, cache_scripts: bool = True, async_nodes: bool = False,
+                 checkpoint: bool = False, entity_mode: str = "merge"):
+        if mode not in GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode: {mode}")
+        if checkpoint and async_nodes:
+            raise ValueError("checkpoint uses the synchronous SQLite saver; it cannot be combined with async_nodes")
+        # checkpoint persists CallState per call_id (thread_id) so a turn only sends its new entry
+        self.checkpoint = checkpoint
+        self.mode = mode
+        # async_nodes registers ainvoke-based node variants; run the graph with app.ainvoke()
+        self.async_nodes = async_nodes
         self.llm = model
         self.graph_builder = StateGraph(CallState)
-        self.nodes = CallCenterNode(llm=self.llm)
+        self.nodes = CallCenterNode(
+            llm=self.llm, nlu_threshold=nlu_threshold, stream_tts=stream_tts,
+            script_cache=get_script_cache() if cache_scripts else None, entity_mode=entity_mode,
+        )
+
+    def _add_node(self, name: str, fn):
+        # Every node records a latency span into state['spans']
+        self.graph_builder.add_node(name, traced_node(name, fn))
 
     def call_center_build_graph(self):
-        self.graph_builder.add_node("preprocess_node", self.nodes.preprocess_node)
-        self.graph_builder.add_node("nlu_node", self.nodes.nlu_node)
+        if self.mode == "fused":
+            return self.call_center_build_fused_graph()
+        if self.mode == "speculative":
+            return self.call_center_build_speculative_graph()
+        self._add_node("preprocess_node", self.nodes.preprocess_node)
+        if self.async_nodes:
+            self._add_node("nlu_node", self.nodes.anlu_node)
+            for node in DOMAIN_NODES:
+                self._add_node(node, self.nodes.make_async_domain_node(node))
+        else:
+            self._add_node("nlu_node", self.nodes.nlu_node)
 
-        self.graph_builder.add_node("billing_issue_node", self.nodes.billing_issue_node)
-        self.graph_builder.add_node("sim_not_working_node", self.nodes.sim_not_working_node)
-        self.graph_builder.add_node("no_network_coverage_node", self.nodes.no_network_coverage_node)
-        self.graph_builder.add_node("internet_speed_slow_node", self.nodes.internet_speed_slow_node)
-        self.graph_builder.add_node("data_not_working_after_recharge_node", self.nodes.data_not_working_after_recharge_node)
-        self.graph_builder.add_node("call_drops_frequently_node", self.nodes.call_drops_frequently_node)
+            self._add_node("billing_issue_node", self.nodes.billing_issue_node)
+            self._add_node("sim_not_working_node", self.nodes.sim_not_working_node)
+            self._add_node("no_network_coverage_node", self.nodes.no_network_coverage_node)
+            self._add_node("internet_speed_slow_node", self.nodes.internet_speed_slow_node)
+            self._add_node("data_not_working_after_recharge_node", self.nodes.data_not_working_after_recharge_node)
+            self._add_node("call_drops_frequently_node", self.nodes.call_drops_frequently_node)
 
         self.graph_builder.add_edge(START, "preprocess_node")
         self.graph_builder.add_edge("preprocess_node", "nlu_node")
 
-        self.graph_builder.add_conditional_edges("nlu_node", self.nodes.route_intent_to_node, { 
-            "billing_issue_node": "billing_issue_node",
-            "sim_not_working_node": "sim_not_working_node",
-            "no_network_coverage_node": "no_network_coverage_node",
-            "internet_speed_slow_node": "internet_speed_slow_node",
-            "data_not_working_after_recharge_node": "data_not_working_after_recharge_node",
-            "call_drops_frequently_node": "call_drops_frequently_node"
-        })
+        self.graph_builder.add_conditional_edges("nlu_node", self.nodes.route_intent_to_node, {node: node for node in DOMAIN_NODES})
+
+        for node in DOMAIN_NODES:
+            self.graph_builder.add_edge(node, END)
+
+    def call_center_build_fused_graph(self):
+        self._add_node("preprocess_node", self.nodes.preprocess_node)
+        fused = self.nodes.afused_nlu_script_node if self.async_nodes else self.nodes.fused_nlu_script_node
+        finalize = self.nodes.afused_finalize_node if self.async_nodes else self.nodes.fused_finalize_node
+        self._add_node("fused_nlu_script_node", fused)
+
+        # Same node names and routing as standard mode, so logs and routing stay comparable
+        for node in DOMAIN_NODES:
+            self._add_node(node, finalize)
+
+        self.graph_builder.add_edge(START, "preprocess_node")
+        self.graph_builder.add_edge("preprocess_node", "fused_nlu_script_node")
+        self.graph_builder.add_conditional_edges("fused_nlu_script_node", self.nodes.route_intent_to_node, {node: node for node in DOMAIN_NODES})
+
+        for node in DOMAIN_NODES:
+            self.graph_builder.add_edge(node, END)
+
+    def call_center_build_speculative_graph(self):
+        self._add_node("preprocess_node", self.nodes.preprocess_node)
+        nlu = self.nodes.aspeculative_nlu_node if self.async_nodes else self.nodes.speculative_nlu_node
+        finalize = self.nodes.afused_finalize_node if self.async_nodes else self.nodes.fused_finalize_node
+        self._add_node("nlu_node", nlu)
+
+        # A kept speculative script only needs finalizing; a miss generates it as in standard mode
+        for node in DOMAIN_NODES:
+            self._add_node(node, finalize)
+
+        self.graph_builder.add_edge(START, "preprocess_node")
+        self.graph_builder.add_edge("preprocess_node", "nlu_node")
+        self.graph_builder.add_conditional_edges("nlu_node", self.nodes.route_intent_to_node, {node: node for node in DOMAIN_NODES})
 
-        for node in ["billing_issue_node", "sim_not_working_node", "no_network_coverage_node", "internet_speed_slow_node", "data_not_working_after_recharge_node", "call_drops_frequently_node"]:
+        for node in DOMAIN_NODES:
             self.graph_builder.add_edge(node, END)
 
     def setup_graph(self):
-        return self.graph_builder.compile()
\ No newline at end of file
+        return self.graph_builder.compile(checkpointer=get_checkpointer() if self.checkpoint else None)
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from src.langgraphagenticai.LLMS.groqllm import GroqLLM
+from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+
+
+def _key_fingerprint(api_key: Optional[str]) -> str:
+    # Never keep the raw key in the cache key; a short digest is enough to detect rotation.
+    return hashlib.blake2b((api_key or "").encode("utf-8"), digest_size=8).hexdigest()
+
+
+class GraphEntry:
+    """Everything built once per (model, api key, config): LLM client, node set and compiled graph."""
+
+    def __init__(self, llm, builder: GraphBuilder, app):
+        self.llm = llm
+        self.builder = builder
+        self.nodes = builder.nodes
+        self.app = app
+
+
+class GraphRegistry:
+    """Process-wide cache of compiled call-center graphs shared across Streamlit sessions and reruns."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, GraphEntry] = {}
+        self._model_keys: Dict[str, str] = {}
+        self.hits = 0
+        self.builds = 0
+        self.invalidations = 0
+
+    def _make_key(self, model: str, api_key: Optional[str], config: Optional[Dict[str, Any]]) -> Tuple:
+        cfg = tuple(sorted((config or {}).items()))
+        return (model, _key_fingerprint(api_key), cfg)
+
+    def get(self, model: str, api_key: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> GraphEntry:
+        key = self._make_key(model, api_key, config)
+        with self._lock:
+            # A rotated API key makes every entry built with the old key stale.
+            fp = key[1]
+            if self._model_keys.get(model) not in (None, fp):
+                self._drop(lambda k: k[0] == model)
+            self._model_keys[model] = fp
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            llm = GroqLLM(model=model, api_key=api_key).get_llm_model()
+            gb = GraphBuilder(llm, **(config or {}))
+            gb.call_center_build_graph()
+            entry = GraphEntry(llm, gb, gb.setup_graph())
+            self._entries[key] = entry
+            self.builds += 1
+            return entry
+
+    def get_app(self, model: str, api_key: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        return self.get(model, api_key, config).app
+
+    def _drop(self, predicate) -> int:
+        stale = [k for k in self._entries if predicate(k)]
+        for k in stale:
+            del self._entries[k]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """Drop cached graphs for one model (or all models when model is None)."""
+        with self._lock:
+            if model is None:
+                self._model_keys.clear()
+                return self._drop(lambda k: True)
+            self._model_keys.pop(model, None)
+            return self._drop(lambda k: k[0] == model)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "builds": self.builds,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+_registry = GraphRegistry()
+
+
+def get_graph_registry() -> GraphRegistry:
+    return _registry
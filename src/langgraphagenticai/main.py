@@ -1,29 +1,52 @@
+import functools
+import html
 import os
 import json
-import uuid
+import sqlite3
 import time
-import tempfile
+from datetime import datetime, time as dtime, timedelta
 import streamlit as st
 from dotenv import load_dotenv
-from groq import Groq
 from streamlit_mic_recorder import mic_recorder
 import streamlit.components.v1 as components
 
-from src.langgraphagenticai.LLMS.groqllm import GroqLLM
-from src.langgraphagenticai.graph.graph_builder import GraphBuilder
+from src.langgraphagenticai.cache.script_cache import get_script_cache
+from src.langgraphagenticai.cache.stt_cache import audio_fingerprint, get_stt_cache
+from src.langgraphagenticai.graph.graph_builder import GRAPH_MODES
+from src.langgraphagenticai.graph.graph_registry import get_graph_registry
+from src.langgraphagenticai.LLMS.scheduler import get_llm_scheduler
+from src.langgraphagenticai.nodes.nodes import DEFAULT_NLU_THRESHOLD
+from src.langgraphagenticai.service.client import CallServiceClient
 from src.langgraphagenticai.state.state import CallState
-
-# Optional Supabase (disabled if not installed)
-try:
-    from supabase import create_client
-except Exception:
-    create_client = None
+from src.langgraphagenticai.state.transcript import BoundedTranscript
+from src.langgraphagenticai.storage.call_index import get_call_index
+from src.langgraphagenticai.storage.checkpoints import get_checkpointer, load_call_state, prune_checkpoints, thread_config
+from src.langgraphagenticai.storage.journal import get_call_journal
+from src.langgraphagenticai.storage.write_behind import get_write_behind
+from src.langgraphagenticai.stt.engine import get_stt_engine
+from src.langgraphagenticai.stt.streaming import transcribe_segmented
+from src.langgraphagenticai.telemetry.rollups import get_rollups
+from src.langgraphagenticai.telemetry.tracing import get_tracer, span
+from src.langgraphagenticai.utils.call_utils import extract_script_text, generate_call_id, json_safe
+from src.langgraphagenticai.tts.engine import get_tts_engine
+from src.langgraphagenticai.tts.streaming import customer_line
 
 load_dotenv()
 
 LOG_DIR = "call_logs"
+HISTORY_PAGE_SIZE = 20
+# Transcript messages rendered per page (newest first page); older pages on request
+TRANSCRIPT_PAGE_SIZE = 6
+# Recent UI render timings kept per session
+RENDER_SAMPLES = 50
+# End Call waits at most this long (seconds) for queued remote writes
+PERSIST_FLUSH_TIMEOUT = 3.0
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# When set, the UI is a thin client of the headless call service (service/server.py)
+CALL_SERVICE_URL = os.getenv("CALL_SERVICE_URL")
+service_client = CallServiceClient(CALL_SERVICE_URL) if CALL_SERVICE_URL else None
+
 def _css():
     st.markdown(
         """
@@ -108,12 +131,16 @@ def _css():
         unsafe_allow_html=True,
     )
 
-def generate_call_id(prefix: str = "C") -> str:
-    return f"{prefix}-{uuid.uuid4().hex[:8].upper()}-{time.strftime('%y%m%d%H%M%S')}"
-
-def speak(text: str) -> None:
+def speak(text: str, engine=None) -> None:
+    """Plays text: server-rendered (cached) audio when an engine is given, else browser speech."""
     if not text:
         return
+    if engine is not None:
+        try:
+            st.audio(engine.render(text), format="audio/wav", autoplay=True)
+            return
+        except Exception:
+            pass
     escaped_text = text.replace("'", "\\'").replace('"', '\\"').replace("\n", " ")
     html_code = f"""
     <script>
@@ -134,78 +161,52 @@ INTENTS = [
     "Call Drops Frequently",
 ]
 
-def transcribe_bytes_wav(wav_bytes: bytes) -> str:
+@functools.lru_cache(maxsize=1)
+def _intent_pills_html() -> str:
+    pills = "".join(f"<div class='pill' title='{it}' style='font-size:12px; padding:6px 10px;'>{it}</div>" for it in INTENTS)
+    return f"<div style='display:flex; flex-wrap:wrap; gap:8px; margin-top:6px;'>{pills}</div>"
+
+_MESSAGE_STYLE = {
+    "user": ("transcript-user", "👤 CALLER", 15),
+    "agent": ("transcript-agent", "🤖 AGENT", 15),
+}
+
+@functools.lru_cache(maxsize=4096)
+def _message_html(speaker: str, text: str, ts: float) -> str:
+    """One transcript bubble; built once per message, not on every rerun."""
+    css_class, label, size = _MESSAGE_STYLE.get(speaker, ("transcript-user", "⚙️ SYSTEM", 14))
+    stamp = time.strftime('%H:%M:%S', time.localtime(ts))
+    return (f"<div class='{css_class}'><strong>{label} • {stamp}</strong>"
+            f"<div style='margin-top:8px; font-size:{size}px;'>{html.escape(text)}</div></div>")
+
+def _record_render(kind: str, seconds: float) -> None:
+    """Wall time of a full run or a workspace fragment run, against the transcript length."""
+    get_tracer().record(f"ui_{kind}_run", seconds)
+    transcript = st.session_state.get('transcript')
+    st.session_state['render_times'] = (st.session_state.get('render_times') or [])[-(RENDER_SAMPLES - 1):] + [
+        {"kind": kind, "ms": round(seconds * 1000, 1), "messages": getattr(transcript, 'total', 0)}]
+
+def transcribe_bytes_wav(wav_bytes: bytes, fingerprint: str = None) -> str:
     api_key = st.secrets.get("GROQ_API_KEY") or os.getenv("GROQ_API_KEY")
     if not api_key:
         return "(STT error: GROQ_API_KEY not set)"
     try:
-        client = Groq(api_key=api_key)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(wav_bytes)
-            temp_path = tmp.name
-        with open(temp_path, "rb") as f:
-            transcription_obj = client.audio.transcriptions.create(
-                file=f, model="whisper-large-v3", response_format="text", language="en"
-            )
-        os.unlink(temp_path)
-        return str(transcription_obj).strip()
+        # Long complaints are split at pauses and transcribed concurrently
+        return transcribe_segmented(get_stt_engine(api_key), wav_bytes, fingerprint=fingerprint)
     except Exception as e:
         return f"(STT error: {e})"
 
-def extract_script_text(script_obj) -> str:
-    if script_obj is None:
-        return ""
-    if isinstance(script_obj, str):
-        return script_obj
-    if hasattr(script_obj, "content"):
-        try:
-            return str(script_obj.content)
-        except Exception:
-            pass
-    if isinstance(script_obj, dict):
-        for k in ("content", "text", "message"):
-            if k in script_obj and isinstance(script_obj[k], str):
-                return script_obj[k]
-    return str(script_obj)
-
-def json_safe(obj):
-    if obj is None or isinstance(obj, (bool, int, float, str)):
-        return obj
-    if isinstance(obj, dict):
-        return {str(json_safe(k)): json_safe(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple, set)):
-        return [json_safe(x) for x in obj]
-    if isinstance(obj, (bytes, bytearray)):
-        try:
-            return obj.decode("utf-8", errors="replace")
-        except Exception:
-            return str(obj)
-    name = obj.__class__.__name__
-    if hasattr(obj, "content") and name in ("AIMessage", "HumanMessage", "SystemMessage", "ChatMessage"):
-        safe = {"type": name, "content": json_safe(getattr(obj, "content", ""))}
-        if hasattr(obj, "additional_kwargs"):
-            safe["additional_kwargs"] = json_safe(getattr(obj, "additional_kwargs", {}))
-        return safe
-    try:
-        from pydantic import BaseModel
-        if isinstance(obj, BaseModel):
-            return json_safe(obj.model_dump())
-    except Exception:
-        pass
+def save_call_log(call_id: str, final_state: dict, new_entries: list = None) -> str:
+    # Appends this turn to call_logs/<call_id>.jsonl; End Call compacts it into <call_id>.json
+    path = get_call_journal(LOG_DIR).journal_path(call_id)
     try:
-        import dataclasses
-        if dataclasses.is_dataclass(obj):
-            return json_safe(dataclasses.asdict(obj))
-    except Exception:
-        pass
-    return str(obj)
-
-def save_call_log(call_id: str, final_state: dict) -> str:
-    path = os.path.join(LOG_DIR, f"{call_id}.json")
-    safe_state = json_safe(final_state)
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(safe_state, f, indent=2)
+        path = get_call_journal(LOG_DIR).append_turn(call_id, final_state, new_entries=new_entries)
+        get_call_index(LOG_DIR).record_turn(call_id, final_state, path)
+        get_rollups(LOG_DIR).record_turn(final_state)
+        # Remote copy is written behind; enqueueing never waits on the network
+        persist = get_write_behind()
+        if persist is not None:
+            persist.put_turn(call_id, final_state)
     except Exception as e:
         try:
             st.warning(f"Failed to write local log file: {e}")
@@ -214,6 +215,7 @@ def save_call_log(call_id: str, final_state: dict) -> str:
     return path
 
 def load_langgraph_agenticai_app():
+    run_started = time.perf_counter()
     st.set_page_config(page_title="Cerevyn AI — Voice Call Center", layout="wide", initial_sidebar_state="expanded")
     _css()
 
@@ -241,26 +243,81 @@ def load_langgraph_agenticai_app():
         st.markdown("---")
         st.markdown("*Intents*")
         # Render intents as pill badges using the CSS 'pill' class already present
-        intents_html = "<div style='display:flex; flex-wrap:wrap; gap:8px; margin-top:6px;'>"
-        for it in INTENTS:
-            intents_html += f"<div class='pill' title='{it}' style='font-size:12px; padding:6px 10px;'>{it}</div>"
-        intents_html += "</div>"
-        st.markdown(intents_html, unsafe_allow_html=True)
+        st.markdown(_intent_pills_html(), unsafe_allow_html=True)
 
         # Model selection
         model_name = st.selectbox("🤖 LLM Model", ["openai/gpt-oss-20b"], index=0)
-        enable_tts = st.checkbox("🔊 Enable TTS (Browser)", value=True)
+        enable_tts = st.checkbox("🔊 Enable TTS", value=True)
+        tts_engine = get_tts_engine() if enable_tts else None
+        if tts_engine is not None and not st.checkbox(
+                "🗣️ Server-rendered voice", value=True,
+                help="pyttsx3 audio from the render cache; off uses the browser's speech synthesis."):
+            tts_engine = None
+        graph_mode = st.selectbox(
+            "🧩 Pipeline Mode", GRAPH_MODES, index=0,
+            help="standard: NLU then domain script (2 LLM calls). fused: one call returns both. "
+                 "speculative: likely scripts are generated while NLU runs.",
+        )
+        nlu_threshold = st.slider(
+            "⚡ Local NLU threshold", 0.0, 1.0, DEFAULT_NLU_THRESHOLD, 0.01,
+            help="Local intent confidence at or above this skips the LLM NLU call (1.0 = always use LLM).",
+        )
         
         st.markdown("---")
         st.markdown("### 📊 Session Info")
         st.info(f"**Active Call ID:**\n`{st.session_state.get('call_id', 'None')}`")
-        st.info(f"**Total Exchanges:**\n{len(st.session_state.get('transcript', [])) // 2}")
+        reg = get_graph_registry().stats()
+        st.caption(f"Graph cache: {reg['hits']} hits / {reg['builds']} builds")
+        pre = get_stt_engine(api_key).last_preprocess if api_key else None
+        if pre is not None:
+            st.caption(f"Last audio: {pre.bytes_in // 1024} KB → {pre.bytes_out // 1024} KB "
+                       f"({pre.duration_in:.1f}s → {pre.duration_out:.1f}s) in {pre.elapsed_ms:.0f} ms")
+        stc = get_stt_cache().stats()
+        st.caption(f"STT cache: {stc['hits']} hits / {stc['misses']} misses")
+        sc = get_script_cache().stats()
+        st.caption(f"Script cache: {sc['hits']} hits / {sc['misses']} misses ({sc['entries']} entries)")
+        ls = get_llm_scheduler().stats()
+        st.caption(f"LLM: {ls['calls']} calls, avg queue {ls['avg_queued_ms']:.0f} ms, "
+                   f"{ls['retries']} retries, {ls['hedge_wins']}/{ls['hedges']} hedge wins")
+        persist = get_write_behind()
+        if persist is not None:
+            ps = persist.stats()
+            st.caption(f"Remote ({ps['sink']}): {ps['written']} written, {ps['queued']} queued, "
+                       f"{ps['spilled']} spilled / {ps['replayed']} replayed, {ps['dropped']} dropped")
+        if tts_engine is not None:
+            ts = tts_engine.stats()
+            st.caption(f"TTS cache: {ts['cache_hits']} hits / {ts['cache_misses']} misses, "
+                       f"{ts['renders']} renders (avg {ts['avg_render_ms']:.0f} ms), {ts['pending']} pending")
+
+        # Resume a call from its checkpoint (e.g. after a server restart or on another worker)
+        if service_client is None and not st.session_state.get('call_active', False):
+            with st.expander("↩️ Resume a call", expanded=False):
+                resume_id = st.text_input("Call ID", key="resume_call_id").strip()
+                if st.button("Resume", disabled=not resume_id, use_container_width=True):
+                    try:
+                        graph_config = {"nlu_threshold": nlu_threshold, "mode": graph_mode,
+                                        "stream_tts": enable_tts, "checkpoint": True}
+                        app = get_graph_registry().get_app(model_name, api_key=api_key, config=graph_config)
+                        resumed = load_call_state(app, resume_id)
+                    except Exception as e:
+                        resumed = False
+                        st.error(f"❌ Resume failed: {e}")
+                    if resumed:
+                        st.session_state['call_id'] = resume_id
+                        st.session_state['transcript'] = BoundedTranscript.from_list(
+                            resumed.get('transcript') or [], summary=resumed.get('summary') or "")
+                        st.session_state['last_state'] = {"path": None, "state": json_safe(resumed)}
+                        st.session_state['call_active'] = True
+                        st.session_state['last_audio_id'] = None
+                        st.rerun()
+                    elif resumed is None:
+                        st.warning("No checkpoint found for that call ID.")
 
     # Session state initialization
     if 'call_id' not in st.session_state:
         st.session_state['call_id'] = None
     if 'transcript' not in st.session_state:
-        st.session_state['transcript'] = []
+        st.session_state['transcript'] = BoundedTranscript()
     if 'last_state' not in st.session_state:
         st.session_state['last_state'] = None
     if 'call_active' not in st.session_state:
@@ -268,7 +325,16 @@ def load_langgraph_agenticai_app():
     if 'last_audio_id' not in st.session_state:
         st.session_state['last_audio_id'] = None
 
-    # Main layout
+    _call_workspace(api_key, model_name, enable_tts, tts_engine, graph_mode, nlu_threshold)
+    _record_render("full", time.perf_counter() - run_started)
+
+
+@st.fragment
+def _call_workspace(api_key, model_name, enable_tts, tts_engine, graph_mode, nlu_threshold):
+    """Call controls, transcript, analytics and history. A recorded turn reruns only this
+    fragment (with the sidebar settings of the last full run); the CSS, header and
+    sidebar are rebuilt only on a full rerun such as Start/End Call or a settings change."""
+    started = time.perf_counter()
     left, right = st.columns([2.5, 1.5])
 
     with left:
@@ -291,19 +357,47 @@ def load_langgraph_agenticai_app():
 
         # Start call logic
         if start_call_btn:
-            # Generate new call ID
-            st.session_state['call_id'] = generate_call_id()
-            st.session_state['transcript'] = []
+            # Generate new call ID (the call service issues it in thin-client mode)
+            try:
+                st.session_state['call_id'] = service_client.start_call() if service_client else generate_call_id()
+            except Exception as e:
+                st.error(f"❌ Call service unavailable: {e}")
+                st.stop()
+            st.session_state['transcript'] = BoundedTranscript()
             st.session_state['last_state'] = None
             st.session_state['call_active'] = True
+            try:
+                get_call_journal(LOG_DIR).start(st.session_state['call_id'])
+            except OSError as e:
+                st.warning(f"Failed to open call journal: {e}")
             st.session_state['last_audio_id'] = None
             st.success(f"✅ Call started: {st.session_state['call_id']}")
             st.rerun()
 
         # End call logic
         if end_call_btn:
+            if service_client is not None:
+                try:
+                    service_client.end_call(st.session_state['call_id'])
+                except Exception:
+                    pass
             st.session_state['call_active'] = False
-            st.session_state['transcript'].append({"speaker": "system", "text": "Call ended by user.", "ts": time.time()})
+            end_entry = st.session_state['transcript'].append({"speaker": "system", "text": "Call ended by user.", "ts": time.time()})
+            try:
+                path = get_call_journal(LOG_DIR).end(st.session_state['call_id'], [end_entry.as_dict()])
+                get_call_index(LOG_DIR).record_end(st.session_state['call_id'], path)
+                get_checkpointer().delete_thread(st.session_state['call_id'])
+                if st.session_state.get('last_state'):
+                    st.session_state['last_state']['path'] = path
+            except (OSError, sqlite3.Error) as e:
+                st.warning(f"Failed to compact call log: {e}")
+            persist = get_write_behind()
+            if persist is not None:
+                log = get_call_journal(LOG_DIR).load(st.session_state['call_id'])
+                if log:
+                    persist.put_summary(st.session_state['call_id'], log)
+                if not persist.flush(timeout=PERSIST_FLUSH_TIMEOUT):
+                    st.warning("Remote persistence is behind; records stay queued and are retried in the background.")
             st.warning(f"⏹ Call ended: {st.session_state['call_id']}")
             st.rerun()
 
@@ -323,48 +417,89 @@ def load_langgraph_agenticai_app():
 
             # Create unique ID for this audio recording
             if audio and isinstance(audio, dict) and audio.get("bytes"):
-                audio_id = str(hash(audio["bytes"]))
+                audio_id = audio_fingerprint(audio["bytes"])
                 
                 # Only process if this is a NEW recording (prevent re-processing on rerun)
                 if audio_id != st.session_state.get('last_audio_id'):
                     st.session_state['last_audio_id'] = audio_id
                     wav_bytes = audio["bytes"]
                     
-                    with st.spinner("🔄 Transcribing..."):
-                        user_text = transcribe_bytes_wav(wav_bytes)
+                    # Latency spans for this turn; graph nodes append theirs to state['spans']
+                    turn_spans = []
+                    # STTEngine adds this recording's retries to the span
+                    with st.spinner("🔄 Transcribing..."), span("transcribe_bytes_wav", turn_spans):
+                        user_text = transcribe_bytes_wav(wav_bytes, fingerprint=audio_id)
 
                     if not user_text or user_text.startswith("("):
                         st.error(f"❌ Voice capture failed: {user_text or 'empty input'}")
                     else:
-                        st.session_state['transcript'].append(
+                        user_entry = st.session_state['transcript'].append(
                             {"speaker": "user", "text": user_text, "ts": time.time()}
-                        )
-
-                        # Build model + graph
-                        try:
-                            model = GroqLLM(model=model_name).get_llm_model()
-                            gb = GraphBuilder(model)
-                            gb.call_center_build_graph()
-                            app = gb.setup_graph()
-                        except Exception as e:
-                            st.error(f"❌ Graph init failed: {e}")
-                            app = None
+                        ).as_dict()
+                        new_entries = [user_entry]
+
+                        # Reuse the process-wide compiled graph for this model/key
+                        app = None
+                        if service_client is None:
+                            try:
+                                graph_config = {"nlu_threshold": nlu_threshold, "mode": graph_mode,
+                                                "stream_tts": enable_tts, "checkpoint": True}
+                                app = get_graph_registry().get_app(model_name, api_key=api_key, config=graph_config)
+                            except Exception as e:
+                                st.error(f"❌ Graph init failed: {e}")
 
                         init_state: CallState = {
                             "call_id": st.session_state['call_id'],
-                            "transcript": st.session_state['transcript'],
+                            "transcript": st.session_state['transcript'].to_list(),
                             "clean_text": "",
                             "intent": "",
                             "confidence": 0.0,
                             "entities": {},
                             "script": "",
                             "next_action": "end_call",
+                            "nlu_source": "",
+                            "spans": turn_spans,
+                            "summary": st.session_state['transcript'].summary,
                             "test_input": None,
                         }
 
+                        # The checkpointed thread already holds the conversation; send only the new entry
+                        run_config = thread_config(st.session_state['call_id'])
+                        graph_input = {**init_state, "transcript": [user_entry]}
+
+                        spoken_sentences = 0
                         if app is not None:
                             with st.spinner('🤖 Processing intent...'):
-                                final_state = app.invoke(init_state)
+                                if enable_tts:
+                                    # Voice each finished sentence of line 1 while the rest is generating
+                                    final_state = init_state
+                                    for mode, chunk in app.stream(graph_input, run_config, stream_mode=["custom", "values"]):
+                                        if mode == "custom" and chunk.get("tts_sentence"):
+                                            if tts_engine is not None:
+                                                # One audio element per line: start rendering now, play once done
+                                                tts_engine.prewarm([chunk["tts_sentence"]])
+                                                continue
+                                            with span("speak", turn_spans):
+                                                speak(chunk["tts_sentence"])
+                                            spoken_sentences += 1
+                                        elif mode == "values":
+                                            final_state = chunk
+                                else:
+                                    final_state = app.invoke(graph_input, run_config)
+                            final_state = dict(final_state)
+                        elif service_client is not None:
+                            # Thin-client mode: the headless call service runs the graph
+                            try:
+                                with st.spinner('🤖 Processing intent...'):
+                                    final_state = service_client.submit_turn(st.session_state['call_id'], user_text)
+                            except Exception as e:
+                                st.error(f"❌ Call service error: {e}")
+                                final_state = {
+                                    **init_state,
+                                    "script": "(System error) Unable to process request.",
+                                    "intent": "error",
+                                    "confidence": 0.0,
+                                }
                         else:
                             final_state = {
                                 **init_state,
@@ -374,116 +509,224 @@ def load_langgraph_agenticai_app():
                             }
 
                         # Extract response and speak
-                        script_text = extract_script_text(final_state.get('script', ''))
+                        spans = final_state.get('spans') or turn_spans
+                        with span("extract_script_text", spans):
+                            script_text = extract_script_text(final_state.get('script', ''))
                         final_state['script'] = script_text
+                        final_state['spans'] = spans
                         
                         if script_text:
-                            st.session_state['transcript'].append(
-                                {"speaker": "agent", "text": script_text, "ts": time.time()}
-                            )
-                            if enable_tts:
-                                speak(script_text)
-
-                        # Save call log
-                        saved_path = save_call_log(st.session_state['call_id'], final_state)
+                            agent_entry = {"speaker": "agent", "text": script_text, "ts": time.time()}
+                            st.session_state['transcript'].append(agent_entry)
+                            new_entries.append(agent_entry)
+                            if app is not None:
+                                try:
+                                    app.update_state(run_config, {"transcript": [agent_entry]})
+                                    prune_checkpoints(get_checkpointer(), st.session_state['call_id'])
+                                except Exception as e:
+                                    st.warning(f"Failed to checkpoint call state: {e}")
+                            if enable_tts and not spoken_sentences:
+                                with span("speak", spans):
+                                    speak(customer_line(script_text), tts_engine)
+                        final_state['transcript'] = st.session_state['transcript'].to_list()
+
+                        # Save call log (its own span lands in the session state, not in the file)
+                        with span("save_call_log", spans):
+                            saved_path = save_call_log(st.session_state['call_id'], final_state, new_entries)
                         st.session_state['last_state'] = {"path": saved_path, "state": json_safe(final_state)}
-                        
-                        st.rerun()
+                        try:
+                            get_tracer().write_prometheus()
+                        except OSError:
+                            pass
         else:
             st.info("👆 Click **Start Call** to begin a new conversation")
 
-        # Transcript display
-        st.markdown("---")
-        st.markdown('<div class="section-header">💬 Conversation Transcript</div>', unsafe_allow_html=True)
-        
-        if st.session_state['transcript']:
-            for msg in st.session_state['transcript']:
-                ts = time.strftime('%H:%M:%S', time.localtime(msg['ts']))
-                if msg['speaker'] == 'user':
-                    st.markdown(
-                        f"<div class='transcript-user'><strong>👤 CALLER • {ts}</strong>"
-                        f"<div style='margin-top:8px; font-size:15px;'>{msg['text']}</div></div>",
-                        unsafe_allow_html=True
-                    )
-                elif msg['speaker'] == 'agent':
-                    st.markdown(
-                        f"<div class='transcript-agent'><strong>🤖 AGENT • {ts}</strong>"
-                        f"<div style='margin-top:8px; font-size:15px;'>{msg['text']}</div></div>",
-                        unsafe_allow_html=True
-                    )
-                else:
-                    st.markdown(
-                        f"<div class='transcript-user'><strong>⚙️ SYSTEM • {ts}</strong>"
-                        f"<div style='margin-top:8px; font-size:14px;'>{msg['text']}</div></div>",
-                        unsafe_allow_html=True
-                    )
-        else:
-            st.info("No messages yet. Start a call to begin.")
+        _transcript_panel()
 
     with right:
-        st.markdown('<div class="section-header">📊 Analytics Dashboard</div>', unsafe_allow_html=True)
-        
-        last = st.session_state.get('last_state')
-        if last:
-            state = last['state']
-            intent = state.get('intent', 'Unknown')
+        _analytics_panel()
+        st.markdown('---')
+        _history_panel()
+        st.markdown('<div class="footer-note">Powered by Cerevyn AI • Built with Streamlit</div>', unsafe_allow_html=True)
+        _render_caption()
+    _record_render("workspace", time.perf_counter() - started)
 
-            # Display confidence as 1..100 (UI), while internal is 0..1
-            conf_raw = float(state.get('confidence', 0.0) or 0.0)  # 0..1
-            conf_pct = max(1.0, min(conf_raw * 100.0, 100.0))     # 1..100 for display
 
-            st.markdown("<div class='big-label'>Detected Intent</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='big-value'>{intent}</div>", unsafe_allow_html=True)
-            
-            st.markdown("<div class='big-label'>Confidence Score (1–100)</div>", unsafe_allow_html=True)
-            st.markdown(f"<div class='big-value'>{conf_pct:.2f}</div>", unsafe_allow_html=True)
-            
-            # Progress bar expects 0..1; mirror the displayed 1..100 range
-            st.progress(conf_pct / 100.0)
+def _show_earlier_messages() -> None:
+    st.session_state['transcript_pages'] = st.session_state.get('transcript_pages', 1) + 1
 
-            st.markdown("---")
-            
-            safe_filename = os.path.basename(last.get('path') or f"{st.session_state.get('call_id', 'call')}.json")
-            st.download_button(
-                '⬇️ Download Call State',
-                data=json.dumps(state, indent=2),
-                file_name=safe_filename,
-                mime='application/json',
-                use_container_width=True
-            )
-        else:
-            st.info('📭 No call data yet.\n\nStart a call to see analytics.')
 
-        st.markdown('---')
-        st.markdown('<div class="section-header">📂 Call History</div>', unsafe_allow_html=True)
+@st.fragment
+def _transcript_panel():
+    """Newest TRANSCRIPT_PAGE_SIZE messages as one markdown element; "Show earlier"
+    adds a page and reruns only this fragment."""
+    st.markdown("---")
+    st.markdown('<div class="section-header">💬 Conversation Transcript</div>', unsafe_allow_html=True)
+
+    transcript = st.session_state['transcript']
+    if not transcript:
+        st.session_state['transcript_pages'] = 1
+        st.info("No messages yet. Start a call to begin.")
+        return
+    shown = min(len(transcript), st.session_state.get('transcript_pages', 1) * TRANSCRIPT_PAGE_SIZE)
+    hidden = len(transcript) - shown
+    if hidden:
+        st.button(f"⬆️ Show {min(hidden, TRANSCRIPT_PAGE_SIZE)} earlier", on_click=_show_earlier_messages,
+                  key="transcript_earlier")
+    st.caption(f"{transcript.total // 2} exchanges" + (f" • {transcript.total - len(transcript)} earlier messages "
+                                                     f"are in the call log" if transcript.total > len(transcript) else ""))
+    st.markdown("".join(_message_html(m['speaker'], m['text'], m['ts']) for m in transcript.tail(shown)),
+                unsafe_allow_html=True)
+
+
+@st.fragment
+def _analytics_panel():
+    st.markdown('<div class="section-header">📊 Analytics Dashboard</div>', unsafe_allow_html=True)
+    
+    last = st.session_state.get('last_state')
+    if last:
+        state = last['state']
+        intent = state.get('intent', 'Unknown')
+
+        # Display confidence as 1..100 (UI), while internal is 0..1
+        conf_raw = float(state.get('confidence', 0.0) or 0.0)  # 0..1
+        conf_pct = max(1.0, min(conf_raw * 100.0, 100.0))     # 1..100 for display
+
+        st.markdown("<div class='big-label'>Detected Intent</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='big-value'>{intent}</div>", unsafe_allow_html=True)
         
-        logs = sorted([f for f in os.listdir(LOG_DIR) if f.endswith('.json')], reverse=True)
-        if logs:
-            selected_log = st.selectbox("Select a call log", logs, index=0, key="log_selector")
-            
-            if selected_log:
-                fpath = os.path.join(LOG_DIR, selected_log)
-                try:
-                    with open(fpath, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    with st.expander("📄 View JSON", expanded=False):
-                        st.json(data)
-                    
-                    st.download_button(
-                        f"⬇️ Download {selected_log}",
-                        data=json.dumps(data, indent=2),
-                        file_name=selected_log,
-                        mime="application/json",
-                        use_container_width=True,
-                        key=f"dl-{selected_log}"
-                    )
-                except Exception as e:
-                    st.error(f"Failed to load log: {e}")
+        st.markdown("<div class='big-label'>Confidence Score (1–100)</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='big-value'>{conf_pct:.2f}</div>", unsafe_allow_html=True)
+        
+        # Progress bar expects 0..1; mirror the displayed 1..100 range
+        st.progress(conf_pct / 100.0)
+
+        st.markdown("---")
+        
+        safe_filename = f"{state.get('call_id') or st.session_state.get('call_id') or 'call'}.json"
+        st.download_button(
+            '⬇️ Download Call State',
+            data=json.dumps(state, indent=2),
+            file_name=safe_filename,
+            mime='application/json',
+            use_container_width=True
+        )
+    else:
+        st.info('📭 No call data yet.\n\nStart a call to see analytics.')
+
+    # Trends from the incrementally maintained rollups (telemetry/rollups.py)
+    windows = {"Last hour": ("minute", 60), "Last 24 hours": ("hour", 24), "Last 30 days": ("day", 30)}
+    with st.expander("📈 Trends", expanded=False):
+        window = st.selectbox("Window", list(windows), index=1, key="trend_window")
+        resolution, span_count = windows[window]
+        rollups = get_rollups(LOG_DIR)
+        summary = rollups.window(resolution, span_count).summary()
+        if summary["turns"]:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Turns", summary["turns"])
+            m2.metric("Fallback rate", f"{summary['fallback_rate']:.1%}")
+            m3.metric("Avg confidence", f"{summary['avg_confidence']:.2f}")
+            lat = summary["latency_ms"]
+            st.caption(f"Turn latency p50 {lat['p50']:.0f} ms • p95 {lat['p95']:.0f} ms • p99 {lat['p99']:.0f} ms")
+            st.bar_chart(summary["intents"])
+            st.line_chart({
+                "turns": [r.turns for _, r in rollups.series(resolution, span_count)],
+            })
         else:
-            st.write('📭 No saved logs yet.')
+            st.caption("No turns logged in this window.")
+
+    latency = get_tracer().summary()
+    if latency:
+        with st.expander("⏱ Stage Latency", expanded=False):
+            if last and last['state'].get('spans'):
+                st.caption("Last turn")
+                st.dataframe(
+                    [{"stage": s["name"], "ms": s["duration_ms"], "source": s.get("source", ""),
+                      "tokens": s.get("tokens", ""), "retries": s.get("retries", "")}
+                     for s in last['state']['spans']],
+                    use_container_width=True, hide_index=True,
+                )
+            st.caption("This process")
+            st.dataframe(latency, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _history_panel():
+    st.markdown('<div class="section-header">📂 Call History</div>', unsafe_allow_html=True)
+    
+    # Indexed history (storage/call_index.py): filters + keyset pagination, no directory scan
+    index = get_call_index(LOG_DIR)
+    f1, f2 = st.columns(2)
+    with f1:
+        intent_filter = st.selectbox("Intent", ["All"] + index.intents(), key="history_intent")
+    with f2:
+        conf_range = st.slider("Confidence", 0.0, 1.0, (0.0, 1.0), 0.05, key="history_conf")
+    date_range = st.date_input("Date range", value=(), key="history_dates")
+    filters = {
+        "intent": None if intent_filter == "All" else intent_filter,
+        "min_confidence": conf_range[0] if conf_range[0] > 0.0 else None,
+        "max_confidence": conf_range[1] if conf_range[1] < 1.0 else None,
+        "since": datetime.combine(date_range[0], dtime.min).timestamp() if len(date_range) >= 1 else None,
+        "until": (datetime.combine(date_range[-1], dtime.min) + timedelta(days=1)).timestamp() if len(date_range) >= 1 else None,
+    }
+    # A stack of page cursors; changing any filter starts again from the newest call
+    if st.session_state.get('history_filters') != filters:
+        st.session_state['history_filters'] = filters
+        st.session_state['history_cursors'] = [None]
+    cursors = st.session_state['history_cursors']
+    rows, next_cursor = index.page(limit=HISTORY_PAGE_SIZE, after=cursors[-1], **filters)
+
+    if rows:
+        labels = {
+            r['call_id']: f"{r['call_id']} • {r['intent'] or '—'} • {float(r['confidence'] or 0.0):.2f}"
+                          f"{'' if r['ended_at'] else ' • open'}"
+            for r in rows
+        }
+        selected_call = st.selectbox("Select a call log", list(labels), format_func=labels.get, key="log_selector")
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun(scope="fragment")
+        with p2:
+            st.caption(f"Page {len(cursors)} • {index.count(**filters)} calls")
+        with p3:
+            if st.button("Older ▶", disabled=next_cursor is None, use_container_width=True):
+                cursors.append(next_cursor)
+                st.rerun(scope="fragment")
+        
+        if selected_call:
+            selected_log = f"{selected_call}.json"
+            try:
+                data = get_call_journal(LOG_DIR).load(selected_call)
+                if data is None:
+                    raise ValueError("unreadable log")
+                
+                with st.expander("📄 View JSON", expanded=False):
+                    st.json(data)
+                
+                st.download_button(
+                    f"⬇️ Download {selected_log}",
+                    data=json.dumps(data, indent=2),
+                    file_name=selected_log,
+                    mime="application/json",
+                    use_container_width=True,
+                    key=f"dl-{selected_log}"
+                )
+            except Exception as e:
+                st.error(f"Failed to load log: {e}")
+    else:
+        st.write('📭 No saved logs yet.')
+
+
+def _render_caption() -> None:
+    """Latest full-run and workspace render times, to check render cost stays flat as calls grow."""
+    times = st.session_state.get('render_times') or []
+    last = {t["kind"]: t for t in times}
+    if last:
+        st.caption(" • ".join(f"{kind} render {t['ms']:.0f} ms at {t['messages']} messages"
+                              for kind, t in sorted(last.items())))
 
-        st.markdown('<div class="footer-note">Powered by Cerevyn AI • Built with Streamlit</div>', unsafe_allow_html=True)
 
 if __name__ == '__main__':
     load_langgraph_agenticai_app()
\ No newline at end of file
@@ -0,0 +1,212 @@
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Gazetteers: lower-case surface form -> canonical value
+LOCATIONS: Dict[str, str] = {
+    "mumbai": "Mumbai", "bombay": "Mumbai", "navi mumbai": "Navi Mumbai", "thane": "Thane",
+    "delhi": "Delhi", "new delhi": "New Delhi", "noida": "Noida", "gurgaon": "Gurugram", "gurugram": "Gurugram",
+    "bengaluru": "Bengaluru", "bangalore": "Bengaluru", "hyderabad": "Hyderabad", "secunderabad": "Secunderabad",
+    "chennai": "Chennai", "madras": "Chennai", "kolkata": "Kolkata", "calcutta": "Kolkata", "pune": "Pune",
+    "ahmedabad": "Ahmedabad", "surat": "Surat", "jaipur": "Jaipur", "lucknow": "Lucknow", "kanpur": "Kanpur",
+    "nagpur": "Nagpur", "indore": "Indore", "bhopal": "Bhopal", "patna": "Patna", "chandigarh": "Chandigarh",
+    "kochi": "Kochi", "cochin": "Kochi", "coimbatore": "Coimbatore", "mysore": "Mysuru", "mysuru": "Mysuru",
+    "visakhapatnam": "Visakhapatnam", "vizag": "Visakhapatnam", "goa": "Goa", "guwahati": "Guwahati",
+    "bhubaneswar": "Bhubaneswar", "vadodara": "Vadodara", "ludhiana": "Ludhiana", "agra": "Agra",
+    # Neighbourhoods seen in complaints
+    "indiranagar": "Indiranagar", "koramangala": "Koramangala", "whitefield": "Whitefield",
+    "hsr layout": "HSR Layout", "jayanagar": "Jayanagar", "electronic city": "Electronic City",
+    "marathahalli": "Marathahalli", "andheri": "Andheri", "bandra": "Bandra", "powai": "Powai",
+    "dwarka": "Dwarka", "saket": "Saket", "connaught place": "Connaught Place", "salt lake": "Salt Lake",
+    "gachibowli": "Gachibowli", "hitech city": "HITEC City", "t nagar": "T. Nagar", "velachery": "Velachery",
+}
+
+DEVICE_BRANDS: Dict[str, str] = {
+    "iphone": "iPhone", "samsung galaxy": "Samsung Galaxy", "galaxy": "Samsung Galaxy", "samsung": "Samsung",
+    "redmi note": "Redmi Note", "redmi": "Redmi", "xiaomi": "Xiaomi", "oneplus": "OnePlus", "one plus": "OnePlus",
+    "google pixel": "Pixel", "pixel": "Pixel", "vivo": "Vivo", "oppo": "Oppo", "realme": "Realme", "poco": "Poco",
+    "nokia": "Nokia", "motorola": "Motorola", "moto": "Moto", "iqoo": "iQOO", "nothing phone": "Nothing Phone",
+    "jiophone": "JioPhone",
+}
+
+_MODEL_SUFFIXES = {"pro": "Pro", "max": "Max", "plus": "Plus", "ultra": "Ultra", "lite": "Lite", "mini": "Mini",
+                   "neo": "Neo", "5g": "5G", "fe": "FE", "+": "+"}
+
+MONTHS: Dict[str, int] = {
+    m: i + 1 for i, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+        ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"),
+        ("nov", "november"), ("dec", "december"),
+    ]) for m in names
+}
+# Month tokens that are also everyday words ("i may 2 recharge"); they only count as
+# a month with an ordinal day, "of", a year or a date preposition before them
+AMBIGUOUS_MONTHS = frozenset({"may", "mar"})
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def _alternation(words) -> str:
+    # Longest first so "navi mumbai" wins over "mumbai"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+_ORD = r"(?:st|nd|rd|th)?"
+
+_DATE_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("iso", re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")),
+    ("dmy", re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b")),
+    ("day_month", re.compile(rf"\b(\d{{1,2}}){_ORD}(?:\s+of)?\s+({_MONTH})\b\.?(?:,?\s+(\d{{4}}))?")),
+    ("month_day", re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}}){_ORD}\b(?:,?\s+(\d{{4}}))?")),
+    ("day_before_yesterday", re.compile(r"\bday before yesterday\b")),
+    ("yesterday", re.compile(r"\byesterday\b")),
+    ("today", re.compile(r"\b(?:today|this morning|tonight)\b")),
+    ("days_ago", re.compile(r"\b(\d{1,2}|a|one|two|three|four|five|six|seven) days? ago\b")),
+    ("weekday", re.compile(rf"\b(?:last|on|since|this past)\s+({_alternation(WEEKDAYS)})\b")),
+]
+_ORDINAL_DAY = re.compile(r"\d(?:st|nd|rd|th)\b")
+_DATE_PREPOSITION = re.compile(r"\b(?:on|since|from|till|until|by|before|after)\s+$")
+_SMALL_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+_ERROR_CODE = re.compile(
+    r"\b(?:error|err|code)\s*(?:code|no\.?|number)?\s*[:#]?\s*((?:0x[0-9a-f]{2,8})|(?:[a-z]{0,4}[-_]?\d{2,6}[a-z]?))\b")
+_ACCOUNT = re.compile(
+    r"\b(?:account|a/c|acct|customer id|cust id|mobile|phone|connection)\s*(?:number|no\.?|num|id)?\s*"
+    r"(?:is|:|#|-)?\s*(\d[\d\s-]{4,18}\d)\b")
+_BARE_ACCOUNT = re.compile(r"(?<![\d₹])\b(\d{10,12})\b")
+_CURRENCY = r"(?:₹|\b(?:rs\.?|inr|rupees?)(?![a-z]))"
+_AMOUNT_PATTERNS = [
+    re.compile(rf"{_CURRENCY}\s*(\d[\d,]*(?:\.\d{{1,2}})?)"),
+    re.compile(rf"\b(\d[\d,]*(?:\.\d{{1,2}})?)\s*(?:{_CURRENCY}|/-)"),
+    re.compile(r"\b(\d{2,5})\s+(?:recharge|top[\s-]?up|topup|plan|pack)\b"),
+    re.compile(rf"\b(?:recharge|top[\s-]?up|topup|plan|pack)\s+(?:of|for|worth)?\s*{_CURRENCY}?\s*(\d{{2,5}})\b"),
+]
+_RECHARGE_CONTEXT = re.compile(r"\b(?:recharge|top[\s-]?up|topup|data pack|plan)")
+_LOCATION = re.compile(rf"\b({_alternation(LOCATIONS)})\b")
+_DEVICE = re.compile(
+    rf"\b({_alternation(DEVICE_BRANDS)})"
+    rf"(?:\s*([a-z]{{0,2}}\d{{1,4}}[a-z]{{0,2}}(?:\s*(?:{_alternation(_MODEL_SUFFIXES)}))*))?(?![\w])")
+
+
+def _mask(text: str, start: int, end: int) -> str:
+    """Blanks a matched span so later patterns do not reuse its digits."""
+    return text[:start] + " " * (end - start) + text[end:]
+
+
+def _digits(s: str) -> str:
+    return re.sub(r"\D", "", s)
+
+
+def _amount(s: str) -> str:
+    value = s.replace(",", "")
+    if "." in value:
+        whole, frac = value.split(".", 1)
+        return whole if not frac.strip("0") else f"{whole}.{frac}"
+    return value
+
+
+class EntityExtractor:
+    """Deterministic extractor for the pattern-shaped NLU entities.
+
+    Fills account_number, recharge_amount (or amount when no recharge is mentioned),
+    date, location, device_model and error_code with the normalization the NLU
+    prompt asks the LLM for: digits only, ISO dates (relative dates resolved
+    against `today`) and gazetteer-canonical names. Patterns are compiled once at
+    import; dates and error codes are matched first and masked, so their digits
+    never become an account number or amount.
+    """
+
+    def extract(self, text: str, today: Optional[date] = None) -> Dict[str, str]:
+        txt = (text or "").lower()
+        if not txt.strip():
+            return {}
+        today = today or date.today()
+        out: Dict[str, str] = {}
+
+        found = self._date(txt, today)
+        if found is not None:
+            out["date"], (start, end) = found
+            txt = _mask(txt, start, end)
+
+        m = _ERROR_CODE.search(txt)
+        if m:
+            out["error_code"] = m.group(1).upper()
+            txt = _mask(txt, m.start(), m.end())
+
+        m = _ACCOUNT.search(txt) or _BARE_ACCOUNT.search(txt)
+        if m and 6 <= len(_digits(m.group(1))) <= 16:
+            out["account_number"] = _digits(m.group(1))
+            txt = _mask(txt, m.start(), m.end())
+
+        for pattern in _AMOUNT_PATTERNS:
+            m = pattern.search(txt)
+            if m:
+                out["recharge_amount" if _RECHARGE_CONTEXT.search(txt) else "amount"] = _amount(m.group(1))
+                break
+
+        m = _LOCATION.search(txt)
+        if m:
+            out["location"] = LOCATIONS[m.group(1)]
+
+        m = _DEVICE.search(txt)
+        if m:
+            brand = DEVICE_BRANDS[re.sub(r"\s+", " ", m.group(1))]
+            model = " ".join(_MODEL_SUFFIXES.get(t, t.upper()) for t in re.findall(r"\+|[a-z0-9]+", m.group(2) or ""))
+            out["device_model"] = f"{brand} {model}".strip()
+        return out
+
+    def _date(self, txt: str, today: date) -> Optional[Tuple[str, Tuple[int, int]]]:
+        for kind, pattern in _DATE_PATTERNS:
+            for m in pattern.finditer(txt):
+                if kind in ("day_month", "month_day") and not self._month_is_date(kind, m, txt):
+                    continue
+                d = self._resolve(kind, m, today)
+                if d is not None:
+                    return d.isoformat(), m.span()
+        return None
+
+    @staticmethod
+    def _month_is_date(kind: str, m: re.Match, txt: str) -> bool:
+        month = m.group(2) if kind == "day_month" else m.group(1)
+        if month not in AMBIGUOUS_MONTHS:
+            return True
+        text = m.group(0)
+        return bool(m.group(3) or _ORDINAL_DAY.search(text) or re.search(r"\bof\b", text)
+                    or _DATE_PREPOSITION.search(txt[:m.start()]))
+
+    @staticmethod
+    def _resolve(kind: str, m: re.Match, today: date) -> Optional[date]:
+        try:
+            if kind == "iso":
+                return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            if kind == "dmy":  # day first, as written in India
+                year = int(m.group(3))
+                return date(year + 2000 if year < 100 else year, int(m.group(2)), int(m.group(1)))
+            if kind in ("day_month", "month_day"):
+                day, month, year = (m.group(1), m.group(2), m.group(3)) if kind == "day_month" else \
+                    (m.group(2), m.group(1), m.group(3))
+                d = date(int(year) if year else today.year, MONTHS[month], int(day))
+                # No year given: the most recent such date (complaints are about the past)
+                return d.replace(year=d.year - 1) if not year and d > today else d
+        except ValueError:
+            return None
+        if kind == "day_before_yesterday":
+            return today - timedelta(days=2)
+        if kind == "yesterday":
+            return today - timedelta(days=1)
+        if kind == "today":
+            return today
+        if kind == "days_ago":
+            n = m.group(1)
+            return today - timedelta(days=int(n) if n.isdigit() else _SMALL_NUMBERS[n])
+        if kind == "weekday":
+            back = (today.weekday() - WEEKDAYS.index(m.group(1))) % 7 or 7
+            return today - timedelta(days=back)
+        return None
+
+
+_extractor = EntityExtractor()
+
+
+def extract_entities(text: str, today: Optional[date] = None) -> Dict[str, str]:
+    return _extractor.extract(text, today)
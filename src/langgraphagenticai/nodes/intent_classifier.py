@@ -0,0 +1,55 @@
+import math
+import re
+from typing import Dict, List, Tuple
+
+from src.langgraphagenticai.state.state import NLUOutput
+
+
+class KeywordIntentClassifier:
+    """Local weighted-keyword intent classifier used as the NLU fast path.
+
+    Each intent maps to (pattern, weight) pairs; a pattern is a regex fragment that
+    must match whole words, so inflections are listed in it ("bill(?:s|ing)?").
+    Confidence combines how much evidence the top intent has with its margin over
+    the runner-up. evidence_scale is fitted by bench/nlu_calibration.py so that no
+    single keyword on its own reaches the default LLM threshold.
+    """
+
+    def __init__(self, keywords: Dict[str, List[Tuple[str, float]]], default_intent: str,
+                 evidence_scale: float = 2.0):
+        self.default_intent = default_intent
+        self.evidence_scale = evidence_scale
+        self._patterns = {
+            intent: [(re.compile(rf"\b(?:{phrase})\b"), weight) for phrase, weight in kws]
+            for intent, kws in keywords.items()
+        }
+
+    def scores(self, text: str) -> Dict[str, float]:
+        txt = (text or "").lower()
+        return {
+            intent: sum(weight for pat, weight in pats if pat.search(txt))
+            for intent, pats in self._patterns.items()
+        }
+
+    def confidence(self, top: float, runner_up: float) -> float:
+        if top <= 0.0:
+            return 0.0
+        evidence = 1.0 - math.exp(-top / self.evidence_scale)
+        margin = top / (top + runner_up)
+        return round(evidence * margin, 4)
+
+    def rank(self, text: str) -> List[Tuple[str, float]]:
+        """Intents with any keyword evidence, highest score first."""
+        return sorted(((i, sc) for i, sc in self.scores(text).items() if sc > 0.0), key=lambda kv: kv[1], reverse=True)
+
+    def predict(self, text: str) -> NLUOutput:
+        ranked = sorted(self.scores(text).items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked or ranked[0][1] <= 0.0:
+            return NLUOutput(intent=self.default_intent, confidence=0.0, notes="local:no-match")
+        top_intent, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return NLUOutput(
+            intent=top_intent,
+            confidence=self.confidence(top, runner_up),
+            notes=f"local:score={top:.1f},runner_up={runner_up:.1f}",
+        )
@@ -1,12 +1,28 @@
+import asyncio
+import contextvars
+import threading
 import time
-from src.langgraphagenticai.state.state import NLUOutput, CallState, TranscriptEntry
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.langgraphagenticai.state.state import NLUOutput, FusedTurnOutput, CallState, TranscriptEntry
 from src.langgraphagenticai.LLMS.groqllm import GroqLLM
-import pyttsx3
+from src.langgraphagenticai.LLMS.scheduler import ScheduledLLM, on_request_sent
+from src.langgraphagenticai.nodes.intent_classifier import KeywordIntentClassifier
+from src.langgraphagenticai.nodes.entity_extractor import extract_entities
+from src.langgraphagenticai.tts.streaming import SentenceChunker
+from src.langgraphagenticai.cache.script_cache import ScriptCache, get_script_cache
+from src.langgraphagenticai.state.transcript import context_block
+from src.langgraphagenticai.prompts.registry import RenderedPrompt, count_tokens, get_prompt_registry
+from src.langgraphagenticai.telemetry.tracing import record_tokens
 import speech_recognition as sr
 from groq import Groq
 import tempfile
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
+
+try:
+    from langgraph.config import get_stream_writer
+except ImportError:  # older langgraph: streaming TTS disabled
+    get_stream_writer = None
 ALLOWED_INTENTS: List[str] = [
     "Billing Issue",
     "SIM Not Working",
@@ -15,10 +31,114 @@ ALLOWED_INTENTS: List[str] = [
     "Data Not Working After Recharge",
     "Call Drops Frequently",
 ]
+# (pattern, weight) per intent; each pattern is a regex fragment matched as whole words,
+# with inflections spelled out so "sim" does not hit "similar" nor "bill" "billion"
+INTENT_KEYWORDS: Dict[str, List[Tuple[str, float]]] = {
+    "Billing Issue": [
+        ("bill(?:s|ed|ing)?", 3.0), ("charge[sd]?", 2.0), ("charging", 2.0), ("invoices?", 3.0),
+        ("overcharg(?:e|ed|es|ing)", 3.0), ("payments?", 2.0), ("paid", 1.5), ("refunds?", 1.5),
+        ("unusually high", 1.5), ("deduct(?:ed|ion|ions)?", 1.5), ("amount", 0.5),
+    ],
+    "SIM Not Working": [
+        ("sims?", 3.0), ("no service", 2.0), ("sim card", 1.0), ("not registered", 2.0),
+        ("invalid sim", 2.0), ("insert(?:ed|ing)?", 1.0), ("emergency calls only", 2.0),
+    ],
+    "No Network Coverage": [
+        ("no network", 3.0), ("coverage", 3.0), ("no signal", 3.0), ("signals?", 1.5), ("towers?", 2.5),
+        ("network", 1.0), ("out of range", 2.5), ("no bars", 2.5),
+    ],
+    "Internet Speed Slow": [
+        ("slow(?:ly|er|ness)?", 3.0), ("speeds?", 2.5), ("buffer(?:s|ing)?", 2.5), ("lag(?:s|gy|ging)?", 2.0),
+        ("internet", 1.0), ("mbps", 2.0), ("downfall", 1.5), ("loading", 1.0),
+    ],
+    "Data Not Working After Recharge": [
+        ("recharge[sd]?", 3.0), ("recharging", 3.0), ("top up", 3.0), ("topup", 3.0), ("not activated", 2.5),
+        ("data pack", 2.5), ("data", 1.5), ("plan", 1.0), ("rupees", 1.0), ("internet", 0.5),
+    ],
+    "Call Drops Frequently": [
+        ("call drops?", 3.5), ("drop(?:s|ped|ping)?", 2.0), ("disconnect(?:s|ed|ing)?", 2.5), ("cut off", 2.5),
+        ("calls", 1.0), ("mid call", 2.5), ("mid-call", 2.5), ("keeps cutting", 3.0),
+    ],
+}
+# Internal action labels each domain node may choose from (shared with fused mode)
+INTENT_ACTION_LABELS: Dict[str, List[str]] = {
+    "Billing Issue": ["adjust-bill", "open-billing-ticket", "escalate-to-billing", "inform-no-issue-found", "request-docs"],
+    "SIM Not Working": ["remote-provision", "schedule-sim-replacement", "ticket-device-check", "inform-user-no-issue-detected"],
+    "No Network Coverage": ["create-network-ticket", "advise-roaming", "check-provisioning", "no-action"],
+    "Internet Speed Slow": ["automated-reset", "create-speed-ticket", "advise-plan-upgrade", "no-action"],
+    "Data Not Working After Recharge": ["reprovision-data", "refund-if-failed", "open-ticket", "no-action"],
+    "Call Drops Frequently": ["create-network-investigation", "schedule-field-check", "check-provisioning", "no-action"],
+}
+DEFAULT_INTENT = "Billing Issue"
+# Local classifier confidence at or above this skips the LLM NLU call
+# Fitted by bench/nlu_calibration.py on the labelled utterances and call_logs (100% local
+# precision there); no single keyword on its own reaches the threshold
+DEFAULT_EVIDENCE_SCALE = 1.75
+DEFAULT_NLU_THRESHOLD = 0.87
+# Speculative mode: at most this many domain scripts start while the LLM NLU call runs;
+# the runner-up intent only when its keyword score is within this ratio of the top one
+SPECULATE_MAX = 2
+SPECULATE_RATIO = 0.5
+# Where entities come from: "merge" = rule extractor, LLM fills only keys it missed;
+# "rules" = rule extractor only (the LLM NLU prompt asks for the intent alone);
+# "llm" = LLM extraction only
+ENTITY_MODES = ["merge", "rules", "llm"]
+
+
+class _SpeculativeSentences:
+    """Stream writer for a speculative script: holds its sentences until the intent is
+    confirmed, then forwards them (and any later ones) to the node's writer. `sent`
+    records whether the script's LLM request actually went out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held: List[dict] = []
+        self._writer = None
+        self.sent = False
+
+    def mark_sent(self) -> None:
+        self.sent = True
+
+    def __call__(self, chunk: dict) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._held.append(chunk)
+            else:
+                self._writer(chunk)
+
+    def release(self, writer) -> None:
+        with self._lock:
+            for chunk in self._held:
+                writer(chunk)
+            self._held = []
+            self._writer = writer
+
+
+# Set inside speculative jobs so their sentences go to a _SpeculativeSentences
+_speculative_writer: contextvars.ContextVar = contextvars.ContextVar("speculative_writer", default=None)
+
+
 class CallCenterNode:
-    def __init__(self, model=None, llm=None):
+    def __init__(self, model=None, llm=None, nlu_threshold: float = DEFAULT_NLU_THRESHOLD,
+                 stream_tts: bool = False, script_cache: Optional[ScriptCache] = None, entity_mode: str = "merge"):
+        if entity_mode not in ENTITY_MODES:
+            raise ValueError(f"Unknown entity mode: {entity_mode}")
+        self.entity_mode = entity_mode
         # Ensure self.llm is a ChatGroq instance with invoke()/with_structured_output()
         self.llm = llm or self.get_llm_model(model)
+        # Built once per node set; the graph registry reuses it across turns
+        self.structured_llm = self.llm.with_structured_output(NLUOutput)
+        self.structured_fused_llm = self.llm.with_structured_output(FusedTurnOutput)
+        self.classifier = KeywordIntentClassifier(INTENT_KEYWORDS, default_intent=DEFAULT_INTENT,
+                                                  evidence_scale=DEFAULT_EVIDENCE_SCALE)
+        self.nlu_threshold = nlu_threshold
+        self.stream_tts = stream_tts and get_stream_writer is not None
+        self.script_cache = script_cache
+        # Versioned templates: static system message + small human message per prompt
+        self.prompts = get_prompt_registry()
+        self._speculation_pool: Optional[ThreadPoolExecutor] = None
+        self._speculation_lock = threading.Lock()
+        self.speculation = {"turns": 0, "launched": 0, "hits": 0, "misses": 0, "cancelled": 0, "wasted_tokens": 0}
 
     def get_llm_model(self, model=None):
         # Return the actual ChatGroq instance
@@ -26,6 +146,138 @@ class CallCenterNode:
 
 
 
+    def _script_cache_lookup(self, state: CallState, prompt=None):
+        if self.script_cache is None:
+            return None, None, None
+        # Template key in the namespace: editing or re-versioning a prompt invalidates its scripts
+        namespace = f"{getattr(self.llm, 'model_name', '')}|{getattr(prompt, 'key', '')}"
+        key, slots = self.script_cache.make_key(
+            namespace, state.get('intent', ''),
+            state.get('clean_text', ''), state.get('entities', {}), getattr(prompt, 'context', ''),
+        )
+        return key, slots, self.script_cache.get(key, slots)
+
+    def _script_cache_store(self, key, slots, script) -> None:
+        if self.script_cache is None or key is None:
+            return
+        text = script.content if hasattr(script, "content") else script
+        if isinstance(text, str) and text.strip():
+            self.script_cache.set(key, slots, text)
+
+    def generate_script(self, prompt: RenderedPrompt, state: CallState):
+        """Runs the domain prompt, answering from the script cache when possible.
+
+        With stream_tts, tokens are streamed and each finished sentence of line 1 is
+        emitted as a {"tts_sentence": ...} custom stream event.
+        """
+        key, slots, cached = self._script_cache_lookup(state, prompt)
+        if cached is not None:
+            return cached
+        script = self._run_prompt(prompt)
+        self._script_cache_store(key, slots, script)
+        return script
+
+    async def agenerate_script(self, prompt: RenderedPrompt, state: CallState):
+        """Async generate_script: same cache and streaming behaviour over ainvoke/astream."""
+        key, slots, cached = self._script_cache_lookup(state, prompt)
+        if cached is not None:
+            return cached
+        script = await self._arun_prompt(prompt)
+        self._script_cache_store(key, slots, script)
+        return script
+
+    def _stream_writer(self):
+        if not self.stream_tts:
+            return None
+        held = _speculative_writer.get()
+        if held is not None:
+            return held
+        try:
+            return get_stream_writer()
+        except Exception:
+            return None
+
+    @staticmethod
+    def _llm_tokens(prompt: RenderedPrompt, result, usage: Optional[dict] = None) -> int:
+        """Tokens one LLM call used: usage_metadata when reported, else the prompt's
+        token count plus an estimate of the output (structured results as JSON)."""
+        usage = usage or getattr(result, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            return int(usage["total_tokens"])
+        if hasattr(result, "model_dump_json"):
+            text = result.model_dump_json()
+        else:
+            text = str(getattr(result, "content", result))
+        return prompt.tokens + count_tokens(text)
+
+    def _invoke(self, llm, prompt: RenderedPrompt):
+        result = llm.invoke(prompt)
+        record_tokens(self._llm_tokens(prompt, result))
+        return result
+
+    async def _ainvoke(self, llm, prompt: RenderedPrompt):
+        result = await llm.ainvoke(prompt)
+        record_tokens(self._llm_tokens(prompt, result))
+        return result
+
+    def _run_prompt(self, prompt: RenderedPrompt):
+        writer = self._stream_writer()
+        if writer is None:
+            return self._invoke(self.llm, prompt)
+        chunker = SentenceChunker()
+        parts = []
+        usage: dict = {}
+        for chunk in self.llm.stream(prompt):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            parts.append(text)
+            for sentence in chunker.feed(text):
+                writer({"tts_sentence": sentence})
+        for sentence in chunker.flush():
+            writer({"tts_sentence": sentence})
+        script = "".join(parts)
+        record_tokens(self._llm_tokens(prompt, script, usage))
+        return script
+
+    async def _arun_prompt(self, prompt: RenderedPrompt):
+        writer = self._stream_writer()
+        if writer is None:
+            return await self._ainvoke(self.llm, prompt)
+        chunker = SentenceChunker()
+        parts = []
+        usage: dict = {}
+        async for chunk in self.llm.astream(prompt):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+            parts.append(text)
+            for sentence in chunker.feed(text):
+                writer({"tts_sentence": sentence})
+        for sentence in chunker.flush():
+            writer({"tts_sentence": sentence})
+        script = "".join(parts)
+        record_tokens(self._llm_tokens(prompt, script, usage))
+        return script
+
+    def _domain_turn(self, prompt: RenderedPrompt, state: CallState) -> CallState:
+        state['script'] = self.generate_script(prompt, state)
+        state['next_action'] = "play_tts"
+        return state
+
+    async def _adomain_turn(self, prompt: RenderedPrompt, state: CallState) -> CallState:
+        state['script'] = await self.agenerate_script(prompt, state)
+        state['next_action'] = "play_tts"
+        return state
+
+    def make_async_domain_node(self, node_name: str):
+        """Async variant of a domain node (e.g. "billing_issue_node") for the async graph."""
+        build_prompt = getattr(self, node_name[:-len("_node")] + "_prompt")
+
+        async def domain_node(state: CallState) -> CallState:
+            return await self._adomain_turn(build_prompt(state), state)
+
+        domain_node.__name__ = f"a{node_name}"
+        return domain_node
+
     def preprocess_node(self,state: CallState) -> CallState:
         """Cleans the latest transcript entry and updates clean_text."""
         if state['transcript']:
@@ -37,189 +289,337 @@ class CallCenterNode:
         state['intent'] = "Unknown"
         state['confidence'] = 0.0
         state['entities'] = {}
+        state['nlu_source'] = ""
         
         return state
 
-    def nlu_node(self, state: CallState) -> CallState:
-        intents = ALLOWED_INTENTS
-        prompt = f"""
-You are an NLU module for a telecom call center.
-
-Task:
-1) Classify the user's intent into exactly ONE of these intents (must pick one): {intents}
-2) Extract entities as key:value pairs (e.g., account_number, recharge_amount, date(YYYY-MM-DD), location, device_model, error_code)
-3) Return ONLY a single JSON object matching this schema:
-{{
-  "intent": "<one of: {intents}>",
-  "confidence": <float 0.0..1.0>,
-  "entities": {{ "<key>": "<value>" }},
-  "notes": "<optional short note>"
-}}
-
-Rules:
-- Output must be valid JSON only (no markdown, no extra text).
-- Always choose the best matching intent from the list.
-- Normalize numbers by removing non-digits; use ISO date when possible.
-
-User Input: "{state.get('clean_text','')}"
-"""
-        structured_llm = self.llm.with_structured_output(NLUOutput)
-
-        def fallback_match(txt: str) -> str:
-            txt = (txt or "").lower()
-            best_intent, best_score = None, -1
-            for intent, kws in INTENT_KEYWORDS.items():
-                score = sum(1 for kw in kws if kw in txt)
-                if score > best_score:
-                    best_score, best_intent = score, intent
-            return best_intent or "Billing Issue"
-
+    def nlu_prompt(self, state: CallState) -> RenderedPrompt:
+        return self.prompts.render("nlu_intent" if self.entity_mode == "rules" else "nlu", state.get('clean_text', ''))
+
+    def _local_prediction(self, text: str) -> NLUOutput:
+        """Keyword intent plus rule-extracted entities (unless entity_mode is "llm")."""
+        local = self.classifier.predict(text)
+        if self.entity_mode != "llm":
+            local = local.model_copy(update={"entities": extract_entities(text)})
+        return local
+
+    def _merge_entities(self, llm_entities: Optional[dict], local: NLUOutput) -> dict:
+        if self.entity_mode == "rules":
+            return dict(local.entities)
+        merged = {str(k): str(v) for k, v in (llm_entities or {}).items()}
+        if self.entity_mode == "merge":
+            # Rule values are already normalized, so they win over the LLM's for the same key
+            merged.update(local.entities)
+        return merged
+
+    def _nlu_local(self, state: CallState):
+        """Tier 1: local classifier. Returns (prediction, answered) where answered means
+        the LLM call can be skipped; stock phrasings never reach the LLM."""
+        local = self._local_prediction(state.get('clean_text', ''))
+        if local.confidence >= self.nlu_threshold:
+            state['intent'] = str(local.intent)
+            state['confidence'] = local.confidence
+            state['entities'] = dict(local.entities)
+            state['nlu_source'] = "local"
+            return local, True
+        return local, False
+
+    def _apply_nlu_result(self, state: CallState, nlu_result: NLUOutput, local: NLUOutput) -> CallState:
+        intent = str(nlu_result.intent)
+        # Safety: enforce membership
+        if intent not in ALLOWED_INTENTS:
+            intent = str(local.intent)
+        state['intent'] = intent
+
+        # Clamp confidence 0..1, ensure min > 0 to avoid 0% displays
         try:
-            nlu_result: NLUOutput = structured_llm.invoke(prompt)
-            intent = str(nlu_result.intent)
-            # Safety: enforce membership
-            if intent not in ALLOWED_INTENTS:
-                intent = fallback_match(state.get('clean_text', ''))
-            state['intent'] = intent
-
-            # Clamp confidence 0..1, ensure min > 0 to avoid 0% displays
-            try:
-                conf = float(getattr(nlu_result, "confidence", 0.0))
-            except Exception:
-                conf = 0.0
-            conf = max(0.01, min(conf, 1.0))
-            state['confidence'] = conf
-
-            ents = getattr(nlu_result, "entities", {}) or {}
-            state['entities'] = dict(ents)
-        except Exception as e:
-            # Hard fallback → deterministic keyword routing
-            intent = fallback_match(state.get('clean_text', ''))
-            state['intent'] = intent
-            state['confidence'] = 0.5  # conservative default
-            state['entities'] = {}
+            conf = float(getattr(nlu_result, "confidence", 0.0))
+        except Exception:
+            conf = 0.0
+        conf = max(0.01, min(conf, 1.0))
+        state['confidence'] = conf
+
+        state['entities'] = self._merge_entities(getattr(nlu_result, "entities", {}), local)
+        state['nlu_source'] = "llm"
+        return state
 
+    def _apply_nlu_fallback(self, state: CallState, local: NLUOutput) -> CallState:
+        # Hard fallback → deterministic keyword routing
+        state['intent'] = str(local.intent)
+        state['confidence'] = 0.5  # conservative default
+        state['entities'] = dict(local.entities)
+        state['nlu_source'] = "fallback"
         return state
 
+    def nlu_node(self, state: CallState) -> CallState:
+        local, answered = self._nlu_local(state)
+        if answered:
+            return state
+        try:
+            nlu_result: NLUOutput = self._invoke(self.structured_llm, self.nlu_prompt(state))
+            return self._apply_nlu_result(state, nlu_result, local)
+        except Exception:
+            return self._apply_nlu_fallback(state, local)
+
+    async def anlu_node(self, state: CallState) -> CallState:
+        local, answered = self._nlu_local(state)
+        if answered:
+            return state
+        try:
+            nlu_result: NLUOutput = await self._ainvoke(self.structured_llm, self.nlu_prompt(state))
+            return self._apply_nlu_result(state, nlu_result, local)
+        except Exception:
+            return self._apply_nlu_fallback(state, local)
+
+    def _context(self, state: CallState) -> str:
+        """Bounded multi-turn context (rolling summary + last few entries) for domain prompts."""
+        return context_block(state.get('transcript') or [], state.get('summary') or "")
+
+    def _domain_prompt(self, name: str, state: CallState) -> RenderedPrompt:
+        return self.prompts.render(name, state.get('clean_text', ''), state.get('entities', {}), self._context(state))
+
     def billing_issue_node(self, state: CallState) -> CallState:
-        prompt = f"""
-    You are a senior telecom billing agent. Read the user input and extracted entities.
-    Goal: produce 3 things in plain text separated by newlines (no questions):
-    1) A single, one-sentence customer-facing acknowledgement + decisive resolution or next step (what we will do or what the customer should do).
-    2) A single short internal action label (choose one): "adjust-bill", "open-billing-ticket", "escalate-to-billing", "inform-no-issue-found", "request-docs" (but do NOT ask the user for docs).
-    3) A one-line internal note for logs (why you chose that action, include entity references).
-
-    Constraints:
-    - DO NOT ask any follow-up questions.
-    - Keep user-facing message <= 25 words.
-    - If ticket creation required, include the expected SLA (e.g., "Ticket created — resolution within 48 hours").
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
-        state['next_action'] = "play_tts"
-        return state
+        return self._domain_turn(self.billing_issue_prompt(state), state)
+
+    def billing_issue_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("billing_issue", state)
 
 
     def sim_not_working_node(self, state: CallState) -> CallState:
         """Handles the SIM Not Working scenario."""
-        prompt = f"""
-    You are a telecom support agent handling a "SIM Not Working" complaint.
-    Produce 3 lines (plain text, no questions):
-    1) A single, clear user-facing instruction or resolution (one sentence). If a common immediate fix exists, give it (e.g., "Restart phone and reinsert SIM; if still fails, request SIM re-provisioning.").
-    2) Internal action label: one of ["remote-provision", "schedule-sim-replacement", "ticket-device-check", "inform-user-no-issue-detected"].
-    3) One-line internal diagnostic note referencing extracted entities and confidence.
-
-    Constraints:
-    - DO NOT ask follow-up questions.
-    - Keep user message short (<=20 words) and deterministic.
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
-        state['next_action'] = "play_tts"
-        return state
+        return self._domain_turn(self.sim_not_working_prompt(state), state)
+
+    def sim_not_working_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("sim_not_working", state)
 
 
     def no_network_coverage_node(self, state: CallState) -> CallState:
         """Handles the No Network Coverage scenario."""
-        prompt = f"""
-    You are a telecom field-support agent for "No Network Coverage".
-    Return exactly 3 lines (plain text):
-    1) A single customer-facing message that either explains the cause or gives a decisive next step (e.g., "We will create a ticket for tower inspection; you'll be notified.").
-    2) Internal action label: one of ["create-network-ticket","advise-roaming","check-provisioning","no-action"].
-    3) One-line internal note with suggested urgency and referenced entities (location, account).
-
-    Constraints:
-    - DO NOT ask any follow-up questions.
-    - If location is provided in entities, include it in the internal note.
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
-        state['next_action'] = "play_tts"
-        return state
+        return self._domain_turn(self.no_network_coverage_prompt(state), state)
+
+    def no_network_coverage_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("no_network_coverage", state)
 
 
     def internet_speed_slow_node(self, state: CallState) -> CallState:
         """Handles the Internet Speed Slow scenario."""
-        prompt = f"""
-    You are a telecom troubleshooting agent for "Internet Speed Slow".
-    Return exactly 3 lines:
-    1) A concise customer-facing resolution or definitive next step (e.g., "We will attempt an automated profile reset; expected improvement within 30 minutes.").
-    2) Internal action label: one of ["automated-reset","create-speed-ticket","advise-plan-upgrade","no-action"].
-    3) One-line internal diagnostic note (include suggested measurement steps if applicable: speedtest link, time of day, device).
-
-    Constraints:
-    - DO NOT ask follow-up questions.
-    - Keep customer message <= 25 words and action deterministic.
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
-        state['next_action'] = "play_tts"
-        return state
+        return self._domain_turn(self.internet_speed_slow_prompt(state), state)
+
+    def internet_speed_slow_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("internet_speed_slow", state)
 
 
     def data_not_working_after_recharge_node(self, state: CallState) -> CallState:
         """Handles the Data Not Working After Recharge scenario."""
-        prompt = f"""
-    You are a support agent for "Data Not Working After Recharge".
-    Return exactly 3 lines:
-    1) A single, one-sentence user-facing resolution or immediate step (e.g., "We have re-provisioned your data; please restart your device now.").
-    2) Internal action label: one of ["reprovision-data","refund-if-failed","open-ticket","no-action"].
-    3) One-line internal note referencing recharge_amount/date and whether automatic reprovisioning attempted.
-
-    Constraints:
-    - DO NOT ask any follow-up questions.
-    - If the entities include a recharge amount/date, reference them in the internal note.
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
-        state['next_action'] = "play_tts"
-        return state
+        return self._domain_turn(self.data_not_working_after_recharge_prompt(state), state)
+
+    def data_not_working_after_recharge_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("data_not_working_after_recharge", state)
 
 
     def call_drops_frequently_node(self, state: CallState) -> CallState:
         """Handles the Call Drops Frequently scenario."""
-        prompt = f"""
-    You are a network reliability specialist handling "Call Drops Frequently".
-    Return exactly 3 lines:
-    1) A single customer-facing diagnostic or action (e.g., "We will raise a network investigation ticket; expect update within 48 hours.").
-    2) Internal action label: one of ["create-network-investigation","schedule-field-check","check-provisioning","no-action"].
-    3) One-line internal note describing probable cause and referencing any location/device entities.
-
-    Constraints:
-    - DO NOT ask follow-up questions.
-    - Keep user-facing message short and concrete.
-    User Input: "{state['clean_text']}"
-    Extracted Entities: {state['entities']}
-    """
-        state['script'] = self.llm.invoke(prompt)
+        return self._domain_turn(self.call_drops_frequently_prompt(state), state)
+
+    def call_drops_frequently_prompt(self, state: CallState) -> RenderedPrompt:
+        return self._domain_prompt("call_drops_frequently", state)
+
+    def fused_prompt(self, state: CallState) -> RenderedPrompt:
+        return self.prompts.render("fused", state.get('clean_text', ''))
+
+    def _apply_fused_result(self, state: CallState, out: FusedTurnOutput) -> CallState:
+        state['intent'] = str(out.intent)
+        state['confidence'] = max(0.01, min(float(out.confidence), 1.0))
+        state['entities'] = self._merge_entities(out.entities, self._local_prediction(state.get('clean_text', '')))
+        state['script'] = "\n".join([out.customer_message.strip(), out.action_label.strip(), out.internal_note.strip()])
+        state['nlu_source'] = "fused"
+        return state
+
+    def _apply_fused_fallback(self, state: CallState) -> CallState:
+        # Leave script empty so the routed domain node generates it the standard way
+        local = self._local_prediction(state.get('clean_text', ''))
+        state['intent'] = str(local.intent)
+        state['confidence'] = 0.5
+        state['entities'] = dict(local.entities)
+        state['script'] = ""
+        state['nlu_source'] = "fallback"
+        return state
+
+    def fused_nlu_script_node(self, state: CallState) -> CallState:
+        """Fused mode: intent, entities and the 3-line script from one structured LLM call."""
+        try:
+            return self._apply_fused_result(state, self._invoke(self.structured_fused_llm, self.fused_prompt(state)))
+        except Exception:
+            return self._apply_fused_fallback(state)
+
+    async def afused_nlu_script_node(self, state: CallState) -> CallState:
+        try:
+            return self._apply_fused_result(state, await self._ainvoke(self.structured_fused_llm, self.fused_prompt(state)))
+        except Exception:
+            return self._apply_fused_fallback(state)
+
+    def fused_finalize_node(self, state: CallState) -> CallState:
+        """Fused/speculative mode post-processing, registered under every domain node name."""
+        if not state.get('script'):
+            return getattr(self, self.route_intent_to_node(state))(state)
+        state['next_action'] = "play_tts"
+        return state
+
+    async def afused_finalize_node(self, state: CallState) -> CallState:
+        if not state.get('script'):
+            return await self.make_async_domain_node(self.route_intent_to_node(state))(state)
         state['next_action'] = "play_tts"
         return state
 
+    def _speculation_candidates(self, state: CallState) -> List[str]:
+        ranked = self.classifier.rank(state.get('clean_text', ''))[:SPECULATE_MAX]
+        if not ranked:
+            return []
+        return [intent for intent, score in ranked if score >= ranked[0][1] * SPECULATE_RATIO]
+
+    def _speculative_turn(self, intent: str, state: CallState, local: NLUOutput):
+        """The domain prompt for a predicted intent, built from the local NLU pass
+        (the LLM's entities are not known yet)."""
+        spec = dict(state, intent=intent, confidence=local.confidence, entities=dict(local.entities))
+        prompt = getattr(self, self.route_intent_to_node(spec)[:-len("_node")] + "_prompt")(spec)
+        return prompt, spec
+
+    @staticmethod
+    def _script_tokens(prompt: RenderedPrompt, script) -> int:
+        """Tokens a finished script cost: usage_metadata when reported, else an estimate;
+        cache hits (plain strings) cost nothing."""
+        usage = getattr(script, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            return int(usage["total_tokens"])
+        if hasattr(script, "content"):
+            return prompt.tokens + count_tokens(str(script.content))
+        return 0
+
+    def _count_speculation(self, **deltas) -> None:
+        with self._speculation_lock:
+            for k, n in deltas.items():
+                self.speculation[k] += n
+
+    def speculation_stats(self) -> Dict[str, float]:
+        with self._speculation_lock:
+            s = dict(self.speculation)
+        s["hit_rate"] = round(s["hits"] / s["turns"], 4) if s["turns"] else 0.0
+        return s
+
+    def _speculate(self, held: _SpeculativeSentences, prompt: RenderedPrompt, spec: CallState):
+        _speculative_writer.set(held)
+        return self.generate_script(prompt, spec)
+
+    async def _aspeculate(self, held: _SpeculativeSentences, prompt: RenderedPrompt, spec: CallState):
+        _speculative_writer.set(held)
+        if isinstance(self.llm, ScheduledLLM):
+            on_request_sent.set(held.mark_sent)  # not sent while queued in admission
+        else:
+            held.mark_sent()
+        return await self.agenerate_script(prompt, spec)
+
+    def _launch_speculation(self, state: CallState, local: NLUOutput) -> Dict[str, Tuple[Future, RenderedPrompt, _SpeculativeSentences]]:
+        """Starts the candidate scripts in pool threads, each in a copy of the node's
+        context (stream writer, callbacks, tracing); their sentences are held until
+        _settle_speculation knows which intent won."""
+        with self._speculation_lock:
+            if self._speculation_pool is None:
+                self._speculation_pool = ThreadPoolExecutor(max_workers=2 * SPECULATE_MAX, thread_name_prefix="speculate")
+        launched = {}
+        for intent in self._speculation_candidates(state):
+            prompt, spec = self._speculative_turn(intent, state, local)
+            held = _SpeculativeSentences()
+            ctx = contextvars.copy_context()
+            launched[intent] = (self._speculation_pool.submit(ctx.run, self._speculate, held, prompt, spec), prompt, held)
+        self._count_speculation(launched=len(launched))
+        return launched
+
+    def _settle_speculation(self, state: CallState,
+                            launched: Dict[str, Tuple[Future, RenderedPrompt, _SpeculativeSentences]]) -> CallState:
+        """Keeps the script speculated for the resolved intent (releasing its held
+        sentences to the stream); the rest are cancelled, or counted as wasted tokens
+        once they finish."""
+        hit = launched.pop(state['intent'], None)
+        writer = self._stream_writer()
+        if hit is not None and writer is not None:
+            hit[2].release(writer)
+        for future, prompt, _ in launched.values():
+            if future.cancel():
+                self._count_speculation(cancelled=1)
+            else:
+                future.add_done_callback(
+                    lambda f, p=prompt: self._count_speculation(
+                        wasted_tokens=0 if f.exception() else self._script_tokens(p, f.result())))
+        script = ""
+        if hit is not None:
+            try:
+                script = hit[0].result()
+            except Exception:
+                script = ""  # the domain node regenerates it
+        self._record_speculation(state, script)
+        return state
+
+    def _record_speculation(self, state: CallState, script) -> None:
+        state['script'] = script
+        state['speculation'] = "hit" if script else "miss"
+        self._count_speculation(turns=1, hits=1 if script else 0, misses=0 if script else 1)
+
+    def speculative_nlu_node(self, state: CallState) -> CallState:
+        """Speculative mode: starts the likeliest domain scripts (by local keyword score)
+        alongside the LLM NLU call, so a correct guess hides the second round trip.
+        Local hits need no speculation: the domain node runs straight after them."""
+        state['script'] = ""
+        state['speculation'] = ""
+        local, answered = self._nlu_local(state)
+        if answered:
+            return state
+        launched = self._launch_speculation(state, local)
+        try:
+            self._apply_nlu_result(state, self._invoke(self.structured_llm, self.nlu_prompt(state)), local)
+        except Exception:
+            self._apply_nlu_fallback(state, local)
+        if not launched:
+            return state
+        return self._settle_speculation(state, launched)
+
+    async def aspeculative_nlu_node(self, state: CallState) -> CallState:
+        state['script'] = ""
+        state['speculation'] = ""
+        local, answered = self._nlu_local(state)
+        if answered:
+            return state
+        launched = {}
+        for intent in self._speculation_candidates(state):
+            prompt, spec = self._speculative_turn(intent, state, local)
+            held = _SpeculativeSentences()
+            launched[intent] = (asyncio.ensure_future(self._aspeculate(held, prompt, spec)), prompt, held)
+        self._count_speculation(launched=len(launched))
+        try:
+            self._apply_nlu_result(state, await self._ainvoke(self.structured_llm, self.nlu_prompt(state)), local)
+        except Exception:
+            self._apply_nlu_fallback(state, local)
+        if not launched:
+            return state
+        hit = launched.pop(state['intent'], None)
+        writer = self._stream_writer()
+        if hit is not None and writer is not None:
+            hit[2].release(writer)
+        for task, prompt, held in launched.values():
+            if not task.done():
+                # A sent request's prompt tokens are spent; one still queued costs nothing
+                task.cancel()
+                self._count_speculation(cancelled=1, wasted_tokens=prompt.tokens if held.sent else 0)
+            elif task.exception() is None:
+                self._count_speculation(wasted_tokens=self._script_tokens(prompt, task.result()))
+        script = ""
+        if hit is not None:
+            try:
+                script = await hit[0]
+            except Exception:
+                script = ""
+        self._record_speculation(state, script)
+        return state
+
     def route_intent_to_node(self, state: CallState) -> str:
         
             
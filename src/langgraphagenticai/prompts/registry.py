@@ -0,0 +1,161 @@
+import hashlib
+import math
+import re
+import threading
+from typing import Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# Optional exact tokenizer; otherwise a word/punctuation estimate is used
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text: exact with tiktoken installed, else ~1 token per word or
+    punctuation mark, with long words counted per 4 characters."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return sum(max(1, math.ceil(len(t) / 4)) if t[0].isalnum() or t[0] == "_" else 1 for t in _TOKEN_RE.findall(text))
+
+
+def _truncate_to_tokens(text: str, tokens: int) -> str:
+    if count_tokens(text) <= tokens:
+        return text
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:  # longest word prefix that fits
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid]) + " …") <= tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo]) + " …"
+
+
+class RenderedPrompt(list):
+    """[SystemMessage, HumanMessage] ready for llm.invoke(), tagged with the template key,
+    its token count, which fields were truncated to fit the budget and the conversation
+    context it was rendered with ("" when dropped or not used)."""
+
+    def __init__(self, messages, key: str, tokens: int, truncated: List[str], context: str = ""):
+        super().__init__(messages)
+        self.key = key
+        self.tokens = tokens
+        self.truncated = truncated
+        self.context = context
+
+
+class PromptTemplate:
+    """A versioned prompt split into a static system message and a small human message.
+
+    The system message is built once and reused every turn, so providers that cache
+    prompt prefixes can reuse it; only the human message varies. `key` combines the
+    name, version and a hash of both texts, so any edit changes cache keys.
+    """
+
+    def __init__(self, name: str, version: str, system: str, human: str, human_budget: int = 320):
+        self.name = name
+        self.version = version
+        self.system = system.strip()
+        self.human = human.strip()
+        self.human_budget = human_budget
+        self.system_message = SystemMessage(content=self.system)
+        self.system_tokens = count_tokens(self.system)
+        digest = hashlib.blake2b(f"{self.system}\x00{self.human}".encode("utf-8"), digest_size=4).hexdigest()
+        self.key = f"{name}@{version}:{digest}"
+
+    def render(self, clean_text: str = "", entities: Optional[dict] = None, context: str = "") -> RenderedPrompt:
+        """Fills the human message; over budget, the conversation context is dropped first,
+        then entity values are shortened or dropped, then clean_text is cut."""
+        entities = dict(entities or {})
+        truncated: List[str] = []
+
+        def fill() -> str:
+            return self.human.format(clean_text=clean_text, entities=entities, context=context)
+
+        human = fill()
+        if count_tokens(human) > self.human_budget and context and "{context}" in self.human:
+            context = ""
+            truncated.append("context")
+            human = fill()
+        if count_tokens(human) > self.human_budget and entities:
+            entities = {k: (v if len(str(v)) <= 40 else str(v)[:40] + "…") for k, v in entities.items()}
+            human = fill()
+            while count_tokens(human) > self.human_budget and entities:
+                entities.pop(max(entities, key=lambda k: len(str(entities[k]))))
+                human = fill()
+            truncated.append("entities")
+        over = count_tokens(human) - self.human_budget
+        if over > 0 and clean_text:
+            clean_text = _truncate_to_tokens(clean_text, max(1, count_tokens(clean_text) - over))
+            truncated.append("clean_text")
+            human = fill()
+        tokens = self.system_tokens + count_tokens(human)
+        context = context if "{context}" in self.human else ""
+        return RenderedPrompt([self.system_message, HumanMessage(content=human)], self.key, tokens, truncated, context)
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        with self._lock:
+            self._templates[template.name] = template
+            self._stats.setdefault(template.name, {"renders": 0, "tokens": 0, "truncated": 0})
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def render(self, name: str, clean_text: str = "", entities: Optional[dict] = None, context: str = "") -> RenderedPrompt:
+        prompt = self._templates[name].render(clean_text, entities, context)
+        with self._lock:
+            s = self._stats[name]
+            s["renders"] += 1
+            s["tokens"] += prompt.tokens
+            s["truncated"] += 1 if prompt.truncated else 0
+        return prompt
+
+    def versions(self) -> Dict[str, str]:
+        """name -> key, recorded by benchmarks so results are comparable across edits."""
+        return {name: t.key for name, t in sorted(self._templates.items())}
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "key": self._templates[name].key,
+                    "system_tokens": self._templates[name].system_tokens,
+                    "renders": s["renders"],
+                    "avg_tokens": round(s["tokens"] / s["renders"], 1) if s["renders"] else 0.0,
+                    "truncated": s["truncated"],
+                }
+                for name, s in sorted(self._stats.items())
+            }
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Process-wide registry with the built-in templates (prompts/templates.py)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from src.langgraphagenticai.prompts.templates import DEFAULT_TEMPLATES
+            _registry = PromptRegistry()
+            for template in DEFAULT_TEMPLATES:
+                _registry.register(template)
+        return _registry
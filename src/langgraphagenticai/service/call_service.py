@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from src.langgraphagenticai.state.state import CallState
+from src.langgraphagenticai.state.transcript import BoundedTranscript
+from src.langgraphagenticai.telemetry.tracing import span
+from src.langgraphagenticai.utils.call_utils import extract_script_text, generate_call_id
+
+
+class ServiceOverloaded(Exception):
+    """Raised when the turn queue is full; callers should back off and retry (HTTP 429)."""
+
+
+class UnknownCall(Exception):
+    """Raised for a turn on a call_id that was never started, has already ended or expired."""
+
+
+class CallSession:
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        # Recent entries plus a rolling summary; per-call memory stays constant
+        self.transcript = BoundedTranscript()
+        self.last_state: Optional[dict] = None
+        # Turns of one call run in order; different calls run concurrently
+        self.lock = asyncio.Lock()
+        self.started_at = time.time()
+        self.last_active = time.monotonic()
+
+
+class CallService:
+    """Headless asyncio runtime that runs turns for many concurrent call_ids.
+
+    app is a compiled graph built with GraphBuilder(..., async_nodes=True).
+    At most max_concurrency turns execute at once; up to max_pending more wait
+    for a slot, and anything beyond that is rejected with ServiceOverloaded.
+    Calls idle for longer than session_ttl seconds (never ended by the client) are
+    dropped by a sweep that runs at most every session_ttl / 4 on start/turn.
+    """
+
+    def __init__(self, app, max_concurrency: int = 32, max_pending: int = 256, turn_timeout: float = 60.0,
+                 session_ttl: Optional[float] = 30 * 60):
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.turn_timeout = turn_timeout
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, CallSession] = {}
+        self._next_sweep = time.monotonic() + (session_ttl or 0) / 4
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.expired = 0
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """Drops sessions idle for longer than session_ttl; a call with a turn in progress is kept."""
+        if not self.session_ttl:
+            return 0
+        now = time.monotonic() if now is None else now
+        stale = [cid for cid, s in self.sessions.items()
+                 if now - s.last_active > self.session_ttl and not s.lock.locked()]
+        for cid in stale:
+            del self.sessions[cid]
+        self.expired += len(stale)
+        return len(stale)
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if self.session_ttl and now >= self._next_sweep:
+            self._next_sweep = now + self.session_ttl / 4
+            self.expire_idle(now)
+
+    def start_call(self, call_id: Optional[str] = None) -> str:
+        self._maybe_sweep()
+        call_id = call_id or generate_call_id()
+        session = self.sessions.setdefault(call_id, CallSession(call_id))
+        session.last_active = time.monotonic()
+        return call_id
+
+    def end_call(self, call_id: str) -> Optional[dict]:
+        session = self.sessions.pop(call_id, None)
+        if session is None:
+            raise UnknownCall(call_id)
+        session.transcript.append({"speaker": "system", "text": "Call ended by user.", "ts": time.time()})
+        return session.last_state
+
+    async def submit_turn(self, call_id: str, text: str) -> dict:
+        """Runs one caller utterance through the graph and returns the final CallState."""
+        self._maybe_sweep()
+        session = self.sessions.get(call_id)
+        if session is None:
+            raise UnknownCall(call_id)
+        session.last_active = time.monotonic()
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceOverloaded(f"{self._pending} turns pending")
+        self._pending += 1
+        waiting = True
+        try:
+            async with session.lock:
+                async with self._slots:
+                    self._pending -= 1
+                    waiting = False
+                    self._running += 1
+                    try:
+                        return await asyncio.wait_for(self._run_turn(session, text), self.turn_timeout)
+                    except Exception:
+                        self.failed += 1
+                        raise
+                    finally:
+                        self._running -= 1
+                        session.last_active = time.monotonic()
+        finally:
+            if waiting:
+                # Cancelled while queued
+                self._pending -= 1
+
+    async def _run_turn(self, session: CallSession, text: str) -> dict:
+        session.transcript.append({"speaker": "user", "text": text, "ts": time.time()})
+        init_state: CallState = {
+            "call_id": session.call_id,
+            "transcript": session.transcript.to_list(),
+            "clean_text": "",
+            "intent": "",
+            "confidence": 0.0,
+            "entities": {},
+            "script": "",
+            "next_action": "end_call",
+            "nlu_source": "",
+            "spans": [],
+            "summary": session.transcript.summary,
+            "test_input": None,
+        }
+        final_state = await self.app.ainvoke(init_state)
+        final_state = dict(final_state)
+        with span("extract_script_text", final_state.setdefault("spans", [])):
+            script_text = extract_script_text(final_state.get('script', ''))
+        final_state['script'] = script_text
+        if script_text:
+            session.transcript.append({"speaker": "agent", "text": script_text, "ts": time.time()})
+        final_state['transcript'] = session.transcript.to_list()
+        session.last_state = final_state
+        self.completed += 1
+        return final_state
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_calls": len(self.sessions),
+            "running": self._running,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "expired": self.expired,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+        }
@@ -0,0 +1,35 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Optional
+
+
+class CallServiceClient:
+    """Blocking JSON client for the headless call service (used by the Streamlit UI)."""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, payload: Optional[dict] = None) -> dict:
+        req = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload or {}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"call service returned {e.code}: {detail}") from e
+
+    def start_call(self, call_id: Optional[str] = None) -> str:
+        return self._post("/calls", {"call_id": call_id} if call_id else {})["call_id"]
+
+    def submit_turn(self, call_id: str, text: str) -> dict:
+        return self._post(f"/calls/{call_id}/turns", {"text": text})
+
+    def end_call(self, call_id: str) -> dict:
+        return self._post(f"/calls/{call_id}/end")
@@ -0,0 +1,167 @@
+"""Minimal asyncio HTTP/JSON front end for CallService.
+
+    python -m src.langgraphagenticai.service.server --port 8765
+
+Routes:
+    GET  /health                  -> service and LLM scheduler stats
+    GET  /metrics                 -> per-stage latency (Prometheus text format)
+    POST /calls                   -> {"call_id": ...}
+    POST /calls/<call_id>/turns   {"text": "..."} -> final CallState
+    POST /calls/<call_id>/end     -> last CallState
+
+Calls that are never ended expire after --session-ttl seconds without a turn.
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Optional, Tuple
+
+from src.langgraphagenticai.LLMS.scheduler import get_llm_scheduler
+from src.langgraphagenticai.graph.graph_registry import get_graph_registry
+from src.langgraphagenticai.service.call_service import CallService, ServiceOverloaded, UnknownCall
+from src.langgraphagenticai.telemetry.tracing import get_tracer
+from src.langgraphagenticai.utils.call_utils import json_safe
+
+MAX_BODY = 64 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            429: "Too Many Requests", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+class MalformedRequest(Exception):
+    """Unparseable request line or headers (HTTP 400)."""
+
+
+class BodyTooLarge(Exception):
+    """Declared Content-Length above MAX_BODY (HTTP 413)."""
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    fields = request_line.decode("latin-1").split()
+    if len(fields) != 3:
+        raise MalformedRequest("malformed request line")
+    method, path, _ = fields
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            value = value.strip()
+            if not value.isdigit():
+                raise MalformedRequest("invalid Content-Length")
+            length = int(value)
+    if length > MAX_BODY:
+        raise BodyTooLarge("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path.split("?", 1)[0], body
+
+
+class TextPayload(str):
+    """A route result sent as text/plain instead of JSON."""
+
+
+def _response(status: int, payload) -> bytes:
+    if isinstance(payload, TextPayload):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(json_safe(payload)).encode("utf-8"), "application/json"
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class CallServer:
+    def __init__(self, service: CallService):
+        self.service = service
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        parts = [p for p in path.split("/") if p]
+        if method == "GET" and parts == ["health"]:
+            return 200, {**self.service.stats(), "llm": get_llm_scheduler().stats()}
+        if method == "GET" and parts == ["metrics"]:
+            return 200, TextPayload(get_tracer().render_prometheus())
+        if method == "POST" and parts == ["calls"]:
+            data = json.loads(body or b"{}")
+            return 200, {"call_id": self.service.start_call(data.get("call_id"))}
+        if method == "POST" and len(parts) == 3 and parts[0] == "calls":
+            call_id, action = parts[1], parts[2]
+            try:
+                if action == "turns":
+                    text = str(json.loads(body or b"{}").get("text", "")).strip()
+                    if not text:
+                        return 400, {"error": "text is required"}
+                    return 200, await self.service.submit_turn(call_id, text)
+                if action == "end":
+                    return 200, {"call_id": call_id, "state": self.service.end_call(call_id)}
+            except UnknownCall:
+                return 404, {"error": f"unknown call_id {call_id}"}
+            except ServiceOverloaded as e:
+                return 429, {"error": f"overloaded: {e}"}
+            except asyncio.TimeoutError:
+                return 504, {"error": "turn timed out"}
+        return 404, {"error": "not found"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    req = await _read_request(reader)
+                except MalformedRequest as e:
+                    writer.write(_response(400, {"error": str(e)}))
+                    break
+                except BodyTooLarge as e:
+                    writer.write(_response(413, {"error": str(e)}))
+                    break
+                if req is None:
+                    break
+                try:
+                    status, payload = await self.route(*req)
+                except json.JSONDecodeError:
+                    status, payload = 400, {"error": "invalid JSON"}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                writer.write(_response(status, payload))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def build_service(model: str, api_key: Optional[str], max_concurrency: int, max_pending: int,
+                  mode: str = "standard", session_ttl: Optional[float] = 30 * 60) -> CallService:
+    app = get_graph_registry().get_app(model, api_key=api_key, config={"async_nodes": True, "mode": mode})
+    return CallService(app, max_concurrency=max_concurrency, max_pending=max_pending, session_ttl=session_ttl)
+
+
+async def serve(host: str, port: int, service: CallService) -> None:
+    server = await asyncio.start_server(CallServer(service).handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless call-processing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default="openai/gpt-oss-20b")
+    parser.add_argument("--mode", default="standard")
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--session-ttl", type=float, default=30 * 60, help="seconds; 0 disables expiry")
+    args = parser.parse_args()
+    service = build_service(args.model, os.getenv("GROQ_API_KEY"), args.max_concurrency, args.max_pending,
+                            args.mode, args.session_ttl)
+    print(f"Call service listening on http://{args.host}:{args.port}")
+    asyncio.run(serve(args.host, args.port, service))
+
+
+if __name__ == "__main__":
+    main()
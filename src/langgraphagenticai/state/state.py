@@ -2,6 +2,7 @@ from typing_extensions import TypedDict,List
 from typing import Annotated
 from pydantic import BaseModel, Field
 from typing import Literal, Dict, Optional
+from src.langgraphagenticai.state.transcript import TRANSCRIPT_WINDOW
 AllowedIntent = Literal[
     "Billing Issue",
     "SIM Not Working",
@@ -17,19 +18,54 @@ class NLUOutput(BaseModel):
     entities: Dict[str, str] = Field(default_factory=dict)
     notes: Optional[str] = None
 
+class FusedTurnOutput(BaseModel):
+    """NLU and the three-line agent script returned by a single LLM call (fused mode)."""
+    intent: AllowedIntent = Field(description="One of the six canonical intents.")
+    confidence: float = Field(ge=0.0, le=1.0, default=0.0, description="0.0..1.0")
+    entities: Dict[str, str] = Field(default_factory=dict)
+    customer_message: str = Field(description="One-sentence customer-facing resolution or next step.")
+    action_label: str = Field(description="Internal action label for the chosen intent.")
+    internal_note: str = Field(default="", description="One-line internal note for logs.")
+
 class TranscriptEntry(TypedDict):
     text: str
     ts: float
     speaker: Literal['user', 'agent']
 
+def merge_transcript(left: List[TranscriptEntry], right: List[TranscriptEntry]) -> List[TranscriptEntry]:
+    """Reducer for CallState['transcript'].
+
+    Nodes return the whole state, so a list that already extends the stored
+    transcript replaces it. Anything else is new entries, e.g. the single user
+    entry a checkpointed turn passes in, and is appended. Only the newest
+    TRANSCRIPT_WINDOW entries are kept; the full history is in the call journal.
+    """
+    if not left:
+        merged = list(right or [])
+    elif not right:
+        return left
+    elif right is left or (len(right) >= len(left) and right[len(left) - 1] == left[-1] and right[0] == left[0]):
+        merged = right
+    else:
+        merged = left + right
+    return merged if len(merged) <= TRANSCRIPT_WINDOW else merged[-TRANSCRIPT_WINDOW:]
+
 class CallState(TypedDict):
     call_id: str
-    transcript: List[TranscriptEntry]
+    transcript: Annotated[List[TranscriptEntry], merge_transcript]
     clean_text: str
     intent: str
     confidence: float
     entities: dict
     script: str
     next_action: Literal['play_tts', 'escalate_sim', 'end_call', 'follow_up']
+    # Which NLU tier produced the intent: 'local', 'llm', 'fused' or 'fallback'
+    nlu_source: str
+    # Latency spans of this turn (telemetry/tracing.py): name, start, duration_ms, attrs
+    spans: List[dict]
+    # Rolling summary of transcript entries older than the window (state/transcript.py)
+    summary: str
+    # Speculative mode: 'hit' if the script generated during NLU was kept, 'miss' otherwise
+    speculation: str
     # test_input is used to simulate STT result when mic is unavailable
     test_input: Optional[str] 
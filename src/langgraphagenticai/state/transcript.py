@@ -0,0 +1,153 @@
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Entries kept in CallState['transcript'] and in the UI session; older ones live in the call journal
+TRANSCRIPT_WINDOW = 12
+# Earlier entries shown to domain nodes, and the per-entry / summary character caps
+CONTEXT_ENTRIES = 4
+CONTEXT_CHARS = 200
+SUMMARY_CHARS = 600
+
+
+class Entry:
+    """Compact transcript entry; speaker strings are interned so every entry shares them.
+
+    Supports entry["text"] / entry.get("ts") so code written against TranscriptEntry
+    dicts keeps working.
+    """
+
+    __slots__ = ("speaker", "text", "ts")
+
+    def __init__(self, speaker: str, text: str, ts: float):
+        self.speaker = sys.intern(speaker)
+        self.text = text
+        self.ts = ts
+
+    @classmethod
+    def from_dict(cls, d) -> "Entry":
+        if isinstance(d, Entry):
+            return d
+        return cls(str(d.get("speaker", "system")), str(d.get("text", "")), float(d.get("ts") or 0.0))
+
+    def as_dict(self) -> dict:
+        return {"speaker": self.speaker, "text": self.text, "ts": self.ts}
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+
+def extractive_summary(previous: str, evicted: List[Entry], limit: int = SUMMARY_CHARS) -> str:
+    """Cheap rolling summary: the first sentence of each evicted caller message appended to
+    the previous summary, keeping the newest `limit` characters."""
+    points = []
+    for e in evicted:
+        if e.speaker == "user" and e.text.strip():
+            points.append(re.split(r"(?<=[.!?])\s", e.text.strip(), maxsplit=1)[0])
+    if not points:
+        return previous
+    merged = "; ".join(p for p in [previous] + points if p)
+    return merged if len(merged) <= limit else "…" + merged[-(limit - 1):]
+
+
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+
+
+def get_summary_executor() -> ThreadPoolExecutor:
+    """Single background thread for rolling summaries, off the turn's hot path."""
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript-summary")
+        return _summary_executor
+
+
+class BoundedTranscript:
+    """Ring buffer of the most recent `maxlen` entries plus a rolling summary of the rest.
+
+    Evicted entries are folded into `summary` by `summarize(previous, evicted)` on a
+    background executor, so appending never waits for summarization. The full history
+    is not kept here: it is written to the call journal turn by turn.
+    """
+
+    def __init__(self, maxlen: int = TRANSCRIPT_WINDOW, summary: str = "",
+                 summarize: Callable[[str, List[Entry]], str] = extractive_summary,
+                 executor: Optional[Executor] = None, total: int = 0):
+        self._entries: deque = deque(maxlen=maxlen)
+        self.summary = summary
+        self.total = total
+        self._summarize = summarize
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_list(cls, entries: Iterable, summary: str = "", maxlen: int = TRANSCRIPT_WINDOW) -> "BoundedTranscript":
+        t = cls(maxlen=maxlen, summary=summary)
+        for e in entries:
+            t.append(e)
+        return t
+
+    def append(self, entry) -> Entry:
+        entry = Entry.from_dict(entry)
+        with self._lock:
+            evicted = self._entries[0] if len(self._entries) == self._entries.maxlen else None
+            self._entries.append(entry)
+            self.total += 1
+        if evicted is not None:
+            (self._executor or get_summary_executor()).submit(self._fold, [evicted])
+        return entry
+
+    def _fold(self, evicted: List[Entry]) -> None:
+        with self._lock:
+            previous = self.summary
+        summary = self._summarize(previous, evicted)
+        with self._lock:
+            self.summary = summary
+
+    def to_list(self) -> List[dict]:
+        with self._lock:
+            return [e.as_dict() for e in self._entries]
+
+    def tail(self, n: int) -> List[Entry]:
+        """The newest n entries, oldest first."""
+        with self._lock:
+            return list(self._entries)[-n:] if n > 0 else []
+
+    def __iter__(self) -> Iterator[Entry]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        with self._lock:
+            return list(self._entries)[i]
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+
+def context_block(transcript: List[dict], summary: str = "", entries: int = CONTEXT_ENTRIES) -> str:
+    """Earlier-conversation block for domain prompts: the rolling summary plus the last
+    `entries` entries before the current caller message, each capped in length."""
+    lines = []
+    if summary:
+        lines.append(f"Summary of earlier conversation: {summary[-SUMMARY_CHARS:]}")
+    labels = {"user": "Caller", "agent": "Agent"}
+    for e in list(transcript[:-1])[-entries:]:
+        speaker = e.get("speaker")
+        if speaker in labels and e.get("text"):
+            lines.append(f"{labels[speaker]}: {' '.join(str(e['text']).split())[:CONTEXT_CHARS]}")
+    if not lines:
+        return "Earlier conversation: (none — this is the first message)"
+    return "Earlier conversation:\n" + "\n".join(lines)
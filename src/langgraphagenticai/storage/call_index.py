@@ -0,0 +1,213 @@
+"""SQLite index over call logs for paginated, filtered call history.
+
+The UI updates it on every logged turn and at End Call. To index an existing
+call_logs/ directory once:
+
+    python -m src.langgraphagenticai.storage.call_index --log-dir call_logs
+"""
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.langgraphagenticai.storage.journal import read_events, rebuild_state
+
+Cursor = Tuple[float, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    call_id     TEXT PRIMARY KEY,
+    started_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    ended_at    REAL,
+    intent      TEXT,
+    confidence  REAL,
+    nlu_source  TEXT,
+    turns       INTEGER NOT NULL DEFAULT 0,
+    path        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_started ON calls (started_at DESC, call_id DESC);
+CREATE INDEX IF NOT EXISTS calls_intent_started ON calls (intent, started_at DESC, call_id DESC);
+"""
+
+_COLUMNS = ("call_id", "started_at", "updated_at", "ended_at", "intent", "confidence", "nlu_source", "turns", "path")
+
+
+def _row_from_log(state: dict, path: str) -> tuple:
+    transcript = [t for t in state.get("transcript", []) if isinstance(t, dict)]
+    stamps = [float(t["ts"]) for t in transcript if isinstance(t.get("ts"), (int, float))]
+    mtime = os.path.getmtime(path)
+    started = state.get("started_at") or (min(stamps) if stamps else mtime)
+    ended = state.get("ended_at")
+    if ended is None and any(t.get("speaker") == "system" for t in transcript):
+        ended = max(stamps) if stamps else mtime
+    turns = state.get("turns") or sum(1 for t in transcript if t.get("speaker") == "user")
+    call_id = state.get("call_id") or os.path.basename(path).rsplit(".", 1)[0]
+    return (call_id, float(started), max(stamps) if stamps else mtime, ended, state.get("intent"),
+            float(state.get("confidence") or 0.0), state.get("nlu_source"), int(turns), path)
+
+
+class CallIndex:
+    """One row per call: timestamps, latest intent/confidence/nlu_source, turn count
+    and the log path (journal while open, compacted JSON once ended).
+
+    page() uses keyset pagination on (started_at, call_id), so every page costs an
+    index seek however deep the user has scrolled.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def record_turn(self, call_id: str, state: dict, path: str) -> None:
+        now = time.time()
+        transcript = state.get("transcript") or []
+        first_ts = next((t.get("ts") for t in transcript if isinstance(t, dict) and t.get("ts")), now)
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO calls (call_id, started_at, updated_at, intent, confidence, nlu_source, turns, path)
+                   VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                   ON CONFLICT(call_id) DO UPDATE SET
+                       updated_at = excluded.updated_at, intent = excluded.intent,
+                       confidence = excluded.confidence, nlu_source = excluded.nlu_source,
+                       turns = calls.turns + 1, path = excluded.path""",
+                (call_id, float(first_ts), now, state.get("intent"), float(state.get("confidence") or 0.0),
+                 state.get("nlu_source"), path),
+            )
+            self._conn.commit()
+
+    def record_end(self, call_id: str, path: str, ended_at: Optional[float] = None) -> None:
+        ended_at = ended_at or time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO calls (call_id, started_at, updated_at, ended_at, path) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(call_id) DO UPDATE SET
+                       ended_at = excluded.ended_at, updated_at = excluded.updated_at, path = excluded.path""",
+                (call_id, ended_at, ended_at, ended_at, path),
+            )
+            self._conn.commit()
+
+    def backfill(self, log_dir: str) -> int:
+        """(Re)indexes every *.json / *.jsonl log in log_dir in one transaction; a call's
+        open journal wins over a stale JSON of the same call_id."""
+        rows: Dict[str, tuple] = {}
+        for path in sorted(glob.glob(os.path.join(log_dir, "*.json"))) + sorted(glob.glob(os.path.join(log_dir, "*.jsonl"))):
+            if path.endswith(".jsonl"):
+                state = rebuild_state(read_events(path))
+            else:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    continue
+            if isinstance(state, dict):
+                row = _row_from_log(state, path)
+                rows[row[0]] = row
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO calls ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                list(rows.values()),
+            )
+            self._conn.commit()
+        return len(rows)
+
+    @staticmethod
+    def _where(intent: Optional[str], since: Optional[float], until: Optional[float],
+               min_confidence: Optional[float], max_confidence: Optional[float]):
+        clauses, args = [], []
+        if intent:
+            clauses.append("intent = ?")
+            args.append(intent)
+        if since is not None:
+            clauses.append("started_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("started_at < ?")
+            args.append(until)
+        if min_confidence is not None:
+            clauses.append("confidence >= ?")
+            args.append(min_confidence)
+        if max_confidence is not None:
+            clauses.append("confidence <= ?")
+            args.append(max_confidence)
+        return clauses, args
+
+    def page(self, limit: int = 20, after: Optional[Cursor] = None, intent: Optional[str] = None,
+             since: Optional[float] = None, until: Optional[float] = None,
+             min_confidence: Optional[float] = None, max_confidence: Optional[float] = None,
+             ) -> Tuple[List[dict], Optional[Cursor]]:
+        """Newest-first page of calls. Pass the returned cursor as `after` for the next
+        page; it is None on the last page."""
+        clauses, args = self._where(intent, since, until, min_confidence, max_confidence)
+        if after is not None:
+            clauses.append("(started_at, call_id) < (?, ?)")
+            args.extend(after)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM calls"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at DESC, call_id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*args, limit + 1)).fetchall()
+        items = [dict(zip(_COLUMNS, r)) for r in rows[:limit]]
+        cursor = (items[-1]["started_at"], items[-1]["call_id"]) if len(rows) > limit else None
+        return items, cursor
+
+    def count(self, intent: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+              min_confidence: Optional[float] = None, max_confidence: Optional[float] = None) -> int:
+        clauses, args = self._where(intent, since, until, min_confidence, max_confidence)
+        sql = "SELECT COUNT(*) FROM calls" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
+
+    def intents(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT intent FROM calls WHERE intent IS NOT NULL ORDER BY intent").fetchall()
+        return [r[0] for r in rows]
+
+    def get(self, call_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+
+_indexes: Dict[str, CallIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_call_index(log_dir: str = "call_logs") -> CallIndex:
+    """Process-wide index for a log directory; CALL_INDEX_DB overrides <log_dir>/index.sqlite3.
+    A newly created index is backfilled from log_dir once."""
+    path = os.getenv("CALL_INDEX_DB") or os.path.join(log_dir, "index.sqlite3")
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            is_new = not os.path.exists(path)
+            index = _indexes[path] = CallIndex(path)
+            if is_new:
+                index.backfill(log_dir)
+        return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill the call history index from a log directory")
+    parser.add_argument("--log-dir", default="call_logs")
+    parser.add_argument("--db", default=None, help="index path (default: CALL_INDEX_DB or <log-dir>/index.sqlite3)")
+    args = parser.parse_args()
+    index = CallIndex(args.db) if args.db else get_call_index(args.log_dir)
+    t0 = time.perf_counter()
+    n = index.backfill(args.log_dir)
+    print(f"indexed {n} calls from {args.log_dir} into {index.path} in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+DEFAULT_CHECKPOINT_DB = os.path.join("call_logs", "checkpoints.sqlite3")
+
+
+def thread_config(call_id: str) -> dict:
+    """Graph config that resumes (or starts) the checkpointed thread of a call."""
+    return {"configurable": {"thread_id": call_id}}
+
+
+def prune_checkpoints(saver: SqliteSaver, call_id: str, keep: int = 1) -> int:
+    """Deletes all but the newest `keep` checkpoints of a call (and their pending writes),
+    so a long call's thread stays constant-size. Returns the number of checkpoints removed.
+
+    checkpoint_id is a time-ordered uuid6, so it sorts by creation.
+    """
+    with saver.cursor() as cur:
+        cur.execute(
+            """SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ''
+               ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?""",
+            (call_id, keep),
+        )
+        stale = [row[0] for row in cur.fetchall()]
+        if stale:
+            marks = ", ".join("?" * len(stale))
+            cur.execute(f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id IN ({marks})", (call_id, *stale))
+            cur.execute(f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_id IN ({marks})", (call_id, *stale))
+    return len(stale)
+
+
+def load_call_state(app, call_id: str) -> Optional[dict]:
+    """Latest checkpointed CallState of a call (e.g. after a server restart), or None."""
+    snapshot = app.get_state(thread_config(call_id))
+    return dict(snapshot.values) if snapshot and snapshot.values else None
+
+
+_savers: Dict[str, SqliteSaver] = {}
+_savers_lock = threading.Lock()
+
+
+def get_checkpointer(path: Optional[str] = None) -> SqliteSaver:
+    """Process-wide SQLite checkpointer shared by every compiled graph; CHECKPOINT_DB
+    overrides call_logs/checkpoints.sqlite3."""
+    path = path or os.getenv("CHECKPOINT_DB") or DEFAULT_CHECKPOINT_DB
+    with _savers_lock:
+        saver = _savers.get(path)
+        if saver is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            saver = _savers[path] = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+            saver.setup()
+        return saver
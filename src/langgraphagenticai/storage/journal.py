@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+from src.langgraphagenticai.utils.call_utils import json_safe
+
+# Per-turn fields copied from the final CallState into a turn event
+TURN_FIELDS = ("clean_text", "intent", "confidence", "entities", "script", "next_action", "nlu_source", "spans")
+
+
+def read_events(path: str) -> Iterator[dict]:
+    """Yields journal events in order. A torn last line (crash mid-write) is skipped."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except OSError:
+        return
+
+
+def rebuild_state(events) -> dict:
+    """Folds journal events into the call-log dict save_call_log used to write:
+    the full transcript plus the fields of the latest turn."""
+    state: dict = {"transcript": [], "turns": 0}
+    for ev in events:
+        kind = ev.get("type")
+        if kind == "start":
+            state["call_id"] = ev.get("call_id")
+            state["started_at"] = ev.get("ts")
+        elif kind == "turn":
+            state.setdefault("call_id", ev.get("call_id"))
+            state["transcript"].extend(ev.get("transcript", []))
+            state.update({k: ev[k] for k in TURN_FIELDS if k in ev})
+            state["turns"] += 1
+        elif kind == "end":
+            state["transcript"].extend(ev.get("transcript", []))
+            state["ended_at"] = ev.get("ts")
+    return state
+
+
+class _OpenJournal:
+    def __init__(self, path: str):
+        self.path = path
+        # Transcript entries already journaled, so each turn only appends the new ones
+        self.written = len(rebuild_state(read_events(path))["transcript"]) if os.path.exists(path) else 0
+        self.file = open(path, "ab")
+        if self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write(b"\n")  # terminate a torn line from a crash
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.last_used = self.last_sync
+
+    def close(self) -> None:
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+
+class CallJournal:
+    """Append-only JSONL journal per call: call_logs/<call_id>.jsonl.
+
+    Each turn appends one event with only the new transcript entries, so the per-turn
+    write cost stays constant as the call grows. Lines are flushed on every append
+    and fsynced in batches (every fsync_every events or fsync_interval seconds).
+    At call end, compact() folds the journal into call_logs/<call_id>.json by
+    atomic rename and removes the journal.
+
+    At most max_open append handles are kept (least recently used closed first) and
+    a handle idle for idle_close seconds is closed, so calls that are never ended
+    (browser closed) do not hold file descriptors; their journal reopens on the next
+    event.
+    """
+
+    def __init__(self, log_dir: str = "call_logs", fsync_every: int = 8, fsync_interval: float = 1.0,
+                 max_open: int = 64, idle_close: float = 300.0):
+        self.log_dir = log_dir
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_open = max_open
+        self.idle_close = idle_close
+        os.makedirs(log_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._open: "OrderedDict[str, _OpenJournal]" = OrderedDict()
+
+    def journal_path(self, call_id: str) -> str:
+        return os.path.join(self.log_dir, f"{call_id}.jsonl")
+
+    def log_path(self, call_id: str) -> str:
+        return os.path.join(self.log_dir, f"{call_id}.json")
+
+    def _journal(self, call_id: str) -> _OpenJournal:
+        now = time.monotonic()
+        j = self._open.get(call_id)
+        if j is None:
+            j = self._open[call_id] = _OpenJournal(self.journal_path(call_id))
+        else:
+            self._open.move_to_end(call_id)
+        j.last_used = now
+        self._close_idle(now)
+        return j
+
+    def _close_idle(self, now: float) -> None:
+        """Closes handles past max_open (oldest first) or idle for idle_close seconds;
+        the most recently used one always stays open."""
+        while len(self._open) > 1:
+            call_id, j = next(iter(self._open.items()))
+            if len(self._open) <= self.max_open and now - j.last_used < self.idle_close:
+                break
+            del self._open[call_id]
+            j.close()
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    def _write(self, j: _OpenJournal, event: dict, sync: bool = False) -> None:
+        j.file.write(json.dumps(json_safe(event), ensure_ascii=False).encode("utf-8") + b"\n")
+        j.file.flush()
+        j.unsynced += 1
+        now = time.monotonic()
+        if sync or j.unsynced >= self.fsync_every or now - j.last_sync >= self.fsync_interval:
+            os.fsync(j.file.fileno())
+            j.unsynced = 0
+            j.last_sync = now
+
+    def start(self, call_id: str) -> str:
+        with self._lock:
+            j = self._journal(call_id)
+            self._write(j, {"type": "start", "call_id": call_id, "ts": time.time()})
+            return j.path
+
+    def append_turn(self, call_id: str, final_state: dict, new_entries: Optional[List[dict]] = None) -> str:
+        """Journals the transcript entries added since the last event plus this turn's
+        NLU result, script and spans. Returns the journal path.
+
+        Pass new_entries when several processes append to the same call, since each
+        process only knows how much of the transcript it has written itself.
+        """
+        with self._lock:
+            j = self._journal(call_id)
+            transcript = final_state.get("transcript") or []
+            if new_entries is None:
+                new_entries = transcript[j.written:]
+            event = {"type": "turn", "call_id": call_id, "ts": time.time(), "transcript": new_entries}
+            event.update({k: final_state[k] for k in TURN_FIELDS if k in final_state})
+            self._write(j, event)
+            j.written = max(j.written + len(new_entries), len(transcript))
+            return j.path
+
+    def end(self, call_id: str, new_entries: Optional[List[dict]] = None) -> str:
+        """Journals the trailing transcript entries (e.g. the system "ended" line) and
+        compacts the call. Returns the compacted log path."""
+        with self._lock:
+            j = self._journal(call_id)
+            event = {"type": "end", "call_id": call_id, "ts": time.time(), "transcript": list(new_entries or [])}
+            self._write(j, event, sync=True)
+            return self._compact(call_id)
+
+    def compact(self, call_id: str) -> str:
+        with self._lock:
+            return self._compact(call_id)
+
+    def _compact(self, call_id: str) -> str:
+        j = self._open.pop(call_id, None)
+        if j is not None:
+            j.close()
+        path = self.journal_path(call_id)
+        state = rebuild_state(read_events(path))
+        target = self.log_path(call_id)
+        tmp = f"{target}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(json_safe(state), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return target
+
+    def load(self, call_id: str) -> Optional[dict]:
+        """Current state of a call: rebuilt from its journal while the call is open,
+        else the compacted log."""
+        path = self.journal_path(call_id)
+        if os.path.exists(path):
+            with self._lock:
+                j = self._open.get(call_id)
+                if j is not None:
+                    j.file.flush()
+            return rebuild_state(read_events(path))
+        try:
+            with open(self.log_path(call_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            for j in self._open.values():
+                j.close()
+            self._open.clear()
+
+
+_journals: Dict[str, CallJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_call_journal(log_dir: str = "call_logs") -> CallJournal:
+    """Process-wide journal per log directory (open handles are shared across reruns)."""
+    with _journals_lock:
+        journal = _journals.get(log_dir)
+        if journal is None:
+            journal = _journals[log_dir] = CallJournal(log_dir)
+        return journal
@@ -0,0 +1,365 @@
+"""Write-behind persistence of call records to a remote database.
+
+Turns enqueue records and return immediately; one background worker batches them
+into bulk upserts. Batches that cannot be written after retries go to a JSONL
+spill file and are replayed once the remote answers again. Try it against the
+local stand-in:
+
+    PERSIST_SQLITE=remote.db streamlit run app.py
+"""
+import abc
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.langgraphagenticai.utils.call_utils import json_safe
+
+# Optional Supabase (disabled if not installed)
+try:
+    from supabase import create_client
+except Exception:
+    create_client = None
+
+# Table -> conflict key; the same names and keys are used by every sink
+TABLES: Dict[str, str] = {
+    "call_events": "event_id",
+    "call_summaries": "call_id",
+}
+
+
+def turn_record(call_id: str, final_state: dict, ts: Optional[float] = None) -> dict:
+    """One call_events row per turn; event_id is fixed at enqueue time so a retried
+    batch upserts the same row instead of duplicating it."""
+    ts = ts or time.time()
+    transcript = final_state.get("transcript") or []
+    user_text = next((e.get("text") for e in reversed(transcript) if e.get("speaker") == "user"), "")
+    return {
+        "event_id": f"{call_id}:{int(ts * 1_000_000)}",
+        "call_id": call_id,
+        "ts": ts,
+        "intent": final_state.get("intent"),
+        "confidence": float(final_state.get("confidence") or 0.0),
+        "nlu_source": final_state.get("nlu_source"),
+        "user_text": user_text,
+        "script": str(final_state.get("script") or ""),
+        "entities": json_safe(final_state.get("entities") or {}),
+        "latency_ms": round(sum(float(s.get("duration_ms") or 0.0) for s in final_state.get("spans") or []), 1),
+    }
+
+
+def summary_record(call_id: str, log: dict) -> dict:
+    """One call_summaries row from a compacted call log (CallJournal.load)."""
+    transcript = log.get("transcript") or []
+    return {
+        "call_id": call_id,
+        "started_at": log.get("started_at") or next((e.get("ts") for e in transcript if e.get("ts")), None),
+        "ended_at": log.get("ended_at") or time.time(),
+        "turns": int(log.get("turns") or sum(1 for e in transcript if e.get("speaker") == "user")),
+        "intent": log.get("intent"),
+        "confidence": float(log.get("confidence") or 0.0),
+        "transcript": json_safe(transcript),
+    }
+
+
+class RemoteSink(abc.ABC):
+    """A bulk-upsert target. Raise on failure; the queue retries and spills."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def upsert(self, table: str, rows: List[dict]) -> None:
+        """Inserts rows into table, updating rows whose TABLES[table] key exists."""
+
+
+class SupabaseSink(RemoteSink):
+    """Supabase (PostgREST) tables named as in TABLES, with a unique constraint on the key."""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str):
+        self.client = create_client(url, key)
+
+    def upsert(self, table: str, rows: List[dict]) -> None:
+        self.client.table(table).upsert(rows, on_conflict=TABLES[table]).execute()
+
+
+class SQLiteSink(RemoteSink):
+    """Local stand-in: the same tables with JSON columns as text and Postgres-style
+    INSERT ... ON CONFLICT upserts. fail_next makes the next n upserts raise."""
+
+    name = "sqlite"
+
+    _COLUMNS = {
+        "call_events": ("event_id", "call_id", "ts", "intent", "confidence", "nlu_source", "user_text", "script",
+                        "entities", "latency_ms"),
+        "call_summaries": ("call_id", "started_at", "ended_at", "turns", "intent", "confidence", "transcript"),
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fail_next = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for table, columns in self._COLUMNS.items():
+            cols = ", ".join(f"{c} PRIMARY KEY" if c == TABLES[table] else c for c in columns)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        self._conn.commit()
+
+    def upsert(self, table: str, rows: List[dict]) -> None:
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError("sqlite sink: simulated outage")
+        columns = self._COLUMNS[table]
+        key = TABLES[table]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+        values = [tuple(json.dumps(r.get(c)) if isinstance(r.get(c), (dict, list)) else r.get(c) for c in columns)
+                  for r in rows]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT({key}) DO UPDATE SET {updates}", values)
+            self._conn.commit()
+
+    def count(self, table: str) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class WriteBehindQueue:
+    """Bounded queue of (table, row) drained by one worker thread into bulk upserts.
+
+    put() never blocks: when the queue is full the record is dropped and counted in
+    stats()["dropped"] (the local call journal still has it). The worker takes up to batch_size records (waiting at most flush_interval
+    for more), keeps the last row per key and upserts each table in one call.
+    Failures are retried with jittered exponential backoff up to max_retries; then
+    the batch is appended to spill_path. While a spill file exists, new batches are
+    appended to it too; it is replayed, oldest first, every retry_spill_after seconds
+    and on flush(), so rows reach the remote in the order they were enqueued.
+    """
+
+    def __init__(self, sink: RemoteSink, spill_path: str, max_queue: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 1.0, max_retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 retry_spill_after: float = 30.0):
+        self.sink = sink
+        self.spill_path = spill_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_spill_after = retry_spill_after
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._spill_checked = 0.0
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.write_ms = 0.0
+        self.last_error = ""
+        os.makedirs(os.path.dirname(os.path.abspath(spill_path)), exist_ok=True)
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def put(self, table: str, row: dict) -> None:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            # Spilling here would put this record ahead of older ones still queued
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.enqueued += 1
+
+    def put_turn(self, call_id: str, final_state: dict) -> None:
+        self.put("call_events", turn_record(call_id, final_state))
+
+    def put_summary(self, call_id: str, log: dict) -> None:
+        self.put("call_summaries", summary_record(call_id, log))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything enqueued so far has been written or spilled, and
+        one spill replay has been attempted; False on timeout."""
+        done = threading.Event()
+        try:
+            self._queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._closed = True
+        self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_replay()
+                continue
+            batch: List[Tuple[str, dict]] = []
+            markers: List[threading.Event] = []
+            item = first
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item[0] is None:
+                    markers.append(item[1])
+                else:
+                    batch.append(item)
+                # A flush marker closes the batch now rather than waiting for more rows
+                if markers or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            # Older spilled records go first; while they cannot be replayed, new batches
+            # join them on disk instead of each waiting out its own retries
+            spill_pending = not self._maybe_replay(force=bool(markers))
+            if batch and (spill_pending or not self._write(batch)):
+                self._spill(batch)
+            for m in markers:
+                m.set()
+
+    def _write(self, batch: List[Tuple[str, dict]], retries: Optional[int] = None) -> bool:
+        by_table: Dict[str, Dict[str, dict]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, {})[str(row.get(TABLES[table]))] = row
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            t0 = time.perf_counter()
+            try:
+                for table, rows in by_table.items():
+                    self.sink.upsert(table, list(rows.values()))
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if attempt == retries or self._closed:
+                    return False
+                with self._lock:
+                    self.retries += 1
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+                continue
+            with self._lock:
+                self.batches += 1
+                self.written += sum(len(rows) for rows in by_table.values())
+                self.write_ms += (time.perf_counter() - t0) * 1000
+                self.last_error = ""
+            return True
+        return False
+
+    def _spill(self, records: List[Tuple[str, dict]]) -> None:
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for table, row in records:
+                    f.write(json.dumps({"table": table, "row": json_safe(row)}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        with self._lock:
+            self.spilled += len(records)
+
+    def _read_spill(self, offset: int = 0) -> Tuple[List[Tuple[str, dict]], int]:
+        """Spilled records from byte offset on, and the offset of the end of the file."""
+        records = []
+        with open(self.spill_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    rec = json.loads(line.decode("utf-8"))
+                    records.append((rec["table"], rec["row"]))
+                except (ValueError, KeyError):
+                    continue  # torn line from a crash mid-write
+            return records, f.tell()
+
+    def _maybe_replay(self, force: bool = False) -> bool:
+        """Replays the spill file in batches (one try each), at most every
+        retry_spill_after seconds unless forced; rewrites it with whatever is left when
+        the remote fails again. The remote writes run without _spill_lock held; lines
+        appended meanwhile are kept after the unsent ones. True when no spill remains.
+        Worker thread only."""
+        if not os.path.exists(self.spill_path):
+            return True
+        now = time.monotonic()
+        if not force and now - self._spill_checked < self.retry_spill_after:
+            return False
+        self._spill_checked = now
+        with self._spill_lock:
+            records, end = self._read_spill()
+        done = 0
+        while done < len(records) and self._write(records[done:done + self.batch_size], retries=0):
+            done += self.batch_size
+        with self._spill_lock:
+            left = records[done:] + self._read_spill(end)[0]
+            if not left:
+                os.remove(self.spill_path)
+            else:
+                tmp = self.spill_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for table, row in left:
+                        f.write(json.dumps({"table": table, "row": row}, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.spill_path)
+        with self._lock:
+            self.replayed += min(done, len(records))
+        return not left
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sink": self.sink.name,
+                "enqueued": self.enqueued,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "avg_batch_ms": round(self.write_ms / self.batches, 1) if self.batches else 0.0,
+                "retries": self.retries,
+                "spilled": self.spilled,
+                "replayed": self.replayed,
+                "dropped": self.dropped,
+                "spill_pending": os.path.exists(self.spill_path),
+                "last_error": self.last_error,
+            }
+
+
+_queue_instance: Optional[WriteBehindQueue] = None
+_queue_checked = False
+_queue_lock = threading.Lock()
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Process-wide queue: Supabase when SUPABASE_URL and SUPABASE_KEY are set (and the
+    client is installed), else the SQLite stand-in at PERSIST_SQLITE; None when neither
+    is configured. PERSIST_SPILL sets the spill file, PERSIST_BATCH the batch size."""
+    global _queue_instance, _queue_checked
+    with _queue_lock:
+        if not _queue_checked:
+            _queue_checked = True
+            url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+            sink: Optional[RemoteSink] = None
+            if url and key and create_client is not None:
+                sink = SupabaseSink(url, key)
+            elif os.getenv("PERSIST_SQLITE"):
+                sink = SQLiteSink(os.getenv("PERSIST_SQLITE"))
+            if sink is not None:
+                _queue_instance = WriteBehindQueue(
+                    sink, spill_path=os.getenv("PERSIST_SPILL") or os.path.join("call_logs", ".persist_spill.jsonl"),
+                    batch_size=int(os.getenv("PERSIST_BATCH") or 200),
+                )
+        return _queue_instance
@@ -0,0 +1,180 @@
+import abc
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.langgraphagenticai.LLMS.scheduler import is_retryable
+from src.langgraphagenticai.audio.preprocess import AudioPreprocessor, PreprocessResult
+from src.langgraphagenticai.cache.stt_cache import STTCache, audio_fingerprint, get_stt_cache
+from src.langgraphagenticai.telemetry.tracing import record_retries
+
+WHISPER_MODEL = "whisper-large-v3"
+
+
+class STTBackend(abc.ABC):
+    """A speech-to-text backend: WAV bytes in, transcript text out. Raise on failure."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def transcribe(self, wav_bytes: bytes, timeout: Optional[float] = None, filename: str = "audio.wav") -> str:
+        """Transcript of a WAV recording."""
+
+
+class GroqWhisperBackend(STTBackend):
+    """Groq Whisper over one pooled client; audio is uploaded straight from memory."""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, model: str = WHISPER_MODEL, language: str = "en"):
+        from groq import Groq
+        # Retries are handled by STTEngine so they are bounded and counted in one place
+        self.client = Groq(api_key=api_key, max_retries=0)
+        self.model = model
+        self.language = language
+
+    def transcribe(self, wav_bytes: bytes, timeout: Optional[float] = None, filename: str = "audio.wav") -> str:
+        result = self.client.audio.transcriptions.create(
+            file=(filename, wav_bytes),
+            model=self.model,
+            response_format="text",
+            language=self.language,
+            timeout=timeout,
+        )
+        return str(result).strip()
+
+
+class StubSTTBackend(STTBackend):
+    """Offline stand-in for tests and benchmarks.
+
+    Returns responses[wav_bytes] when present, else default_text (or
+    text_fn(wav_bytes) if given). latency adds a fixed sleep per call.
+    """
+
+    name = "stub"
+
+    def __init__(self, default_text: str = "", responses: Optional[Dict[bytes, str]] = None,
+                 text_fn: Optional[Callable[[bytes], str]] = None, latency: float = 0.0):
+        self.default_text = default_text
+        self.responses = responses or {}
+        self.text_fn = text_fn
+        self.latency = latency
+        self.calls = 0
+
+    def transcribe(self, wav_bytes: bytes, timeout: Optional[float] = None, filename: str = "audio.wav") -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if wav_bytes in self.responses:
+            return self.responses[wav_bytes]
+        if self.text_fn is not None:
+            return self.text_fn(wav_bytes)
+        return self.default_text
+
+
+class STTEngine:
+    """Reusable STT front end: content-addressed result cache, optional audio
+    pre-processing, per-request timeout and bounded, jittered retries of transient
+    errors (is_retryable: 429, 5xx, timeouts, connection errors)."""
+
+    def __init__(self, backend: STTBackend, timeout: float = 15.0, max_retries: int = 2, backoff: float = 0.25,
+                 preprocessor: Optional[AudioPreprocessor] = None, cache: Optional[STTCache] = None):
+        self.backend = backend
+        self.preprocessor = preprocessor
+        self.cache = cache
+        self.last_preprocess: Optional[PreprocessResult] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.preprocess_ms = 0.0
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def transcribe(self, wav_bytes: bytes, fingerprint: Optional[str] = None) -> str:
+        """Returns the transcript, or "(STT error: ...)" after the last attempt fails."""
+        if self.cache is not None:
+            fingerprint = fingerprint or audio_fingerprint(wav_bytes)
+            cached = self.cache.get(fingerprint)
+            if cached is not None:
+                return cached
+        text = self._transcribe(wav_bytes)
+        if self.cache is not None:
+            self.cache.set(fingerprint, text)
+        return text
+
+    def _transcribe(self, wav_bytes: bytes) -> str:
+        audio, filename = wav_bytes, "audio.wav"
+        if self.preprocessor is not None:
+            prepared = self.preprocessor.process(wav_bytes)
+            audio, filename = prepared.audio, prepared.filename
+            with self._lock:
+                self.last_preprocess = prepared
+                self.bytes_in += prepared.bytes_in
+                self.bytes_out += prepared.bytes_out
+                self.preprocess_ms += prepared.elapsed_ms
+        last_error: Optional[Exception] = None
+        attempts = 0
+        for attempt in range(self.max_retries + 1):
+            attempts = attempt
+            try:
+                text = self.backend.transcribe(audio, timeout=self.timeout, filename=filename)
+                self._record(attempts, failed=False)
+                return text
+            except Exception as e:
+                last_error = e
+                if not is_retryable(e):
+                    break  # bad request, auth, ...: fails the same way every time
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+        self._record(attempts, failed=True)
+        return f"(STT error: {last_error})"
+
+    def _record(self, retries: int, failed: bool) -> None:
+        record_retries(retries)
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            if failed:
+                self.failures += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "preprocess_ms": round(self.preprocess_ms, 2),
+            }
+
+
+_engine: Optional[STTEngine] = None
+_engine_key: Optional[str] = None
+_engine_pinned = False
+_engine_lock = threading.Lock()
+
+
+def get_stt_engine(api_key: str) -> STTEngine:
+    """Process-wide Groq STT engine, rebuilt only when the API key changes."""
+    global _engine, _engine_key
+    with _engine_lock:
+        if not _engine_pinned and (_engine is None or _engine_key != api_key):
+            _engine = STTEngine(GroqWhisperBackend(api_key), preprocessor=AudioPreprocessor(), cache=get_stt_cache())
+            _engine_key = api_key
+        return _engine
+
+
+def set_stt_engine(engine: Optional[STTEngine]) -> None:
+    """Swap in a custom engine (e.g. StubSTTBackend for tests/benchmarks); None restores Groq."""
+    global _engine, _engine_key, _engine_pinned
+    with _engine_lock:
+        _engine = engine
+        _engine_key = None
+        _engine_pinned = engine is not None
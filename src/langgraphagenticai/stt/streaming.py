@@ -0,0 +1,188 @@
+import contextvars
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from src.langgraphagenticai.audio.preprocess import FRAME_MS, decode_wav, encode_wav, frame_rms_db
+from src.langgraphagenticai.cache.stt_cache import audio_fingerprint
+from src.langgraphagenticai.stt.engine import STTEngine
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_stt_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """Shared pool for concurrent segment transcription."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt-segment")
+        return _executor
+
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _words(text: str) -> List[str]:
+    return [w.lower() for w in _WORD.findall(text or "")]
+
+
+def stitch(texts: List[str], max_overlap_words: int = 8) -> str:
+    """Joins segment transcripts, dropping words repeated across the overlap.
+
+    The longest suffix of the running text (up to max_overlap_words) that equals a
+    prefix of the next segment is kept only once.
+    """
+    out_tokens: List[str] = []
+    out_norm: List[str] = []
+    for text in texts:
+        tokens = (text or "").split()
+        norm = [" ".join(_words(t)) for t in tokens]
+        k = min(max_overlap_words, len(out_norm), len(norm))
+        drop = 0
+        for n in range(k, 0, -1):
+            if out_norm[-n:] == norm[:n] and any(norm[:n]):
+                drop = n
+                break
+        out_tokens.extend(tokens[drop:])
+        out_norm.extend(norm[drop:])
+    return " ".join(out_tokens)
+
+
+def pause_split_points(mono: np.ndarray, rate: int, min_pause_ms: int = 300, min_segment_s: float = 2.0,
+                       max_segment_s: float = 10.0, silence_db: float = -40.0) -> List[int]:
+    """Sample indices where the buffer can be cut: mid-points of pauses at least
+    min_pause_ms long, no closer than min_segment_s, forced every max_segment_s."""
+    levels = frame_rms_db(mono, rate)
+    n = max(1, int(rate * FRAME_MS / 1000))
+    quiet = levels < max(silence_db, float(levels.max()) - 35.0)
+    min_pause = max(1, min_pause_ms // FRAME_MS)
+    min_seg, max_seg = int(min_segment_s * rate), int(max_segment_s * rate)
+
+    # Runs of quiet frames via edges of the boolean mask
+    edges = np.diff(np.concatenate(([0], quiet.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    candidates = [((s + e) // 2) * n for s, e in zip(starts, ends) if e - s >= min_pause]
+
+    points, last = [], 0
+    for c in candidates:
+        while c - last > max_seg:
+            last += max_seg
+            points.append(last)
+        if c - last >= min_seg and len(mono) - c >= min_seg // 2:
+            points.append(c)
+            last = c
+    while len(mono) - last > max_seg:
+        last += max_seg
+        points.append(last)
+    return points
+
+
+class StreamingTranscriber:
+    """Transcribes an utterance in overlapping segments while audio is still arriving.
+
+    feed() appends mono PCM and submits every segment that ends at a VAD pause to
+    the thread pool; on_partial receives the stitched text of the finished prefix so
+    preprocess/NLU can start early. finish() flushes the tail and returns the full
+    stitched transcript (same plain text a single-shot transcription returns), or the
+    first segment's "(STT error: ...)" if any segment failed: a transcript with a hole
+    in it is not returned as if it were complete.
+    """
+
+    def __init__(self, engine: STTEngine, rate: int, overlap_ms: int = 300,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 on_partial: Optional[Callable[[str], None]] = None, **split_kwargs):
+        self.engine = engine
+        self.rate = rate
+        self.overlap = int(rate * overlap_ms / 1000)
+        self.executor = executor or get_stt_executor()
+        self.on_partial = on_partial
+        self.split_kwargs = split_kwargs
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # absolute sample index of _buf[0]
+        self._cut = 0  # absolute sample index of the last cut
+        self._futures: List[Future] = []
+        # Re-entrant: a future that is already done runs its callback inside _submit
+        self._lock = threading.RLock()
+
+    def _submit(self, start: int, end: int) -> None:
+        lo = max(0, start - self.overlap - self._offset)
+        hi = min(len(self._buf), end + self.overlap - self._offset)
+        wav = encode_wav(self._buf[lo:hi], self.rate)
+        # Copy of the caller's context so retries land in the caller's span
+        fut = self.executor.submit(contextvars.copy_context().run, self.engine.transcribe, wav)
+        if self.on_partial is not None:
+            fut.add_done_callback(lambda _: self._emit_partial())
+        self._futures.append(fut)
+
+    def _emit_partial(self) -> None:
+        with self._lock:
+            done = []
+            for f in self._futures:
+                if not f.done():
+                    break
+                done.append(f.result())
+        text = stitch([t for t in done if t and not t.startswith("(")])
+        if text:
+            self.on_partial(text)
+
+    def feed(self, pcm: np.ndarray) -> None:
+        self._buf = np.concatenate((self._buf, pcm.astype(np.float32)))
+        local_cut = self._cut - self._offset
+        points = pause_split_points(self._buf[local_cut:], self.rate, **self.split_kwargs)
+        base = self._cut
+        with self._lock:
+            for p in points:
+                end = base + p
+                self._submit(self._cut, end)
+                self._cut = end
+        # Keep only what the next segment (plus its leading overlap) still needs
+        drop = max(0, self._cut - self.overlap - self._offset)
+        if drop:
+            self._buf = self._buf[drop:]
+            self._offset += drop
+
+    def finish(self) -> str:
+        end = self._offset + len(self._buf)
+        with self._lock:
+            if end > self._cut:
+                self._submit(self._cut, end)
+                self._cut = end
+            futures = list(self._futures)
+        texts = [f.result() for f in futures]
+        errors = [t for t in texts if t.startswith("(")]
+        if errors:
+            return errors[0]  # each segment was already retried by the engine
+        return stitch([t for t in texts if t])
+
+
+def transcribe_segmented(engine: STTEngine, wav_bytes: bytes, min_duration_s: float = 8.0,
+                         fingerprint: Optional[str] = None,
+                         on_partial: Optional[Callable[[str], None]] = None) -> str:
+    """Splits a long recording at pauses and transcribes the pieces concurrently.
+
+    Short or undecodable recordings go through engine.transcribe unchanged. The
+    stitched result is cached under the whole recording's fingerprint; an error (any
+    failed segment) is returned and, like every STT error, never cached.
+    """
+    try:
+        pcm, rate = decode_wav(wav_bytes)
+    except Exception:
+        return engine.transcribe(wav_bytes, fingerprint=fingerprint)
+    if len(pcm) < min_duration_s * rate:
+        return engine.transcribe(wav_bytes, fingerprint=fingerprint)
+    if engine.cache is not None:
+        fingerprint = fingerprint or audio_fingerprint(wav_bytes)
+        cached = engine.cache.get(fingerprint)
+        if cached is not None:
+            return cached
+    mono = pcm.mean(axis=1) if pcm.shape[1] > 1 else pcm[:, 0]
+    streamer = StreamingTranscriber(engine, rate, on_partial=on_partial)
+    streamer.feed(mono)
+    text = streamer.finish()
+    if engine.cache is not None:
+        engine.cache.set(fingerprint, text)
+    return text
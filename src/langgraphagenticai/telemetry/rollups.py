@@ -0,0 +1,229 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Bucket width (seconds) and how many buckets of each resolution are kept
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "minute": (60, 24 * 60),
+    "hour": (3600, 30 * 24),
+    "day": (86400, 400),
+}
+
+CONFIDENCE_BINS = 10
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error `alpha` (DDSketch-style log buckets).
+
+    Values land in bucket ceil(log_gamma(v)), so memory grows with the value range,
+    not the count, and two sketches merge by adding bucket counts.
+    """
+
+    def __init__(self, alpha: float = 0.02, counts: Optional[Dict[int, int]] = None, zeros: int = 0):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.counts: Dict[int, int] = counts or {}
+        self.zeros = zeros
+        self.count = zeros + sum(self.counts.values())
+
+    def add(self, value: float, n: int = 1) -> None:
+        if value <= 0:
+            self.zeros += n
+        else:
+            k = math.ceil(math.log(value) / self._log_gamma)
+            self.counts[k] = self.counts.get(k, 0) + n
+        self.count += n
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for k, n in other.counts.items():
+            self.counts[k] = self.counts.get(k, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.counts):
+            seen += self.counts[k]
+            if seen > rank:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.counts) / (self.gamma + 1)
+
+    def to_dict(self) -> dict:
+        return {"a": self.alpha, "z": self.zeros, "c": {str(k): n for k, n in self.counts.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        return cls(data.get("a", 0.02), {int(k): n for k, n in data.get("c", {}).items()}, data.get("z", 0))
+
+
+class Rollup:
+    """Aggregates of the turns in one time bucket; rollups of any buckets merge exactly
+    (latency quantiles within the sketch's relative error)."""
+
+    def __init__(self):
+        self.turns = 0
+        self.calls = 0
+        self.intents: Dict[str, int] = {}
+        self.sources: Dict[str, int] = {}
+        self.confidence_sum = 0.0
+        self.confidence_hist = [0] * CONFIDENCE_BINS
+        self.latency = QuantileSketch()  # turn latency (ms), summed over its spans
+        self.stages: Dict[str, QuantileSketch] = {}  # per-span-name latency (ms)
+
+    def add_turn(self, state: dict, first_turn: bool = False) -> None:
+        self.turns += 1
+        self.calls += 1 if first_turn else 0
+        intent = state.get("intent") or "unknown"
+        self.intents[intent] = self.intents.get(intent, 0) + 1
+        source = state.get("nlu_source") or "unknown"
+        self.sources[source] = self.sources.get(source, 0) + 1
+        conf = min(1.0, max(0.0, float(state.get("confidence") or 0.0)))
+        self.confidence_sum += conf
+        self.confidence_hist[min(CONFIDENCE_BINS - 1, int(conf * CONFIDENCE_BINS))] += 1
+        spans = [s for s in state.get("spans") or [] if isinstance(s, dict) and "duration_ms" in s]
+        if spans:
+            self.latency.add(sum(float(s["duration_ms"]) for s in spans))
+        for s in spans:
+            self.stages.setdefault(s.get("name", "?"), QuantileSketch()).add(float(s["duration_ms"]))
+
+    def merge(self, other: "Rollup") -> None:
+        self.turns += other.turns
+        self.calls += other.calls
+        for k, n in other.intents.items():
+            self.intents[k] = self.intents.get(k, 0) + n
+        for k, n in other.sources.items():
+            self.sources[k] = self.sources.get(k, 0) + n
+        self.confidence_sum += other.confidence_sum
+        self.confidence_hist = [a + b for a, b in zip(self.confidence_hist, other.confidence_hist)]
+        self.latency.merge(other.latency)
+        for name, sketch in other.stages.items():
+            self.stages.setdefault(name, QuantileSketch(sketch.alpha)).merge(sketch)
+
+    def summary(self) -> dict:
+        return {
+            "turns": self.turns,
+            "calls": self.calls,
+            "intents": dict(sorted(self.intents.items(), key=lambda kv: -kv[1])),
+            "nlu_sources": dict(self.sources),
+            "fallback_rate": round(self.sources.get("fallback", 0) / self.turns, 4) if self.turns else 0.0,
+            "avg_confidence": round(self.confidence_sum / self.turns, 4) if self.turns else 0.0,
+            "confidence_hist": list(self.confidence_hist),
+            "latency_ms": {f"p{int(q * 100)}": round(self.latency.quantile(q), 1) for q in (0.5, 0.95, 0.99)},
+            "stage_p95_ms": {name: round(s.quantile(0.95), 1) for name, s in sorted(self.stages.items())},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "t": self.turns, "n": self.calls, "i": self.intents, "s": self.sources,
+            "cs": round(self.confidence_sum, 6), "ch": self.confidence_hist,
+            "l": self.latency.to_dict(), "st": {k: v.to_dict() for k, v in self.stages.items()},
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Rollup":
+        data = json.loads(raw)
+        r = cls()
+        r.turns, r.calls = data.get("t", 0), data.get("n", 0)
+        r.intents, r.sources = data.get("i", {}), data.get("s", {})
+        r.confidence_sum = data.get("cs", 0.0)
+        r.confidence_hist = data.get("ch", [0] * CONFIDENCE_BINS)
+        r.latency = QuantileSketch.from_dict(data.get("l", {}))
+        r.stages = {k: QuantileSketch.from_dict(v) for k, v in data.get("st", {}).items()}
+        return r
+
+
+class RollupStore:
+    """Per-minute/hour/day rollups updated as turns are logged, persisted to SQLite.
+
+    Each turn touches one bucket per resolution; a dashboard query merges at most
+    the requested number of buckets, so its cost does not depend on how many
+    calls have been stored. Buckets beyond each resolution's retention are pruned.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int], Rollup] = {}
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollups (resolution TEXT, bucket INTEGER, data TEXT, "
+                "PRIMARY KEY (resolution, bucket))"
+            )
+            self._conn.commit()
+            self._load()
+
+    def _load(self) -> None:
+        now = time.time()
+        for resolution, (width, keep) in RESOLUTIONS.items():
+            oldest = int(now // width - keep + 1) * width
+            rows = self._conn.execute(
+                "SELECT bucket, data FROM rollups WHERE resolution = ? AND bucket >= ?", (resolution, oldest)
+            ).fetchall()
+            for bucket, data in rows:
+                self._buckets[(resolution, bucket)] = Rollup.from_json(data)
+
+    def record_turn(self, state: dict, ts: Optional[float] = None) -> None:
+        ts = ts or time.time()
+        first_turn = sum(1 for t in state.get("transcript") or [] if isinstance(t, dict) and t.get("speaker") == "user") <= 1
+        with self._lock:
+            touched = []
+            for resolution, (width, keep) in RESOLUTIONS.items():
+                bucket = int(ts // width) * width
+                rollup = self._buckets.get((resolution, bucket))
+                if rollup is None:
+                    rollup = self._buckets[(resolution, bucket)] = Rollup()
+                    self._prune(resolution, bucket - (keep - 1) * width)
+                rollup.add_turn(state, first_turn)
+                touched.append((resolution, bucket, rollup.to_json()))
+            if self._conn is not None:
+                self._conn.executemany("INSERT OR REPLACE INTO rollups (resolution, bucket, data) VALUES (?, ?, ?)", touched)
+                self._conn.commit()
+
+    def _prune(self, resolution: str, oldest: int) -> None:
+        for key in [k for k in self._buckets if k[0] == resolution and k[1] < oldest]:
+            del self._buckets[key]
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?", (resolution, oldest))
+
+    def series(self, resolution: str = "hour", last: int = 24, now: Optional[float] = None) -> List[Tuple[int, Rollup]]:
+        """The last `last` buckets of a resolution, oldest first (empty buckets included)."""
+        width, keep = RESOLUTIONS[resolution]
+        end = int((now or time.time()) // width) * width
+        last = min(last, keep)
+        with self._lock:
+            return [(b, self._buckets.get((resolution, b)) or Rollup())
+                    for b in range(end - (last - 1) * width, end + 1, width)]
+
+    def window(self, resolution: str = "hour", last: int = 24, now: Optional[float] = None) -> Rollup:
+        merged = Rollup()
+        for _, rollup in self.series(resolution, last, now):
+            merged.merge(rollup)
+        return merged
+
+
+_rollups: Dict[str, RollupStore] = {}
+_rollups_lock = threading.Lock()
+
+
+def get_rollups(log_dir: str = "call_logs") -> RollupStore:
+    """Process-wide rollups; ROLLUP_DB overrides <log_dir>/rollups.sqlite3."""
+    path = os.getenv("ROLLUP_DB") or os.path.join(log_dir, "rollups.sqlite3")
+    with _rollups_lock:
+        store = _rollups.get(path)
+        if store is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            store = _rollups[path] = RollupStore(path)
+        return store
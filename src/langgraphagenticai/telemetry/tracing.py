@@ -0,0 +1,176 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Prometheus histogram buckets (seconds) for stage latency
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class StageMetrics:
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.tokens = 0
+        self.retries = 0
+
+
+class Tracer:
+    """In-process aggregation of spans per (stage, source): Prometheus histograms plus
+    a window of recent durations for dashboard percentiles."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[Tuple[str, str], StageMetrics] = {}
+
+    def record(self, name: str, seconds: float, source: str = "", tokens: int = 0, retries: int = 0) -> None:
+        with self._lock:
+            m = self._stages.get((name, source))
+            if m is None:
+                m = self._stages[(name, source)] = StageMetrics(self.window)
+            m.count += 1
+            m.total += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    m.buckets[i] += 1
+            m.recent.append(seconds)
+            m.tokens += tokens
+            m.retries += retries
+
+    def summary(self) -> List[dict]:
+        rows = []
+        with self._lock:
+            for (name, source), m in sorted(self._stages.items()):
+                recent = sorted(m.recent)
+                pick = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+                rows.append({
+                    "stage": name,
+                    "source": source,
+                    "count": m.count,
+                    "mean_ms": round(1000 * m.total / m.count, 1) if m.count else 0.0,
+                    "p50_ms": round(1000 * pick(0.50), 1),
+                    "p95_ms": round(1000 * pick(0.95), 1),
+                    "tokens": m.tokens,
+                    "retries": m.retries,
+                })
+        return rows
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP cerevyn_stage_seconds Latency of call pipeline stages.",
+            "# TYPE cerevyn_stage_seconds histogram",
+        ]
+        counters = []
+        with self._lock:
+            for (name, source), m in sorted(self._stages.items()):
+                labels = f'stage="{name}",source="{source}"'
+                for bound, n in zip(BUCKETS, m.buckets):
+                    lines.append(f'cerevyn_stage_seconds_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f'cerevyn_stage_seconds_bucket{{{labels},le="+Inf"}} {m.count}')
+                lines.append(f"cerevyn_stage_seconds_sum{{{labels}}} {m.total:.6f}")
+                lines.append(f"cerevyn_stage_seconds_count{{{labels}}} {m.count}")
+                counters.append((labels, m.tokens, m.retries))
+        lines.append("# HELP cerevyn_stage_tokens_total LLM tokens used per stage.")
+        lines.append("# TYPE cerevyn_stage_tokens_total counter")
+        lines.extend(f"cerevyn_stage_tokens_total{{{labels}}} {tokens}" for labels, tokens, _ in counters)
+        lines.append("# HELP cerevyn_stage_retries_total Retries per stage.")
+        lines.append("# TYPE cerevyn_stage_retries_total counter")
+        lines.extend(f"cerevyn_stage_retries_total{{{labels}}} {retries}" for labels, _, retries in counters)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Optional[str] = None) -> str:
+        """Atomically writes the text exposition (for node_exporter's textfile collector)."""
+        path = path or os.getenv("METRICS_FILE") or os.path.join("call_logs", "metrics.prom")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+_tracer = Tracer()
+# Innermost open span of the running context; call sites add their tokens/retries to it
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_counts_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def _add_to_span(key: str, n: int) -> None:
+    data = _current_span.get()
+    if data is None or not n:
+        return
+    with _counts_lock:
+        data[key] = int(data.get(key, 0) or 0) + int(n)
+
+
+def record_tokens(n: int) -> None:
+    """Adds LLM tokens to the innermost open span (no-op outside a span). Called where
+    the LLM call is made, so worker threads running in a copied context count too."""
+    _add_to_span("tokens", n)
+
+
+def record_retries(n: int) -> None:
+    """Adds retries made by the current call to the innermost open span."""
+    _add_to_span("retries", n)
+
+
+@contextmanager
+def span(name: str, sink: Optional[list] = None, **attrs):
+    """Times a block. Yields a dict the block can add attributes to (source, tokens,
+    retries, ...); the finished span is appended to sink and recorded by the tracer."""
+    data = {"name": name, "start": time.time(), **attrs}
+    token = _current_span.set(data)
+    t0 = time.perf_counter()
+    try:
+        yield data
+    finally:
+        seconds = time.perf_counter() - t0
+        _current_span.reset(token)
+        data["duration_ms"] = round(seconds * 1000, 3)
+        if sink is not None:
+            sink.append(data)
+        _tracer.record(name, seconds, str(data.get("source", "")), int(data.get("tokens", 0) or 0),
+                       int(data.get("retries", 0) or 0))
+
+
+def _node_attrs(name: str, state: dict, data: dict) -> None:
+    if name == "nlu_node" or name == "fused_nlu_script_node":
+        data["source"] = state.get("nlu_source", "")
+
+
+def traced_node(name: str, fn):
+    """Wraps a graph node (sync or async) so each run appends a span to state['spans']."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            sink = state.setdefault("spans", [])
+            with span(name, sink) as data:
+                result = await fn(state)
+                _node_attrs(name, result, data)
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        sink = state.setdefault("spans", [])
+        with span(name, sink) as data:
+            result = fn(state)
+            _node_attrs(name, result, data)
+        return result
+    return wrapper
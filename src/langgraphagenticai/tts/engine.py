@@ -0,0 +1,269 @@
+import abc
+import io
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from src.langgraphagenticai.cache.tts_cache import TTSCache, tts_key
+from src.langgraphagenticai.tts.streaming import split_sentences
+
+DEFAULT_RATE = 170
+# Silence between joined sentences
+SENTENCE_GAP_S = 0.12
+
+# Customer lines worth rendering at startup: the stock phrasings the domain prompts
+# steer the model towards, per intent and action label
+PREWARM_LINES: Dict[str, Dict[str, str]] = {
+    "Billing Issue": {
+        "adjust-bill": "We have adjusted your bill; the corrected amount will reflect within 24 hours.",
+        "open-billing-ticket": "Ticket created — resolution within 48 hours.",
+        "escalate-to-billing": "We have escalated this to our billing team; expect an update within 48 hours.",
+        "inform-no-issue-found": "We checked your bill and found no errors in the charges.",
+    },
+    "SIM Not Working": {
+        "remote-provision": "We have re-provisioned your SIM; please restart your phone now.",
+        "schedule-sim-replacement": "We have scheduled a free SIM replacement for you.",
+        "ticket-device-check": "Restart phone and reinsert SIM; if still fails, request SIM re-provisioning.",
+    },
+    "No Network Coverage": {
+        "create-network-ticket": "We will create a ticket for tower inspection; you'll be notified.",
+        "advise-roaming": "Please enable network roaming in your phone settings.",
+        "check-provisioning": "We are checking your network provisioning; expect an update within 24 hours.",
+    },
+    "Internet Speed Slow": {
+        "automated-reset": "We will attempt an automated profile reset; expected improvement within 30 minutes.",
+        "create-speed-ticket": "We have created a speed complaint ticket; expect an update within 24 hours.",
+        "advise-plan-upgrade": "Your current plan limits your speed; upgrading the plan will fix this.",
+    },
+    "Data Not Working After Recharge": {
+        "reprovision-data": "We have re-provisioned your data; please restart your device now.",
+        "refund-if-failed": "If the recharge failed, the amount will be refunded within 5 working days.",
+        "open-ticket": "Ticket created — resolution within 48 hours.",
+    },
+    "Call Drops Frequently": {
+        "create-network-investigation": "We will raise a network investigation ticket; expect update within 48 hours.",
+        "schedule-field-check": "We have scheduled a field engineer check in your area.",
+        "check-provisioning": "We are checking your network provisioning; expect an update within 24 hours.",
+    },
+}
+
+
+def prewarm_lines() -> List[str]:
+    return sorted({line for labels in PREWARM_LINES.values() for line in labels.values()})
+
+
+def join_wavs(parts: List[bytes], gap_s: float = SENTENCE_GAP_S) -> bytes:
+    """Concatenates WAV renderings (same format) with a short silence between them."""
+    if len(parts) == 1:
+        return parts[0]
+    frames, params = [], None
+    for part in parts:
+        with wave.open(io.BytesIO(part), "rb") as w:
+            params = params or w.getparams()
+            frames.append(w.readframes(w.getnframes()))
+    silence = b"\x00" * (int(params.framerate * gap_s) * params.sampwidth * params.nchannels)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(params.nchannels)
+        w.setsampwidth(params.sampwidth)
+        w.setframerate(params.framerate)
+        w.writeframes(silence.join(frames))
+    return buf.getvalue()
+
+
+class TTSBackend(abc.ABC):
+    """A text-to-speech backend: text in, WAV bytes out. Raise on failure."""
+
+    name = "base"
+
+    def load(self) -> None:
+        """Initializes the backend on the engine's render thread."""
+
+    @abc.abstractmethod
+    def render(self, text: str, voice: str, rate: int) -> bytes:
+        """WAV bytes for text in the given voice and words-per-minute rate."""
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Offline pyttsx3 (espeak / SAPI5 / NSSpeech) rendering to a WAV file."""
+
+    name = "pyttsx3"
+
+    def __init__(self):
+        self._engine = None
+
+    def load(self) -> None:
+        import pyttsx3
+        self._engine = pyttsx3.init()
+
+    def render(self, text: str, voice: str, rate: int) -> bytes:
+        if voice:
+            self._engine.setProperty("voice", voice)
+        self._engine.setProperty("rate", rate)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+class StubTTSBackend(TTSBackend):
+    """Offline stand-in for tests and benchmarks: a tone whose pitch depends on the
+    text and whose length grows with the word count. latency adds a sleep per render."""
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, rate_hz: int = 16000):
+        self.latency = latency
+        self.rate_hz = rate_hz
+        self.calls = 0
+
+    def render(self, text: str, voice: str, rate: int) -> bytes:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seconds = 60.0 / max(rate, 1) * max(1, len(text.split()))
+        freq = 180 + sum(text.encode("utf-8")) % 200
+        n = int(self.rate_hz * seconds)
+        pcm = struct.pack(f"<{n}h", *(int(8000 * math.sin(2 * math.pi * freq * i / self.rate_hz)) for i in range(n)))
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.rate_hz)
+            w.writeframes(pcm)
+        return buf.getvalue()
+
+
+class TTSEngine:
+    """Server-side TTS with a content-addressed render cache.
+
+    Lines are rendered per sentence, so a stock sentence ("Ticket created — ...")
+    is synthesized once and reused inside any line that contains it. All rendering
+    runs on one worker thread (pyttsx3 engines are not thread-safe); concurrent
+    requests for the same sentence share one render.
+    """
+
+    def __init__(self, backend: TTSBackend, cache: Optional[TTSCache] = None, voice: str = "",
+                 rate: int = DEFAULT_RATE, timeout: float = 30.0):
+        self.backend = backend
+        self.cache = cache or TTSCache()
+        self.voice = voice
+        self.rate = rate
+        self.timeout = timeout
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.renders = 0
+        self.render_ms = 0.0
+        self.failures = 0
+        self.prewarmed = 0
+
+    def start(self) -> None:
+        """Loads the backend on the render thread; raises if it is unavailable."""
+        self._worker.submit(self.backend.load).result()
+
+    def _key(self, sentence: str) -> str:
+        return tts_key(sentence, self.voice, self.rate, self.backend.name)
+
+    def _render_and_store(self, key: str, sentence: str) -> bytes:
+        t0 = time.perf_counter()
+        try:
+            audio = self.backend.render(sentence, self.voice, self.rate)
+            self.cache.set(key, audio)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            # Only after cache.set, so a concurrent render() finds one or the other
+            with self._lock:
+                self._inflight.pop(key, None)
+        with self._lock:
+            self.renders += 1
+            self.render_ms += (time.perf_counter() - t0) * 1000
+        return audio
+
+    def _submit(self, key: str, sentence: str) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._worker.submit(self._render_and_store, key, sentence)
+            return future
+
+    def render(self, text: str) -> bytes:
+        """WAV for a customer line; cached sentences cost nothing."""
+        parts: List = []
+        for sentence in split_sentences(text):
+            key = self._key(sentence)
+            audio = self.cache.get(key)
+            parts.append(audio if audio is not None else self._submit(key, sentence))
+        if not parts:
+            return b""
+        deadline = time.monotonic() + self.timeout
+        return join_wavs([p if isinstance(p, bytes) else p.result(timeout=max(0.0, deadline - time.monotonic()))
+                          for p in parts])
+
+    def prewarm(self, texts: Iterable[str]) -> int:
+        """Queues background renders of every sentence not cached yet; returns how many."""
+        queued = 0
+        for text in texts:
+            for sentence in split_sentences(text):
+                key = self._key(sentence)
+                with self._lock:
+                    pending = key in self._inflight
+                if not pending and not self.cache.contains(key):
+                    self._submit(key, sentence)
+                    queued += 1
+        with self._lock:
+            self.prewarmed += queued
+        return queued
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            s = {
+                "backend": self.backend.name,
+                "renders": self.renders,
+                "avg_render_ms": round(self.render_ms / self.renders, 1) if self.renders else 0.0,
+                "failures": self.failures,
+                "prewarmed": self.prewarmed,
+                "pending": len(self._inflight),
+            }
+        return {**s, **{f"cache_{k}": v for k, v in self.cache.stats().items()}}
+
+
+_engine: Optional[TTSEngine] = None
+_engine_failed = False
+_engine_lock = threading.Lock()
+
+
+def get_tts_engine() -> Optional[TTSEngine]:
+    """Process-wide pyttsx3 engine, pre-warmed with PREWARM_LINES in the background;
+    None when pyttsx3 (or its speech driver) is unavailable. TTS_CACHE_DIR persists
+    renderings; TTS_CACHE_MB, TTS_VOICE and TTS_RATE tune it; TTS_PREWARM=0 skips warming."""
+    global _engine, _engine_failed
+    with _engine_lock:
+        if _engine is None and not _engine_failed:
+            cache = TTSCache(max_bytes=int(float(os.getenv("TTS_CACHE_MB") or 64) * 1024 * 1024),
+                             directory=os.getenv("TTS_CACHE_DIR") or None)
+            engine = TTSEngine(Pyttsx3Backend(), cache, voice=os.getenv("TTS_VOICE") or "",
+                               rate=int(os.getenv("TTS_RATE") or DEFAULT_RATE))
+            try:
+                engine.start()
+            except Exception:
+                _engine_failed = True
+                return None
+            if os.getenv("TTS_PREWARM", "1") != "0":
+                engine.prewarm(prewarm_lines())
+            _engine = engine
+        return _engine
@@ -0,0 +1,52 @@
+import re
+from typing import List
+
+# A sentence ends at . ! or ? followed by whitespace (the next token has started)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def customer_line(script: str) -> str:
+    """Line 1 of a three-line agent script is the only customer-facing part."""
+    for line in (script or "").splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a finished line, split the same way SentenceChunker splits a stream."""
+    return [s for s in (p.strip() for p in _SENTENCE_END.split(" ".join((text or "").split()))) if s]
+
+
+class SentenceChunker:
+    """Cuts streamed LLM text into finished sentences of the customer-facing line.
+
+    feed() returns the sentences completed by the new chunk; anything after the
+    first newline (action label, internal note) is never emitted.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._done = False
+
+    def feed(self, text: str) -> List[str]:
+        if self._done or not text:
+            return []
+        self._buf += text
+        # Skip blank lines the model may emit before line 1
+        self._buf = self._buf.lstrip("\n")
+        if "\n" in self._buf:
+            line, _ = self._buf.split("\n", 1)
+            self._buf = ""
+            self._done = True
+            return [s for s in (p.strip() for p in _SENTENCE_END.split(line)) if s]
+        parts = _SENTENCE_END.split(self._buf)
+        self._buf = parts.pop()
+        return [s for s in (p.strip() for p in parts) if s]
+
+    def flush(self) -> List[str]:
+        if self._done:
+            return []
+        self._done = True
+        rest, self._buf = self._buf.strip(), ""
+        return [rest] if rest else []
@@ -0,0 +1,56 @@
+import time
+import uuid
+
+
+def generate_call_id(prefix: str = "C") -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:8].upper()}-{time.strftime('%y%m%d%H%M%S')}"
+
+
+def extract_script_text(script_obj) -> str:
+    if script_obj is None:
+        return ""
+    if isinstance(script_obj, str):
+        return script_obj
+    if hasattr(script_obj, "content"):
+        try:
+            return str(script_obj.content)
+        except Exception:
+            pass
+    if isinstance(script_obj, dict):
+        for k in ("content", "text", "message"):
+            if k in script_obj and isinstance(script_obj[k], str):
+                return script_obj[k]
+    return str(script_obj)
+
+
+def json_safe(obj):
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, dict):
+        return {str(json_safe(k)): json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [json_safe(x) for x in obj]
+    if isinstance(obj, (bytes, bytearray)):
+        try:
+            return obj.decode("utf-8", errors="replace")
+        except Exception:
+            return str(obj)
+    name = obj.__class__.__name__
+    if hasattr(obj, "content") and name in ("AIMessage", "HumanMessage", "SystemMessage", "ChatMessage"):
+        safe = {"type": name, "content": json_safe(getattr(obj, "content", ""))}
+        if hasattr(obj, "additional_kwargs"):
+            safe["additional_kwargs"] = json_safe(getattr(obj, "additional_kwargs", {}))
+        return safe
+    try:
+        from pydantic import BaseModel
+        if isinstance(obj, BaseModel):
+            return json_safe(obj.model_dump())
+    except Exception:
+        pass
+    try:
+        import dataclasses
+        if dataclasses.is_dataclass(obj):
+            return json_safe(dataclasses.asdict(obj))
+    except Exception:
+        pass
+    return str(obj)
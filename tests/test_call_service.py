@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from src.langgraphagenticai.service.call_service import CallService, UnknownCall
+from src.langgraphagenticai.service.server import MalformedRequest, _read_request
+
+
+class _EchoApp:
+    async def ainvoke(self, state):
+        return {**state, "script": "Okay."}
+
+
+def test_idle_calls_expire_and_active_ones_stay():
+    service = CallService(_EchoApp(), session_ttl=60)
+    idle, active = service.start_call("idle"), service.start_call("active")
+    service.sessions[idle].last_active -= 120
+    assert service.expire_idle() == 1
+    assert list(service.sessions) == [active]
+    assert service.stats()["expired"] == 1
+    with pytest.raises(UnknownCall):
+        asyncio.run(service.submit_turn(idle, "hello"))
+
+
+def test_call_with_a_turn_in_progress_is_not_expired():
+    service = CallService(_EchoApp(), session_ttl=60)
+    call_id = service.start_call()
+
+    async def scenario():
+        async with service.sessions[call_id].lock:
+            return service.expire_idle(now=time.monotonic() + 120)
+
+    assert asyncio.run(scenario()) == 0
+    assert call_id in service.sessions
+
+
+def _parse(raw: bytes):
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader)
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("raw", [b"GARBAGE\r\n\r\n",
+                                 b"POST /calls HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+                                 b"POST /calls HTTP/1.1\r\nContent-Length: -5\r\n\r\n"])
+def test_malformed_requests_are_not_reported_as_too_large(raw):
+    with pytest.raises(MalformedRequest):
+        _parse(raw)
+
+
+def test_request_parsing():
+    raw = b'POST /calls/abc/turns?x=1 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}'
+    assert _parse(raw) == ("POST", "/calls/abc/turns", b"{}")
@@ -0,0 +1,17 @@
+from datetime import date
+
+from src.langgraphagenticai.nodes.entity_extractor import extract_entities
+
+TODAY = date(2025, 11, 16)
+
+
+def test_may_as_a_verb_is_not_a_date():
+    assert "date" not in extract_entities("i may 2 recharge", TODAY)
+    assert "date" not in extract_entities("the 5 mar bill", TODAY)
+
+
+def test_may_with_date_context_is_a_date():
+    assert extract_entities("2nd may", TODAY)["date"] == "2025-05-02"
+    assert extract_entities("since may 3 no data", TODAY)["date"] == "2025-05-03"
+    assert extract_entities("may 2, 2024", TODAY)["date"] == "2024-05-02"
+    assert extract_entities("5 june", TODAY)["date"] == "2025-06-05"
@@ -0,0 +1,31 @@
+from src.langgraphagenticai.nodes.intent_classifier import KeywordIntentClassifier
+from src.langgraphagenticai.nodes.nodes import (
+    DEFAULT_EVIDENCE_SCALE,
+    DEFAULT_INTENT,
+    DEFAULT_NLU_THRESHOLD,
+    INTENT_KEYWORDS,
+)
+
+
+def _classifier():
+    return KeywordIntentClassifier(INTENT_KEYWORDS, DEFAULT_INTENT, evidence_scale=DEFAULT_EVIDENCE_SCALE)
+
+
+def test_keywords_match_whole_words_only():
+    clf = _classifier()
+    assert clf.rank("similar problem as yesterday") == []
+    assert clf.rank("the company made a billion") == []
+    assert [i for i, _ in clf.rank("my bills are wrong")] == ["Billing Issue"]
+
+
+def test_single_keyword_stays_below_threshold():
+    clf = _classifier()
+    top = max(w for kws in INTENT_KEYWORDS.values() for _, w in kws)
+    assert clf.confidence(top, 0.0) < DEFAULT_NLU_THRESHOLD
+    assert clf.predict("my sim is not working").confidence < DEFAULT_NLU_THRESHOLD
+
+
+def test_corroborated_intent_is_answered_locally():
+    pred = _classifier().predict("my bill is unusually high and i was overcharged")
+    assert pred.intent == "Billing Issue"
+    assert pred.confidence >= DEFAULT_NLU_THRESHOLD
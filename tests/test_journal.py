@@ -0,0 +1,20 @@
+from src.langgraphagenticai.storage.journal import CallJournal
+
+
+def test_open_handles_are_bounded_and_reopen_cleanly(tmp_path):
+    journal = CallJournal(str(tmp_path), max_open=2)
+    for i in range(5):
+        journal.start(f"call-{i}")
+        journal.append_turn(f"call-{i}", {"transcript": [{"speaker": "user", "text": "hello"}]})
+    assert journal.open_count() == 2
+
+    transcript = [{"speaker": "user", "text": "hello"}, {"speaker": "agent", "text": "hi"}]
+    journal.append_turn("call-0", {"transcript": transcript})
+    assert journal.load("call-0")["transcript"] == transcript
+
+
+def test_idle_handles_are_closed(tmp_path):
+    journal = CallJournal(str(tmp_path), idle_close=0.0)
+    journal.start("abandoned")
+    journal.start("active")
+    assert journal.open_count() == 1
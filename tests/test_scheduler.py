@@ -0,0 +1,66 @@
+import asyncio
+import contextvars
+
+from src.langgraphagenticai.LLMS.scheduler import LLMScheduler
+
+_request = contextvars.ContextVar("request", default=None)
+
+
+def test_call_runs_in_callers_context():
+    _request.set("turn-1")
+    assert LLMScheduler().call("NLUOutput", _request.get) == "turn-1"
+
+
+def test_call_retries_transient_errors_only():
+    scheduler = LLMScheduler(backoff=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise TimeoutError("slow")
+        return "ok"
+
+    assert scheduler.call("text", flaky) == "ok"
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_cancel_during_admission_gives_the_slot_back():
+    scheduler = LLMScheduler(rpm=600, max_concurrency=1, timeout=5.0)
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "first"
+
+    async def fast():
+        return "later"
+
+    async def scenario():
+        holder = asyncio.ensure_future(scheduler.acall("text", slow))
+        await asyncio.sleep(0.05)
+        queued = [asyncio.ensure_future(scheduler.acall("text", fast)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for task in queued:
+            task.cancel()
+        assert await holder == "first"
+        await asyncio.sleep(0.1)  # the cancelled admissions finish in their threads
+        return await scheduler.acall("text", fast, timeout=1.0)
+
+    assert asyncio.run(scenario()) == "later"
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_cancel_mid_request_releases_its_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def scenario():
+        async def never():
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(scheduler.acall("text", never, timeout=5.0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.01)
+        return scheduler.stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,38 @@
+from src.langgraphagenticai.cache.script_cache import ScriptCache
+
+
+def test_templatize_replaces_whole_tokens_only():
+    slots = {"account_number": "9988776655", "recharge_amount": "1499"}
+    text = "Account 9988776655 recharged 1499; ref 14990 and 99887766551 and 2.1499 stay."
+    assert ScriptCache._templatize(text, slots) == (
+        "Account <account_number> recharged <recharge_amount>; ref 14990 and 99887766551 and 2.1499 stay."
+    )
+
+
+def test_short_slot_values_stay_in_the_key_not_the_template():
+    cache = ScriptCache(maxsize=8, ttl=None)
+    script = "Ticket created — resolution within 24 hours (24h SLA)."
+    key_24, slots_24 = cache.make_key("m", "Billing Issue", "recharge of 24 failed", {"recharge_amount": "24"})
+    assert slots_24 == {}
+    cache.set(key_24, slots_24, script)
+    assert cache.get(key_24, slots_24) == script
+
+    key_99, slots_99 = cache.make_key("m", "Billing Issue", "recharge of 99 failed", {"recharge_amount": "99"})
+    assert key_99 != key_24
+    assert cache.get(key_99, slots_99) is None
+
+
+def test_long_slot_values_are_filled_back_in_on_a_hit():
+    cache = ScriptCache(maxsize=8, ttl=None)
+    key_a, slots_a = cache.make_key("m", "Billing Issue", "account 9988776655 overcharged", {"account_number": "9988776655"})
+    cache.set(key_a, slots_a, "Refund raised on account 9988776655 within 48 hours.")
+    key_b, slots_b = cache.make_key("m", "Billing Issue", "account 9123456780 overcharged", {"account_number": "9123456780"})
+    assert key_b == key_a
+    assert cache.get(key_b, slots_b) == "Refund raised on account 9123456780 within 48 hours."
+
+
+def test_context_is_part_of_the_key():
+    cache = ScriptCache()
+    first, _ = cache.make_key("m", "Billing Issue", "my bill is wrong", {}, "Earlier conversation: (none)")
+    other, _ = cache.make_key("m", "Billing Issue", "my bill is wrong", {}, "Caller: my name is Asha")
+    assert first != other
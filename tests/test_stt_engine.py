@@ -0,0 +1,31 @@
+from src.langgraphagenticai.stt.engine import STTEngine, StubSTTBackend
+
+
+class _FailingBackend(StubSTTBackend):
+    def __init__(self, error: Exception, failures: int):
+        super().__init__(default_text="ok")
+        self.error = error
+        self.failures = failures
+
+    def transcribe(self, wav_bytes, timeout=None, filename="audio.wav"):
+        if self.calls < self.failures:
+            self.calls += 1
+            raise self.error
+        return super().transcribe(wav_bytes, timeout, filename)
+
+
+def test_transient_errors_are_retried():
+    backend = _FailingBackend(TimeoutError("slow"), failures=2)
+    engine = STTEngine(backend, backoff=0.0)
+    assert engine.transcribe(b"wav") == "ok"
+    assert engine.stats()["retries"] == 2
+
+
+def test_permanent_errors_are_not_retried():
+    error = Exception("invalid api key")
+    error.status_code = 401
+    backend = _FailingBackend(error, failures=5)
+    engine = STTEngine(backend, backoff=0.0)
+    assert engine.transcribe(b"wav").startswith("(STT error:")
+    assert backend.calls == 1
+    assert engine.stats()["retries"] == 0
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.langgraphagenticai.audio.preprocess import encode_wav
+from src.langgraphagenticai.cache.stt_cache import STTCache
+from src.langgraphagenticai.stt.engine import STTEngine, StubSTTBackend
+from src.langgraphagenticai.stt.streaming import transcribe_segmented
+
+RATE = 16000
+
+
+def _speech_with_pauses(segments: int = 3, seconds: float = 4.0) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    speech = 0.3 * np.sin(2 * np.pi * 220 * t)
+    pause = np.zeros(int(RATE * 1.0))
+    parts = []
+    for _ in range(segments):
+        parts.extend([speech, pause])
+    return encode_wav(np.concatenate(parts).astype(np.float32), RATE)
+
+
+class _SecondSegmentFails(StubSTTBackend):
+    def transcribe(self, wav_bytes, timeout=None, filename="audio.wav"):
+        self.calls += 1
+        if self.calls == 2:
+            raise ValueError("bad segment")
+        return f"segment {self.calls} words here."
+
+
+def test_a_failed_segment_fails_the_recording_and_is_not_cached():
+    cache = STTCache()
+    engine = STTEngine(_SecondSegmentFails(), cache=cache, max_retries=0)
+    text = transcribe_segmented(engine, _speech_with_pauses(), fingerprint="rec-1")
+    assert text.startswith("(STT error")
+    assert cache.get("rec-1") is None
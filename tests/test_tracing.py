@@ -0,0 +1,22 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.langgraphagenticai.telemetry.tracing import record_retries, record_tokens, span
+
+
+def test_counts_go_to_the_innermost_open_span():
+    with span("outer") as outer:
+        record_tokens(5)
+        with span("inner") as inner:
+            record_tokens(7)
+            record_retries(1)
+    assert outer["tokens"] == 5 and "retries" not in outer
+    assert inner["tokens"] == 7 and inner["retries"] == 1
+
+
+def test_worker_threads_record_through_a_copied_context():
+    with span("node") as data, ThreadPoolExecutor(max_workers=2) as pool:
+        for f in [pool.submit(contextvars.copy_context().run, record_tokens, 3) for _ in range(4)]:
+            f.result()
+    assert data["tokens"] == 12
+    record_tokens(100)  # outside any span: ignored
@@ -0,0 +1,31 @@
+from src.langgraphagenticai.storage.write_behind import SQLiteSink, WriteBehindQueue
+
+
+def test_replay_keeps_records_spilled_while_it_writes(tmp_path):
+    sink = SQLiteSink(str(tmp_path / "remote.db"))
+    q = WriteBehindQueue(sink, str(tmp_path / "spill.jsonl"), max_retries=0, flush_interval=60.0)
+    q._spill([("call_events", {"event_id": "a", "call_id": "c"})])
+
+    upsert = sink.upsert
+
+    def spill_during_write(table, rows):
+        upsert(table, rows)
+        sink.upsert = upsert
+        q._spill([("call_events", {"event_id": "b", "call_id": "c"})])
+
+    sink.upsert = spill_during_write
+    assert q._maybe_replay(force=True) is False
+    assert [row["event_id"] for _, row in q._read_spill()[0]] == ["b"]
+    assert q.flush()
+    assert sink.count("call_events") == 2
+    assert not q.stats()["spill_pending"]
+
+
+def test_full_queue_drops_instead_of_spilling(tmp_path):
+    sink = SQLiteSink(str(tmp_path / "remote.db"))
+    q = WriteBehindQueue(sink, str(tmp_path / "spill.jsonl"), max_queue=1)
+    q.close()
+    q.put("call_events", {"event_id": "first", "call_id": "c"})
+    q.put("call_events", {"event_id": "second", "call_id": "c"})
+    assert q.stats()["dropped"] == 1
+    assert not (tmp_path / "spill.jsonl").exists()